@@ -0,0 +1,13 @@
+"""
+性能基准测试套件
+
+覆盖楼层生成、战斗计算、地图序列化与存档读写等热点路径，
+结果输出为JSON并支持与基线对比，用法见 benchmarks/runner.py。
+"""
+from .cases import BENCHMARKS, BenchmarkCase, benchmark
+
+__all__ = [
+    'BENCHMARKS',
+    'BenchmarkCase',
+    'benchmark'
+]
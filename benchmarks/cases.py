@@ -0,0 +1,229 @@
+"""
+基准测试用例
+
+每个用例由 setup 函数构建测试数据并返回一个无参的被测函数，
+计时只覆盖被测函数本身。依赖缺失的用例由运行器记为跳过。
+"""
+import json
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from config.game_config import config_manager
+from game_model import (
+    Player, Monster, Position, WeaponAttribute, ArmorAttribute,
+    ATTRIBUTE_TYPES, ARMOR_ATTRIBUTE_TYPES, RARITY_CONFIG
+)
+
+# 用例固定随机种子，保证多次运行的工作量一致
+BENCHMARK_SEED = 20240601
+
+
+@dataclass
+class BenchmarkCase:
+    """基准测试用例"""
+    name: str
+    group: str
+    description: str
+    setup: Callable[[], Callable[[], object]]
+    number: int = 100  # 每轮调用次数
+
+
+# 已注册的用例 {名称: 用例}
+BENCHMARKS: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark(name: str, group: str, description: str, number: int = 100):
+    """注册基准测试用例的装饰器"""
+    def decorator(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS[name] = BenchmarkCase(name, group, description, setup, number)
+        return setup
+    return decorator
+
+
+# ==================== 测试数据构建 ====================
+
+def build_heavy_player(floor_level: int = 50, forge_level: int = 5) -> Player:
+    """构建带满词条武器与防具的玩家（每种词条各一条并锻造到指定等级）"""
+    multiplier = RARITY_CONFIG['legendary']['multiplier']
+
+    player = Player()
+    player.level = 30
+    player.attack += 300
+    player.defense += 150
+    player.max_hp = player.hp = 20000
+    player.weapon_name = '基准之剑'
+    player.weapon_atk = 400
+    player.weapon_rarity = 'legendary'
+    player.armor_name = '基准之甲'
+    player.armor_def = 250
+    player.armor_rarity = 'legendary'
+
+    player.weapon_attributes = [
+        WeaponAttribute(
+            attribute_type=attr_type,
+            value=(attr_config['base_value'] + floor_level * attr_config['scale']) * multiplier,
+            description=attr_config['description'],
+            level=forge_level
+        )
+        for attr_type, attr_config in ATTRIBUTE_TYPES.items()
+    ]
+    player.armor_attributes = [
+        ArmorAttribute(
+            attribute_type=attr_type,
+            value=(attr_config['base_value'] + floor_level * attr_config['scale']) * multiplier,
+            description=attr_config['description'],
+            level=forge_level
+        )
+        for attr_type, attr_config in ARMOR_ATTRIBUTE_TYPES.items()
+    ]
+    return player
+
+
+def build_game_state(seed: int = BENCHMARK_SEED):
+    """构建已开始新游戏的 GameState（需要服务器依赖）"""
+    import game_server
+
+    random.seed(seed)
+    game = game_server.GameState()
+    game.new_game()
+    return game
+
+
+# ==================== 楼层生成 ====================
+
+@benchmark('generate_floor_climb', 'generation',
+           '按服务器规则连续生成第1-100层（含商人楼层判定）', number=2)
+def setup_generate_floor_climb():
+    from map_generator import generate_floor
+
+    config = config_manager.get_config()
+    rng_state = random.Random(BENCHMARK_SEED).getstate()
+
+    def run():
+        random.setstate(rng_state)
+        prev_floor = None
+        merchant_attempt_count = 0
+        for level in range(1, config.MAX_FLOORS + 1):
+            floor = generate_floor(level, prev_floor, merchant_attempt_count)
+            if floor.is_merchant_floor:
+                merchant_attempt_count = 0
+            elif level >= config.MERCHANT_FIRST_FLOOR:
+                merchant_attempt_count += 1
+            prev_floor = floor
+    return run
+
+
+@benchmark('generate_normal_floor_deep', 'generation', '生成第90层普通楼层', number=50)
+def setup_generate_normal_floor_deep():
+    from map_generator import generate_normal_floor
+
+    random.seed(BENCHMARK_SEED)
+    return lambda: generate_normal_floor(90)
+
+
+@benchmark('generate_merchant_floor', 'generation', '生成商人楼层（含商品）', number=500)
+def setup_generate_merchant_floor():
+    from map_generator import generate_merchant_floor
+
+    random.seed(BENCHMARK_SEED)
+    return lambda: generate_merchant_floor(30)
+
+
+# ==================== 战斗 ====================
+
+@benchmark('player_attack_heavy_build', 'combat', '满词条玩家攻击高血量怪物', number=2000)
+def setup_player_attack_heavy_build():
+    from game_logic import player_attack
+    from map_generator import generate_normal_floor
+
+    random.seed(BENCHMARK_SEED)
+    floor = generate_normal_floor(50)
+    player = build_heavy_player()
+    monster = Monster('bench_monster', '基准怪物', 10 ** 9, 200, 120, 100, 100, Position(1, 1))
+
+    def run():
+        monster.hp = monster.max_hp
+        player.hp = player.max_hp
+        return player_attack(player, monster, floor)
+    return run
+
+
+# ==================== 序列化 ====================
+
+@benchmark('serialize_grid_json', 'serialization', 'to_serializable_grid + json.dumps 地图消息', number=1000)
+def setup_serialize_grid_json():
+    from map_generator import generate_normal_floor
+
+    random.seed(BENCHMARK_SEED)
+    floor = generate_normal_floor(50)
+    player = Player()
+    player.position = floor.player_start_pos
+
+    def run():
+        return json.dumps({'type': 'map', 'grid': floor.to_serializable_grid(player)}, ensure_ascii=False)
+    return run
+
+
+@benchmark('player_info_message', 'serialization', '满词条玩家的 get_player_info_message + json.dumps', number=2000)
+def setup_player_info_message():
+    game = build_game_state()
+    game.player = build_heavy_player()
+
+    def run():
+        return json.dumps(game.get_player_info_message(), ensure_ascii=False)
+    return run
+
+
+# ==================== 端到端 ====================
+
+@benchmark('game_state_move', 'gameplay', 'GameState.move 端到端（移动/战斗/拾取/上楼）', number=2000)
+def setup_game_state_move():
+    game = build_game_state()
+    directions = ('up', 'right', 'down', 'left', 'right', 'right', 'down', 'down')
+    rng = random.Random(BENCHMARK_SEED)
+
+    def run():
+        if game.game_over:
+            game.new_game()
+        return game.move(directions[rng.randrange(len(directions))])
+    return run
+
+
+# ==================== 存档 ====================
+
+def _setup_persistence_game():
+    """构建已登录的 GameState（运行器默认选择内存DAO后端）"""
+    import game_server
+    from database.dao import dao_manager
+
+    game_server.DATABASE_CONFIGURED = dao_manager.is_available()
+
+    game = build_game_state()
+    game.db_enabled = True
+    game.player = build_heavy_player()
+    config = config_manager.get_config()
+    game.player.inventory = {
+        config.POTION_SMALL_NAME: 5,
+        config.POTION_MEDIUM_NAME: 3,
+        config.POTION_LARGE_NAME: 1
+    }
+    game.player_id = dao_manager.player.create({
+        'name': 'benchmark', 'hp': game.player.hp, 'max_hp': game.player.max_hp,
+        'attack': game.player.attack, 'defense': game.player.defense,
+        'level': game.player.level, 'exp': 0, 'gold': 0
+    })
+    return game
+
+
+@benchmark('save_game', 'persistence', 'save_game（默认内存DAO后端）', number=500)
+def setup_save_game():
+    game = _setup_persistence_game()
+    return game.save_game
+
+
+@benchmark('load_latest_save', 'persistence', 'load_latest_save（默认内存DAO后端，含楼层重建）', number=200)
+def setup_load_latest_save():
+    game = _setup_persistence_game()
+    game.save_game()
+    return game.load_latest_save
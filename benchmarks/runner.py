@@ -0,0 +1,257 @@
+"""
+基准测试运行器
+
+用法:
+    python -m benchmarks                                  # 运行全部用例
+    python -m benchmarks --only generation combat         # 按分组或名称过滤
+    python -m benchmarks --output bench.json              # 输出JSON结果
+    python -m benchmarks --baseline bench.json --threshold 0.1 --fail-on-regression
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# 存档用例默认使用内存DAO后端（需在导入DAO层之前设置，可用 DB_BACKEND 覆盖）
+os.environ.setdefault('DB_BACKEND', 'memory')
+
+from benchmarks.cases import BENCHMARKS, BenchmarkCase
+
+logger = logging.getLogger(__name__)
+
+# 结果文件格式版本
+RESULT_FORMAT_VERSION = 1
+
+
+def time_case(case: BenchmarkCase, repeat: int, warmup: int, scale: float) -> Dict[str, Any]:
+    """
+    运行单个用例并统计单次调用耗时
+
+    Args:
+        case: 基准测试用例
+        repeat: 计时轮数
+        warmup: 预热调用次数
+        scale: 每轮调用次数的缩放系数
+
+    Returns:
+        结果字典（耗时单位为秒/次）
+    """
+    func = case.setup()
+    number = max(1, int(case.number * scale))
+
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        'group': case.group,
+        'description': case.description,
+        'status': 'ok',
+        'number': number,
+        'repeat': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': samples
+    }
+
+
+def select_cases(only: Optional[List[str]]) -> List[BenchmarkCase]:
+    """按名称或分组筛选用例"""
+    if not only:
+        return list(BENCHMARKS.values())
+    wanted = set(only)
+    return [case for case in BENCHMARKS.values() if case.name in wanted or case.group in wanted]
+
+
+def run_benchmarks(cases: List[BenchmarkCase], repeat: int, warmup: int, scale: float) -> Dict[str, Any]:
+    """运行用例列表，依赖缺失的用例记为跳过"""
+    results = {}
+    for case in cases:
+        try:
+            results[case.name] = time_case(case, repeat, warmup, scale)
+            logger.info(f"{case.name}: {format_duration(results[case.name]['median'])}/次")
+        except ImportError as e:
+            results[case.name] = {
+                'group': case.group,
+                'description': case.description,
+                'status': 'skipped',
+                'reason': str(e)
+            }
+            logger.warning(f"{case.name}: 跳过（缺少依赖: {e}）")
+
+    return {
+        'version': RESULT_FORMAT_VERSION,
+        'meta': collect_metadata(repeat, warmup, scale),
+        'results': results
+    }
+
+
+def collect_metadata(repeat: int, warmup: int, scale: float) -> Dict[str, Any]:
+    """收集运行环境信息"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).parent.parent
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'warmup': warmup,
+        'scale': scale,
+        'dao_backend': os.environ.get('DB_BACKEND')
+    }
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                          threshold: float) -> List[Dict[str, Any]]:
+    """
+    与基线结果对比（按中位数）
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 判定回归/提升的相对变化阈值
+
+    Returns:
+        对比结果列表
+    """
+    comparisons = []
+    baseline_results = baseline.get('results', {})
+    for name, result in current['results'].items():
+        base = baseline_results.get(name)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            continue
+
+        ratio = result['median'] / base['median'] if base['median'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            verdict = 'regression'
+        elif ratio < 1 - threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'unchanged'
+
+        comparisons.append({
+            'name': name,
+            'baseline': base['median'],
+            'current': result['median'],
+            'ratio': ratio,
+            'verdict': verdict
+        })
+    return comparisons
+
+
+def format_duration(seconds: float) -> str:
+    """格式化耗时"""
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.1f}µs"
+
+
+def print_report(report: Dict[str, Any], comparisons: Optional[List[Dict[str, Any]]] = None):
+    """打印结果表格"""
+    compared = {item['name']: item for item in comparisons or []}
+
+    print(f"{'用例':<28}{'分组':<15}{'中位数':>12}{'最小值':>12}{'基线比':>10}  结论")
+    for name, result in report['results'].items():
+        if result['status'] != 'ok':
+            print(f"{name:<28}{result['group']:<15}{'跳过':>12}  {result.get('reason', '')}")
+            continue
+
+        comparison = compared.get(name)
+        ratio = f"{comparison['ratio']:.2f}x" if comparison else '-'
+        verdict = comparison['verdict'] if comparison else ''
+        print(f"{name:<28}{result['group']:<15}{format_duration(result['median']):>12}"
+              f"{format_duration(result['min']):>12}{ratio:>10}  {verdict}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='爬塔游戏性能基准测试')
+    parser.add_argument('--only', nargs='+', help='只运行指定名称或分组的用例')
+    parser.add_argument('--list', action='store_true', help='列出所有用例')
+    parser.add_argument('--repeat', type=int, default=5, help='计时轮数')
+    parser.add_argument('--warmup', type=int, default=3, help='预热调用次数')
+    parser.add_argument('--scale', type=float, default=1.0, help='每轮调用次数缩放系数')
+    parser.add_argument('--output', '-o', help='结果JSON输出路径')
+    parser.add_argument('--baseline', '-b', help='基线结果JSON路径')
+    parser.add_argument('--threshold', type=float, default=0.10, help='回归判定阈值（相对变化）')
+    parser.add_argument('--fail-on-regression', action='store_true', help='存在回归时以非零状态退出')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    # 屏蔽游戏模块的业务日志，避免干扰计时
+    for noisy in ('game_server', 'services', 'database', 'map_generator', 'game_logic'):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    if args.list:
+        for case in BENCHMARKS.values():
+            print(f"{case.name:<28}{case.group:<15}{case.description}")
+        return 0
+
+    cases = select_cases(args.only)
+    if not cases:
+        print(f"没有匹配的用例: {args.only}")
+        return 2
+
+    report = run_benchmarks(cases, args.repeat, args.warmup, args.scale)
+
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparisons = compare_with_baseline(report, baseline, args.threshold)
+        report['comparison'] = {
+            'baseline': args.baseline,
+            'threshold': args.threshold,
+            'items': comparisons
+        }
+
+    print_report(report, comparisons)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"结果已写入 {args.output}")
+
+    if args.fail_on_regression and comparisons and any(c['verdict'] == 'regression' for c in comparisons):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
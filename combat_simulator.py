@@ -0,0 +1,451 @@
+"""
+战斗蒙特卡洛模拟器
+
+批量模拟玩家与怪物之间的完整战斗（玩家先手 → 怪物反击，直到一方倒下），
+用于数值平衡工具与怪物"危险度"评估。
+
+伤害公式与 game_logic.player_attack 保持一致，覆盖：
+暴击、幸运一击、连击链、百分比伤害、吸血、怒火、伤害减免、格挡、闪避、武器荆棘与防具荆棘反射。
+
+安装了 numpy 时使用向量化实现（一次推进所有模拟的一个回合），
+否则退化为纯 Python 逐场模拟，两者统计口径相同。
+"""
+
+import logging
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from game_model import Player, Monster
+from config.game_config import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def load_numpy():
+    """
+    导入numpy（可选依赖，首次模拟时才导入并缓存结果，避免拖慢 game_server 启动）
+
+    Returns:
+        numpy模块，未安装时返回None
+    """
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+# 连击链：(触发概率, 伤害倍率)，第一段概率取自武器词条
+COMBO_FOLLOWUP_CHAIN = [(0.25, 0.50), (0.05, 0.75)]
+COMBO_FIRST_MULTIPLIER = 0.25
+
+# 百分比伤害对Boss的限制（与 game_logic 一致）
+BOSS_HP_THRESHOLD = 1000
+BOSS_PERCENT_DAMAGE_CAP = 0.05
+
+# 危险度分级：(最低胜率, 最高期望损血比例, 等级, 名称)
+DANGER_LEVELS = [
+    (0.99, 0.25, 'safe', '安全'),
+    (0.95, 0.50, 'normal', '普通'),
+    (0.70, 0.85, 'risky', '危险'),
+]
+DANGER_LEVEL_DEADLY = ('deadly', '致命')
+
+HP_LOSS_HISTOGRAM_BINS = 10
+
+
+@dataclass
+class CombatProfile:
+    """
+    战斗快照：把玩家与怪物的属性预先汇总为标量，模拟过程中不再遍历词条列表
+    """
+    player_hp: int
+    player_max_hp: int
+    base_atk: int                # 基础攻击 + 武器攻击
+    static_atk: int              # total_atk 中与血量无关的部分
+    berserk_rate: float
+    attack_boost: float
+    armor_pen: float
+    damage_mult: float
+    crit_chance: float
+    crit_multiplier: float
+    lucky_chance: float
+    percent_rate: float
+    combo_chance: float
+    life_steal_rate: float
+    player_def: int
+    damage_reduction: float
+    block_chance: float
+    dodge_chance: float
+    thorn_rate: float
+    thorn_reflect_rate: float
+    monster_hp: int
+    monster_max_hp: int
+    monster_atk: int
+    monster_def: int
+    min_damage: int
+
+    @classmethod
+    def from_entities(cls, player: Player, monster: Monster, floor_level: int = 1) -> 'CombatProfile':
+        """
+        从玩家与怪物对象构建战斗快照
+
+        Args:
+            player: 玩家对象
+            monster: 怪物对象
+            floor_level: 所在楼层（影响层数加成词条）
+
+        Returns:
+            战斗快照
+        """
+        config = config_manager.get_config()
+
+        weapon_totals: Dict[str, float] = {}
+        for attr in player.weapon_attributes:
+            weapon_totals[attr.attribute_type] = weapon_totals.get(attr.attribute_type, 0.0) + attr.get_enhanced_value()
+
+        base_atk = player.attack + player.weapon_atk
+        floor_bonus = sum(int(attr.get_enhanced_value() * (floor_level - 1))
+                          for attr in player.weapon_attributes
+                          if attr.attribute_type == 'floor_bonus')
+        attack_boost = weapon_totals.get('attack_boost', 0.0)
+
+        return cls(
+            player_hp=player.hp,
+            player_max_hp=player.max_hp,
+            base_atk=base_atk,
+            static_atk=base_atk + int(attack_boost) + floor_bonus,
+            berserk_rate=weapon_totals.get('berserk_mode', 0.0),
+            attack_boost=attack_boost,
+            armor_pen=weapon_totals.get('armor_pen', 0.0),
+            damage_mult=1.0 + weapon_totals.get('damage_mult', 0.0),
+            crit_chance=player.get_critical_chance(),
+            crit_multiplier=config.CRITICAL_HIT_MULTIPLIER,
+            lucky_chance=weapon_totals.get('lucky_hit', 0.0),
+            percent_rate=weapon_totals.get('percent_damage', 0.0),
+            combo_chance=weapon_totals.get('combo_chance', 0.0),
+            life_steal_rate=weapon_totals.get('life_steal', 0.0),
+            player_def=player.total_def,
+            damage_reduction=player.get_armor_attribute_value('damage_reduction'),
+            block_chance=player.get_armor_attribute_value('block_chance'),
+            dodge_chance=player.get_armor_attribute_value('dodge_chance'),
+            thorn_rate=weapon_totals.get('thorn_damage', 0.0),
+            thorn_reflect_rate=player.get_armor_attribute_value('thorn_reflect'),
+            monster_hp=monster.hp,
+            monster_max_hp=monster.max_hp,
+            monster_atk=monster.atk,
+            monster_def=monster.defense,
+            min_damage=config.MIN_DAMAGE,
+        )
+
+    @property
+    def base_damage_without_berserk(self) -> float:
+        """未触发怒火时的基础伤害（含攻击力加成）"""
+        return self._base_damage(self.static_atk)
+
+    def _base_damage(self, atk: int) -> float:
+        effective_defense = max(0, self.monster_def - self.armor_pen)
+        return max(self.min_damage, atk - effective_defense) + self.attack_boost
+
+    @property
+    def monster_hit(self) -> int:
+        """怪物反击的基础伤害（防具词条生效前）"""
+        return max(self.min_damage, self.monster_atk - self.player_def)
+
+
+# ==================== 纯 Python 实现 ====================
+
+def _simulate_single(profile: CombatProfile, max_turns: int, rng: random.Random) -> tuple:
+    """
+    模拟一场战斗
+
+    Returns:
+        (是否胜利, 回合数, 玩家剩余生命)
+    """
+    player_hp = profile.player_hp
+    monster_hp = profile.monster_hp
+    berserk_extra = int(profile.base_atk * profile.berserk_rate)
+
+    for turn in range(1, max_turns + 1):
+        # 玩家攻击
+        atk = profile.static_atk
+        if profile.berserk_rate > 0 and player_hp / profile.player_max_hp < 0.3:
+            atk += berserk_extra
+        base_damage = profile._base_damage(atk)
+
+        crit = profile.crit_multiplier if rng.random() < profile.crit_chance else 1.0
+        damage = int(base_damage * profile.damage_mult * crit)
+        if rng.random() < profile.lucky_chance:
+            damage *= 3
+
+        percent_damage = 0
+        if profile.percent_rate > 0:
+            estimated_max_hp = monster_hp * 1.1 if monster_hp < profile.monster_max_hp else profile.monster_max_hp
+            if estimated_max_hp:
+                percent_damage = int(estimated_max_hp * profile.percent_rate)
+                if estimated_max_hp > BOSS_HP_THRESHOLD:
+                    percent_damage = min(percent_damage, int(estimated_max_hp * BOSS_PERCENT_DAMAGE_CAP))
+
+        combo_damages = []
+        if rng.random() < profile.combo_chance:
+            combo_damages.append(int(damage * COMBO_FIRST_MULTIPLIER))
+            for chance, multiplier in COMBO_FOLLOWUP_CHAIN:
+                if rng.random() >= chance:
+                    break
+                combo_damages.append(int(damage * multiplier))
+
+        monster_hp = max(0, monster_hp - damage - percent_damage - sum(combo_damages))
+
+        if profile.life_steal_rate > 0:
+            life_steal = int(damage * profile.life_steal_rate)
+            life_steal += sum(int(combo * profile.life_steal_rate) for combo in combo_damages)
+            player_hp = min(profile.player_max_hp, player_hp + life_steal)
+
+        if monster_hp <= 0:
+            return True, turn, player_hp
+
+        # 怪物反击
+        hit = profile.monster_hit
+        if profile.damage_reduction > 0:
+            hit = int(hit * (1.0 - profile.damage_reduction))
+        if profile.block_chance > 0 and rng.random() < profile.block_chance:
+            hit = int(hit * 0.4)
+        if profile.dodge_chance > 0 and rng.random() < profile.dodge_chance:
+            hit = 0
+        hit = max(0, hit)
+        player_hp = max(0, player_hp - hit)
+
+        monster_hp = max(0, monster_hp - int(hit * profile.thorn_rate) - int(hit * profile.thorn_reflect_rate))
+
+        if player_hp <= 0:
+            return False, turn, 0
+        if monster_hp <= 0:
+            # 荆棘反伤致死：下一次碰撞即可收尾，不会再受到反击
+            return True, turn + 1, player_hp
+
+    return False, max_turns, player_hp
+
+
+def _simulate_python(profile: CombatProfile, trials: int, max_turns: int,
+                     seed: Optional[int]) -> Dict[str, List]:
+    rng = random.Random(seed)
+    wins, turns, final_hp = [], [], []
+    for _ in range(trials):
+        won, turn_count, hp_left = _simulate_single(profile, max_turns, rng)
+        wins.append(won)
+        turns.append(turn_count)
+        final_hp.append(hp_left)
+    return {'wins': wins, 'turns': turns, 'final_hp': final_hp}
+
+
+# ==================== numpy 向量化实现 ====================
+
+def _simulate_numpy(profile: CombatProfile, trials: int, max_turns: int,
+                    seed: Optional[int]) -> Dict[str, List]:
+    np = load_numpy()
+    rng = np.random.default_rng(seed)
+
+    player_hp = np.full(trials, profile.player_hp, dtype=np.int64)
+    monster_hp = np.full(trials, profile.monster_hp, dtype=np.int64)
+    turns = np.full(trials, max_turns, dtype=np.int64)
+    wins = np.zeros(trials, dtype=bool)
+    active = np.ones(trials, dtype=bool)
+
+    berserk_extra = int(profile.base_atk * profile.berserk_rate)
+    base_no_berserk = profile._base_damage(profile.static_atk)
+    base_berserk = profile._base_damage(profile.static_atk + berserk_extra)
+    monster_hit = profile.monster_hit
+    if profile.damage_reduction > 0:
+        monster_hit = int(monster_hit * (1.0 - profile.damage_reduction))
+
+    for turn in range(1, max_turns + 1):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        n = idx.size
+        p_hp = player_hp[idx]
+        m_hp = monster_hp[idx]
+
+        # 玩家攻击
+        if profile.berserk_rate > 0:
+            berserk = p_hp / profile.player_max_hp < 0.3
+            base_damage = np.where(berserk, base_berserk, base_no_berserk)
+        else:
+            base_damage = np.full(n, base_no_berserk)
+
+        crit = np.where(rng.random(n) < profile.crit_chance, profile.crit_multiplier, 1.0)
+        damage = (base_damage * profile.damage_mult * crit).astype(np.int64)
+        damage = np.where(rng.random(n) < profile.lucky_chance, damage * 3, damage)
+
+        percent_damage = np.zeros(n, dtype=np.int64)
+        if profile.percent_rate > 0:
+            estimated_max_hp = np.where(m_hp < profile.monster_max_hp, m_hp * 1.1, float(profile.monster_max_hp))
+            percent_damage = (estimated_max_hp * profile.percent_rate).astype(np.int64)
+            boss_cap = (estimated_max_hp * BOSS_PERCENT_DAMAGE_CAP).astype(np.int64)
+            percent_damage = np.where(estimated_max_hp > BOSS_HP_THRESHOLD,
+                                      np.minimum(percent_damage, boss_cap), percent_damage)
+            percent_damage = np.where(estimated_max_hp > 0, percent_damage, 0)
+
+        combo_total = np.zeros(n, dtype=np.int64)
+        life_steal = np.zeros(n, dtype=np.int64)
+        if profile.combo_chance > 0:
+            chain_alive = rng.random(n) < profile.combo_chance
+            hit = np.where(chain_alive, (damage * COMBO_FIRST_MULTIPLIER).astype(np.int64), 0)
+            combo_total += hit
+            life_steal += (hit * profile.life_steal_rate).astype(np.int64)
+            for chance, multiplier in COMBO_FOLLOWUP_CHAIN:
+                chain_alive &= rng.random(n) < chance
+                hit = np.where(chain_alive, (damage * multiplier).astype(np.int64), 0)
+                combo_total += hit
+                life_steal += (hit * profile.life_steal_rate).astype(np.int64)
+
+        m_hp = np.maximum(0, m_hp - damage - percent_damage - combo_total)
+
+        if profile.life_steal_rate > 0:
+            life_steal += (damage * profile.life_steal_rate).astype(np.int64)
+            p_hp = np.minimum(profile.player_max_hp, p_hp + life_steal)
+
+        killed = m_hp <= 0
+
+        # 怪物反击（仅对存活怪物）
+        hit = np.full(n, monster_hit, dtype=np.int64)
+        if profile.block_chance > 0:
+            hit = np.where(rng.random(n) < profile.block_chance, (hit * 0.4).astype(np.int64), hit)
+        if profile.dodge_chance > 0:
+            hit = np.where(rng.random(n) < profile.dodge_chance, 0, hit)
+        hit = np.where(killed, 0, np.maximum(0, hit))
+
+        p_hp = np.maximum(0, p_hp - hit)
+        thorns = (hit * profile.thorn_rate).astype(np.int64) + (hit * profile.thorn_reflect_rate).astype(np.int64)
+        m_hp = np.maximum(0, m_hp - thorns)
+
+        lost = ~killed & (p_hp <= 0)
+        thorn_kill = ~killed & ~lost & (m_hp <= 0)
+
+        player_hp[idx] = p_hp
+        monster_hp[idx] = m_hp
+
+        wins[idx[killed | thorn_kill]] = True
+        turns[idx[killed | lost]] = turn
+        turns[idx[thorn_kill]] = turn + 1
+        active[idx[killed | lost | thorn_kill]] = False
+
+    return {'wins': wins.tolist(), 'turns': turns.tolist(), 'final_hp': player_hp.tolist()}
+
+
+# ==================== 对外接口 ====================
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """在已排序列表上取分位数（最近秩）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def simulate_combat(player: Player, monster: Monster, floor_level: int = 1,
+                    trials: int = 10000, max_turns: int = 200,
+                    seed: Optional[int] = None, use_numpy: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    蒙特卡洛估算一场战斗的结果分布
+
+    Args:
+        player: 玩家对象（不会被修改）
+        monster: 怪物对象（不会被修改）
+        floor_level: 所在楼层
+        trials: 模拟场数
+        max_turns: 单场最大回合数，超过视为未获胜
+        seed: 随机种子
+        use_numpy: 是否使用numpy实现，None表示自动选择
+
+    Returns:
+        结果字典，包含：
+        - win_rate: 胜率
+        - expected_turns: 期望回合数
+        - expected_turns_on_win: 获胜场次的期望回合数
+        - hp_loss: 损血统计（mean/median/p90/max/mean_ratio）
+        - hp_loss_histogram: 按初始生命比例分桶的损血分布
+        - backend: 使用的实现
+    """
+    if trials <= 0:
+        raise ValueError("模拟场数必须大于0")
+
+    profile = CombatProfile.from_entities(player, monster, floor_level)
+
+    numpy_available = load_numpy() is not None
+    if use_numpy is None:
+        use_numpy = numpy_available
+    elif use_numpy and not numpy_available:
+        logger.warning("numpy不可用，战斗模拟退化为纯Python实现")
+        use_numpy = False
+
+    if use_numpy:
+        raw = _simulate_numpy(profile, trials, max_turns, seed)
+    else:
+        raw = _simulate_python(profile, trials, max_turns, seed)
+
+    start_hp = max(1, profile.player_hp)
+    hp_losses = sorted(max(0, profile.player_hp - hp) for hp in raw['final_hp'])
+    win_count = sum(1 for won in raw['wins'] if won)
+    win_turns = [t for won, t in zip(raw['wins'], raw['turns']) if won]
+
+    histogram = [0] * HP_LOSS_HISTOGRAM_BINS
+    for loss in hp_losses:
+        bucket = min(HP_LOSS_HISTOGRAM_BINS - 1, int(loss / start_hp * HP_LOSS_HISTOGRAM_BINS))
+        histogram[bucket] += 1
+
+    mean_loss = sum(hp_losses) / trials
+    return {
+        'trials': trials,
+        'win_rate': win_count / trials,
+        'expected_turns': sum(raw['turns']) / trials,
+        'expected_turns_on_win': sum(win_turns) / len(win_turns) if win_turns else 0.0,
+        'hp_loss': {
+            'mean': mean_loss,
+            'median': _percentile(hp_losses, 0.5),
+            'p90': _percentile(hp_losses, 0.9),
+            'max': hp_losses[-1],
+            'mean_ratio': mean_loss / start_hp,
+        },
+        'hp_loss_histogram': [
+            {'range': (i / HP_LOSS_HISTOGRAM_BINS, (i + 1) / HP_LOSS_HISTOGRAM_BINS), 'count': count}
+            for i, count in enumerate(histogram)
+        ],
+        'backend': 'numpy' if use_numpy else 'python',
+    }
+
+
+def estimate_danger_rating(player: Player, monster: Monster, floor_level: int = 1,
+                           trials: int = 2000, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    估算怪物对当前玩家的危险度
+
+    Args:
+        player: 玩家对象
+        monster: 怪物对象
+        floor_level: 所在楼层
+        trials: 模拟场数（危险度只需粗略估计，默认较少）
+        seed: 随机种子
+
+    Returns:
+        危险度字典：level、name、win_rate、hp_loss_ratio
+    """
+    result = simulate_combat(player, monster, floor_level, trials=trials, seed=seed)
+    win_rate = result['win_rate']
+    loss_ratio = result['hp_loss']['mean_ratio']
+
+    level, name = DANGER_LEVEL_DEADLY
+    for min_win_rate, max_loss_ratio, candidate_level, candidate_name in DANGER_LEVELS:
+        if win_rate >= min_win_rate and loss_ratio <= max_loss_ratio:
+            level, name = candidate_level, candidate_name
+            break
+
+    return {
+        'level': level,
+        'name': name,
+        'win_rate': round(win_rate, 4),
+        'hp_loss_ratio': round(loss_ratio, 4),
+    }
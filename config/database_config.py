@@ -22,6 +22,12 @@ class DatabaseConfig:
     password: str
     charset: str = 'utf8mb4'
 
+    # DAO后端：mysql（默认）、sqlite（单机嵌入式）或 memory（纯内存，用于测试、基准测试与无数据库模式）
+    backend: str = 'mysql'
+
+    # SQLite数据库文件路径（仅 sqlite 后端使用）
+    sqlite_path: str = 'data/tower_game.db'
+
     # 连接池配置
     pool_size: int = 3  # 减少连接池大小，避免过多连接
     max_overflow: int = 5  # 减少最大溢出连接数
@@ -51,7 +57,9 @@ class DatabaseConfigManager:
                 pool_size=int(os.getenv('DB_POOL_SIZE', '3')),
                 max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '5')),
                 pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '60')),
-                pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800'))
+                pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+                backend=os.getenv('DB_BACKEND', 'mysql').strip().lower(),
+                sqlite_path=os.getenv('DB_SQLITE_PATH', 'data/tower_game.db')
             )
         return self._config
 
@@ -59,6 +67,10 @@ class DatabaseConfigManager:
         """获取数据库配置（单例模式）"""
         return self.load_config()
 
+    def get_backend(self) -> str:
+        """获取DAO后端名称"""
+        return self.load_config().backend
+
     def is_configured(self) -> bool:
         """检查数据库是否已正确配置"""
         try:
@@ -5,7 +5,9 @@
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+from utils.sampling_utils import WeightedSampler
 
 
 @dataclass
@@ -86,6 +88,8 @@ class GameConfig:
     MIN_DAMAGE: int = 1
     CRITICAL_HIT_CHANCE: float = 0.05
     CRITICAL_HIT_MULTIPLIER: float = 2.0
+    DANGER_RATING_ENABLED: bool = False  # 战斗信息中附带怪物危险度（蒙特卡洛估算）
+    DANGER_RATING_TRIALS: int = 500
 
     # 商人楼层概率配置
     MERCHANT_FIRST_FLOOR: int = 10
@@ -265,17 +269,147 @@ DIFFICULTY_SETTINGS = {
 }
 
 
+# 楼层越高，中/大药瓶权重越高：(起始楼层, 结束楼层(不含), 小/中/大 权重系数)
+POTION_FLOOR_ADJUSTMENTS = [
+    (20, 50, (0.7, 1.2, 1.4)),
+    (50, None, (0.4, 1.3, 1.8)),
+]
+POTION_SIZES = ('small', 'medium', 'large')
+DEFAULT_POTION_TYPE_WEIGHTS = {'small': 0.5, 'medium': 0.35, 'large': 0.15}
+
+
+@dataclass(frozen=True)
+class FloorStats:
+    """单层预计算数值（怪物基础属性、装备数值、药瓶权重、商人价格）"""
+    level: int
+    monster_hp: int
+    monster_atk: int
+    monster_def: int
+    monster_exp: int
+    monster_gold: int
+    weapon_atk: int
+    armor_def: int
+    potion_weights: Tuple[float, float, float]  # 对应 POTION_SIZES
+    merchant_base_price: int
+    merchant_weapon_price: int
+    merchant_armor_price: int
+    merchant_potion_prices: Dict[int, int]  # {回血百分比: 价格}
+    potion_sampler: WeightedSampler  # 按 potion_weights 采样药瓶尺寸
+
+    def get_merchant_potion_price(self, heal_percent: int) -> int:
+        """获取指定回血百分比药瓶的商人价格"""
+        return self.merchant_potion_prices[heal_percent]
+
+
+class CompiledConfig:
+    """
+    编译后的配置快照
+
+    从 GameConfig 一次性预计算 1..MAX_FLOORS 每层的数值表，生成地图时只做查表。
+    快照本身只读，配置变更时由 ConfigManager 整体重建并替换引用。
+    """
+
+    def __init__(self, config: GameConfig):
+        self.config = config
+
+        # 药瓶档位：{尺寸: (名称, 回血百分比)}
+        self.potion_types: Dict[str, Tuple[str, int]] = {
+            'small': (config.POTION_SMALL_NAME, int(config.POTION_SMALL_HEAL_RATE * 100)),
+            'medium': (config.POTION_MEDIUM_NAME, int(config.POTION_MEDIUM_HEAL_RATE * 100)),
+            'large': (config.POTION_LARGE_NAME, int(config.POTION_LARGE_HEAL_RATE * 100)),
+        }
+        self.medium_potion_percent = self.potion_types['medium'][1] or 50
+
+        # 道具类型权重
+        self.item_types: Tuple[str, ...] = tuple(config.ITEM_WEIGHTS.keys())
+        self.item_type_weights: Tuple[float, ...] = tuple(config.ITEM_WEIGHTS[t] for t in self.item_types)
+        self.item_type_sampler = WeightedSampler(self.item_types, self.item_type_weights)
+
+        # 稀有度采样
+        self.rarity_sampler = WeightedSampler(
+            list(config.RARITY_SETTINGS.keys()),
+            [settings['probability'] for settings in config.RARITY_SETTINGS.values()]
+        )
+
+        self.floors: Tuple[FloorStats, ...] = tuple(
+            self._compute_floor(level) for level in range(config.MAX_FLOORS + 1)
+        )
+
+    def _compute_potion_weights(self, floor_level: int) -> Tuple[float, float, float]:
+        base_weights = self.config.POTION_TYPE_WEIGHTS or DEFAULT_POTION_TYPE_WEIGHTS
+        weights = [base_weights.get(size, DEFAULT_POTION_TYPE_WEIGHTS[size]) for size in POTION_SIZES]
+
+        for start, end, factors in POTION_FLOOR_ADJUSTMENTS:
+            if floor_level >= start and (end is None or floor_level < end):
+                weights = [w * f for w, f in zip(weights, factors)]
+                break
+
+        if sum(weights) <= 0:
+            weights = [DEFAULT_POTION_TYPE_WEIGHTS[size] for size in POTION_SIZES]
+        return tuple(weights)
+
+    def _compute_floor(self, level: int) -> FloorStats:
+        config = self.config
+        base_price = config.MERCHANT_BASE_PRICE + level * config.MERCHANT_PRICE_PER_FLOOR
+        potion_prices = {}
+        for _, heal_percent in self.potion_types.values():
+            rate_percent = heal_percent or self.medium_potion_percent
+            price_factor = rate_percent / self.medium_potion_percent
+            potion_prices[heal_percent] = int(base_price * config.MERCHANT_POTION_PRICE_MULTIPLIER * price_factor)
+        potion_weights = self._compute_potion_weights(level)
+
+        return FloorStats(
+            level=level,
+            monster_hp=config.MONSTER_BASE_HP + level * config.MONSTER_HP_PER_FLOOR,
+            monster_atk=config.MONSTER_BASE_ATK + level * config.MONSTER_ATK_PER_FLOOR,
+            monster_def=config.MONSTER_BASE_DEF + level * config.MONSTER_DEF_PER_FLOOR,
+            monster_exp=config.MONSTER_BASE_EXP + level * config.MONSTER_EXP_PER_FLOOR,
+            monster_gold=config.MONSTER_BASE_GOLD + level * config.MONSTER_GOLD_PER_FLOOR,
+            weapon_atk=config.WEAPON_BASE_ATK + level * config.WEAPON_ATK_PER_FLOOR,
+            armor_def=config.ARMOR_BASE_DEF + level * config.ARMOR_DEF_PER_FLOOR,
+            potion_weights=potion_weights,
+            merchant_base_price=base_price,
+            merchant_weapon_price=int(base_price * config.MERCHANT_WEAPON_PRICE_MULTIPLIER),
+            merchant_armor_price=int(base_price * config.MERCHANT_ARMOR_PRICE_MULTIPLIER),
+            merchant_potion_prices=potion_prices,
+            potion_sampler=WeightedSampler(POTION_SIZES, potion_weights),
+        )
+
+    def floor(self, level: int) -> FloorStats:
+        """
+        获取指定楼层的预计算数值
+
+        Args:
+            level: 楼层
+
+        Returns:
+            楼层数值；超出预计算范围时即时计算
+        """
+        if 0 <= level < len(self.floors):
+            return self.floors[level]
+        return self._compute_floor(level)
+
+
 class ConfigManager:
     """配置管理器，提供配置的加载、保存和修改功能"""
 
     def __init__(self, config: GameConfig = None):
         self.config = config or GameConfig()
         self.difficulty = 'normal'
+        self.compiled = CompiledConfig(self.config)
 
     def get_config(self) -> GameConfig:
         """获取当前配置"""
         return self.config
 
+    def get_compiled(self) -> CompiledConfig:
+        """获取编译后的配置快照（每层数值表）"""
+        return self.compiled
+
+    def _recompile(self):
+        """重建配置快照，构建完成后一次性替换引用，读者不会看到半成品"""
+        self.compiled = CompiledConfig(self.config)
+
     def set_difficulty(self, difficulty: str):
         """设置游戏难度"""
         if difficulty in DIFFICULTY_SETTINGS:
@@ -285,17 +419,20 @@ class ConfigManager:
             for key, value in settings.items():
                 if hasattr(self.config, key):
                     setattr(self.config, key, value)
+            self._recompile()
 
     def update_config(self, **kwargs):
         """更新配置参数"""
         for key, value in kwargs.items():
             if hasattr(self.config, key):
                 setattr(self.config, key, value)
+        self._recompile()
 
     def reset_to_default(self):
         """重置为默认配置"""
         self.config = GameConfig()
         self.difficulty = 'normal'
+        self._recompile()
 
     def save_config_to_dict(self) -> Dict[str, Any]:
         """保存配置为字典"""
@@ -310,6 +447,7 @@ class ConfigManager:
             self.config = GameConfig.from_dict(data['config'])
         if 'difficulty' in data:
             self.set_difficulty(data['difficulty'])
+        self._recompile()
 
 
 # 全局配置管理器实例
@@ -0,0 +1,125 @@
+"""
+数据库熔断器
+连续连接失败达到阈值后熔断（open），熔断期间直接拒绝请求而不是阻塞重试；
+熔断时间到期后放行一个探测请求（half-open），成功则恢复（closed），
+失败则按指数退避延长下一次熔断时间
+"""
+import os
+import threading
+import time
+from typing import Any, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 熔断器状态
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 默认参数
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv('DB_BREAKER_FAILURES', '3'))
+DEFAULT_RESET_TIMEOUT = float(os.getenv('DB_BREAKER_RESET_SECONDS', '2'))
+DEFAULT_MAX_RESET_TIMEOUT = float(os.getenv('DB_BREAKER_MAX_RESET_SECONDS', '60'))
+
+
+class CircuitOpenError(ConnectionError):
+    """熔断期间拒绝数据库请求"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - closed：正常放行，连续失败达到 failure_threshold 次后进入 open
+    - open：拒绝请求，reset_timeout 秒后允许一个探测请求进入 half_open
+    - half_open：探测成功恢复为 closed；失败重新 open，熔断时间翻倍（不超过 max_reset_timeout）
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+
+        self._state = CLOSED
+        self._failures = 0
+        self._open_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            return self._state
+
+    @property
+    def available(self) -> bool:
+        """是否可能放行请求（closed，或熔断已到期等待探测）"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at >= self._open_timeout
+            return not self._probing
+
+    def allow_request(self) -> bool:
+        """请求前调用：返回是否放行（到期的熔断器在此转为 half_open 并放行一个探测请求）"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_timeout:
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"熔断器 {self.name} 已恢复")
+            self._state = CLOSED
+            self._failures = 0
+            self._open_timeout = self.reset_timeout
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次连接失败"""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN:
+                # 探测失败：指数退避
+                self._open_timeout = min(self._open_timeout * 2, self.max_reset_timeout)
+                self._trip()
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.trips += 1
+        logger.warning(f"熔断器 {self.name} 已熔断，{self._open_timeout:.1f} 秒后探测恢复"
+                       f"（连续失败 {self._failures} 次）")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取熔断器状态统计"""
+        with self._lock:
+            return {
+                'state': self._state,
+                'failures': self._failures,
+                'open_timeout': self._open_timeout,
+                'rejected': self.rejected,
+                'trips': self.trips
+            }
@@ -14,114 +14,228 @@ from .merchant_inventory_dao import MerchantInventoryDAO
 from .session_dao import SessionDAO
 from .login_log_dao import LoginLogDAO
 from .inventory_dao import InventoryDAO
+from config.database_config import config_manager as db_config_manager
+from contextlib import nullcontext
+from typing import Dict, Optional
+import threading
+
+# 支持的DAO后端
+DAO_BACKENDS = ('mysql', 'sqlite', 'memory')
+
+
+def create_sql_daos(pool=None) -> Dict[str, object]:
+    """
+    创建基于SQL连接池的全部DAO
+
+    Args:
+        pool: 连接池，默认使用全局MySQL连接池
+    """
+    return {
+        'player': PlayerDAO(pool),
+        'weapon_attribute': WeaponAttributeDAO(pool),
+        'equipment_attribute': EquipmentAttributeDAO(pool),
+        'game_save': GameSaveDAO(pool),
+        'equipment': EquipmentDAO(pool),
+        'floor': FloorDAO(pool),
+        'item': ItemDAO(pool),
+        'merchant': MerchantDAO(pool),
+        'merchant_inventory': MerchantInventoryDAO(pool),
+        'session': SessionDAO(pool),
+        'login_log': LoginLogDAO(pool),
+        'inventory': InventoryDAO(pool)
+    }
 
 
 class DAOManager:
     """DAO层管理器"""
 
-    def __init__(self):
-        """初始化所有DAO实例"""
-        self.player_dao = PlayerDAO()
-        self.weapon_attribute_dao = WeaponAttributeDAO()
-        self.equipment_attribute_dao = EquipmentAttributeDAO()
-        self.game_save_dao = GameSaveDAO()
-        self.equipment_dao = EquipmentDAO()
-        self.floor_dao = FloorDAO()
-        self.item_dao = ItemDAO()
-        self.merchant_dao = MerchantDAO()
-        self.merchant_inventory_dao = MerchantInventoryDAO()
-        self.session_dao = SessionDAO()
-        self.login_log_dao = LoginLogDAO()
-        self.inventory_dao = InventoryDAO()
+    def __init__(self, backend: Optional[str] = None):
+        """
+        初始化DAO管理器（DAO实例与连接池在首次使用时才创建）
+
+        Args:
+            backend: DAO后端（mysql/sqlite/memory），默认读取 DB_BACKEND 配置
+        """
+        self._backend = backend.lower() if backend else None
+        self._daos: Optional[Dict[str, object]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """DAO后端名称"""
+        if self._backend is None:
+            self._backend = db_config_manager.get_backend().lower()
+        return self._backend
+
+    @property
+    def daos(self) -> Dict[str, object]:
+        """全部DAO实例（首次访问时按后端创建）"""
+        if self._daos is None:
+            with self._lock:
+                if self._daos is None:
+                    self._daos = self._create_daos(self.backend)
+        return self._daos
+
+    @staticmethod
+    def _create_daos(backend: str) -> Dict[str, object]:
+        """按后端名称创建DAO集合"""
+        if backend == 'mysql':
+            return create_sql_daos()
+        if backend == 'sqlite':
+            from database.sqlite_connection_pool import get_sqlite_pool
+            return create_sql_daos(get_sqlite_pool())
+        if backend == 'memory':
+            from .memory import create_memory_daos
+            return create_memory_daos()
+        raise ValueError(f"不支持的DAO后端: {backend}，可选: {', '.join(DAO_BACKENDS)}")
+
+    def is_configured(self) -> bool:
+        """检查当前后端是否已配置（mysql 需要连接参数，其他后端无需配置）"""
+        if self.backend != 'mysql':
+            return True
+        return bool(db_config_manager.is_configured())
+
+    def is_available(self) -> bool:
+        """检查当前后端是否可用（内存后端始终可用）"""
+        if self.backend == 'memory':
+            return True
+        if self.backend == 'sqlite':
+            return self.player.pool.test_connection()
+        return bool(db_config_manager.is_configured()) and self.player.pool.test_connection()
+
+    def is_healthy(self) -> bool:
+        """
+        按连接池熔断器实时判断数据库是否可用（不发起连接）；
+        没有熔断器的后端（memory、sqlite）始终视为可用
+        """
+        is_healthy = getattr(self.player.pool, 'is_healthy', None)
+        return is_healthy() if is_healthy else True
+
+    def probe(self) -> bool:
+        """
+        供后台任务定期调用：熔断器非正常状态且已到探测时间时发起一次探测连接，
+        正常状态下不访问数据库
+
+        Returns:
+            数据库当前是否可用
+        """
+        breaker = getattr(self.player.pool, 'breaker', None)
+        if breaker is None or breaker.state == 'closed':
+            return True
+        if not breaker.available:
+            return False
+        return self.is_available()
+
+    def verify_schema(self, auto_migrate: Optional[bool] = None) -> bool:
+        """
+        检查DAO依赖的新增列与唯一键（memory 后端无需检查），缺失时按 DB_AUTO_MIGRATE 自动迁移或抛出异常
+
+        Raises:
+            SchemaMismatchError: 表结构缺失且未开启自动迁移
+        """
+        if self.backend == 'memory':
+            return True
+        from database.migrations import ensure_schema
+        ensure_schema(self.inventory.pool, auto_migrate)
+        return True
+
+    def batch_writes(self):
+        """
+        批量写入上下文：支持的后端（sqlite）将块内写操作合并为一个事务提交，
+        其他后端按原方式逐条执行
+        """
+        batch_writes = getattr(self.player.pool, 'batch_writes', None)
+        return batch_writes() if batch_writes else nullcontext()
 
     # 玩家相关DAO
     @property
     def player(self) -> PlayerDAO:
         """玩家DAO"""
-        return self.player_dao
+        return self.daos['player']
 
     # 武器属性相关DAO
     @property
     def weapon_attribute(self) -> WeaponAttributeDAO:
         """武器属性DAO"""
-        return self.weapon_attribute_dao
+        return self.daos['weapon_attribute']
 
     # 装备属性相关DAO
     @property
     def equipment_attribute(self) -> EquipmentAttributeDAO:
         """装备属性DAO（武器防具通用）"""
-        return self.equipment_attribute_dao
+        return self.daos['equipment_attribute']
 
     # 游戏存档相关DAO
     @property
     def game_save(self) -> GameSaveDAO:
         """游戏存档DAO"""
-        return self.game_save_dao
+        return self.daos['game_save']
 
     # 装备相关DAO
     @property
     def equipment(self) -> EquipmentDAO:
         """装备DAO"""
-        return self.equipment_dao
+        return self.daos['equipment']
 
     # 楼层相关DAO
     @property
     def floor(self) -> FloorDAO:
         """楼层DAO"""
-        return self.floor_dao
+        return self.daos['floor']
 
     # 物品相关DAO
     @property
     def item(self) -> ItemDAO:
         """物品DAO"""
-        return self.item_dao
+        return self.daos['item']
 
     # 商人相关DAO
     @property
     def merchant(self) -> MerchantDAO:
         """商人DAO"""
-        return self.merchant_dao
+        return self.daos['merchant']
 
     # 商人库存相关DAO
     @property
     def merchant_inventory(self) -> MerchantInventoryDAO:
         """商人库存DAO"""
-        return self.merchant_inventory_dao
+        return self.daos['merchant_inventory']
 
     # 会话相关DAO
     @property
     def session(self) -> SessionDAO:
         """会话DAO"""
-        return self.session_dao
+        return self.daos['session']
 
     # 登录日志相关DAO
     @property
     def login_log(self) -> LoginLogDAO:
         """登录日志DAO"""
-        return self.login_log_dao
+        return self.daos['login_log']
 
     # 背包道具相关DAO
     @property
     def inventory(self) -> InventoryDAO:
         """背包道具DAO"""
-        return self.inventory_dao
+        return self.daos['inventory']
+
+    # 兼容旧属性名（xxx_dao）
+    player_dao = player
+    weapon_attribute_dao = weapon_attribute
+    equipment_attribute_dao = equipment_attribute
+    game_save_dao = game_save
+    equipment_dao = equipment
+    floor_dao = floor
+    item_dao = item
+    merchant_dao = merchant
+    merchant_inventory_dao = merchant_inventory
+    session_dao = session
+    login_log_dao = login_log
+    inventory_dao = inventory
 
     def get_all_daos(self):
         """获取所有DAO实例"""
-        return {
-            'player': self.player_dao,
-            'weapon_attribute': self.weapon_attribute_dao,
-            'equipment_attribute': self.equipment_attribute_dao,
-            'game_save': self.game_save_dao,
-            'equipment': self.equipment_dao,
-            'floor': self.floor_dao,
-            'item': self.item_dao,
-            'merchant': self.merchant_dao,
-            'merchant_inventory': self.merchant_inventory_dao,
-            'session': self.session_dao,
-            'login_log': self.login_log_dao,
-            'inventory': self.inventory_dao
-        }
+        return dict(self.daos)
 
     def close_all_connections(self):
         """关闭所有DAO的数据库连接"""
@@ -130,7 +244,7 @@ class DAOManager:
                 dao.close_connection()
 
 
-# 全局DAO管理器实例
+# 全局DAO管理器实例（延迟创建DAO）
 dao_manager = DAOManager()
 
 
@@ -148,6 +262,7 @@ __all__ = [
     'SessionDAO',
     'LoginLogDAO',
     'InventoryDAO',
+    'DAO_BACKENDS',
     'DAOManager',
     'dao_manager'
 ]
\ No newline at end of file
@@ -3,18 +3,39 @@
 提供数据库操作的通用接口和基础功能
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from database.simple_connection_pool import connection_pool
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
+from database.simple_connection_pool import get_connection_pool
+from database.instrumentation import instrument_pool
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=512)
+def expand_in_placeholders(query: str, count: int) -> str:
+    """
+    展开SQL模板中的 {placeholders} 为 count 个占位符（按模板与长度缓存）
+
+    Args:
+        query: 含 {placeholders} 的SQL模板
+        count: 占位符个数
+    """
+    return query.format(placeholders=', '.join(['%s'] * count))
+
+
 class BaseDAO(ABC):
     """数据访问对象基类"""
 
-    def __init__(self):
-        self.pool = connection_pool
+    # IN列表单条语句的最大参数个数（超出时分批执行）
+    IN_CHUNK_SIZE = 500
+
+    def __init__(self, pool=None):
+        """
+        Args:
+            pool: 连接池，默认使用全局MySQL连接池（统一包装执行监控）
+        """
+        self.pool = instrument_pool(pool or get_connection_pool())
 
     @abstractmethod
     def create(self, data: Dict[str, Any]) -> int:
@@ -53,12 +74,30 @@ class BaseDAO(ABC):
         self.pool.execute_batch(query, params_list)
         return len(params_list)
 
+    def execute_transaction(self, statements: Sequence[Tuple[str, tuple]]) -> List[int]:
+        """在一个事务中依次执行多条语句，返回各语句影响行数"""
+        return self.pool.execute_transaction(statements)
+
+    @staticmethod
+    def chunked(values: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+        """按固定大小切分列表"""
+        for start in range(0, len(values), size):
+            yield values[start:start + size]
+
     def exists(self, table: str, condition: str, params: tuple = ()) -> bool:
         """检查记录是否存在"""
         query = f"SELECT COUNT(*) as count FROM {table} WHERE {condition}"
         result = self.execute_query(query, params)
         return result[0]['count'] > 0 if result else False
 
+    def get_id_bounds(self, table: str) -> tuple:
+        """获取表的主键范围 (最小ID, 最大ID)，空表返回 (0, 0)"""
+        query = f"SELECT MIN(id) as min_id, MAX(id) as max_id FROM {table}"
+        result = self.execute_query(query)
+        if not result or result[0]['max_id'] is None:
+            return 0, 0
+        return result[0]['min_id'], result[0]['max_id']
+
     def get_max_id(self, table: str, id_column: str = 'id') -> int:
         """获取表中最大ID"""
         query = f"SELECT MAX({id_column}) as max_id FROM {table}"
@@ -4,6 +4,7 @@
 """
 from typing import List, Dict, Any, Optional
 from database.dao.base_dao import BaseDAO
+from database.migrations import SchemaMismatchError
 from database.models import PlayerInventoryModel
 import logging
 
@@ -13,6 +14,19 @@ logger = logging.getLogger(__name__)
 class InventoryDAO(BaseDAO):
     """玩家背包道具数据访问对象"""
 
+    # upsert与条件扣减依赖的唯一键（缺失时重复行会被插入与重复扣减）
+    UNIQUE_KEY = ('player_id', 'item_name')
+    _unique_key_verified = False
+
+    def _require_unique_key(self):
+        """确认 (player_id, item_name) 唯一键存在（确认后缓存），缺失时拒绝写入"""
+        if self._unique_key_verified:
+            return
+        if not self.pool.has_unique_key('player_inventory', self.UNIQUE_KEY):
+            raise SchemaMismatchError("player_inventory 缺少 (player_id, item_name) 唯一键，"
+                                      "请执行 python -m database.migrations")
+        self._unique_key_verified = True
+
     # 实现抽象方法
     def create(self, data: Dict[str, Any]) -> int:
         """创建道具记录"""
@@ -53,26 +67,21 @@ class InventoryDAO(BaseDAO):
         return self.execute_update(query, (record_id,)) > 0
 
     def add_item(self, player_id: int, item_name: str, quantity: int = 1) -> int:
-        """添加道具到背包"""
-        # 检查是否已存在该道具
-        existing = self.get_item(player_id, item_name)
-        if existing:
-            # 更新数量
-            new_quantity = existing['quantity'] + quantity
-            query = """
-            UPDATE player_inventory
-            SET quantity = %s, updated_at = NOW()
-            WHERE id = %s
-            """
-            self.execute_update(query, (new_quantity, existing['id']))
-            return existing['id']
-        else:
-            # 创建新记录
-            query = """
-            INSERT INTO player_inventory (player_id, item_name, quantity, created_at, updated_at)
-            VALUES (%s, %s, %s, NOW(), NOW())
-            """
-            return self.execute_insert(query, (player_id, item_name, quantity))
+        """
+        添加道具到背包（单条upsert，已存在时累加数量）
+
+        依赖 player_inventory 上 (player_id, item_name) 唯一键，返回道具记录ID
+        """
+        self._require_unique_key()
+        query = """
+        INSERT INTO player_inventory (player_id, item_name, quantity, created_at, updated_at)
+        VALUES (%s, %s, %s, NOW(), NOW())
+        ON DUPLICATE KEY UPDATE
+            id = LAST_INSERT_ID(id),
+            quantity = quantity + VALUES(quantity),
+            updated_at = NOW()
+        """
+        return self.execute_insert(query, (player_id, item_name, quantity))
 
     def get_item(self, player_id: int, item_name: str) -> Optional[Dict[str, Any]]:
         """获取玩家指定的道具"""
@@ -94,56 +103,91 @@ class InventoryDAO(BaseDAO):
         return self.execute_query(query, (player_id,))
 
     def consume_item(self, player_id: int, item_name: str, quantity: int = 1) -> bool:
-        """消耗道具"""
+        """消耗道具（条件原子扣减，数量不足时不修改并返回False）"""
         try:
-            item = self.get_item(player_id, item_name)
-            if not item or item['quantity'] < quantity:
+            self._require_unique_key()
+            query = """
+            UPDATE player_inventory
+            SET quantity = quantity - %s, updated_at = NOW()
+            WHERE player_id = %s AND item_name = %s AND quantity >= %s
+            """
+            if self.execute_update(query, (quantity, player_id, item_name, quantity)) == 0:
                 return False
 
-            new_quantity = item['quantity'] - quantity
-            if new_quantity <= 0:
-                # 数量为0，删除记录
-                query = "DELETE FROM player_inventory WHERE id = %s"
-                return self.execute_update(query, (item['id'],)) > 0
-            else:
-                # 更新数量
-                query = """
-                UPDATE player_inventory
-                SET quantity = %s, updated_at = NOW()
-                WHERE id = %s
-                """
-                return self.execute_update(query, (new_quantity, item['id'])) > 0
+            # 数量扣为0的记录直接删除
+            self._delete_empty_item(player_id, item_name)
+            return True
         except Exception as e:
             logger.error(f"消耗道具失败: {e}")
             return False
 
+    def _delete_empty_item(self, player_id: int, item_name: str) -> int:
+        """删除数量为0的道具记录"""
+        query = """
+        DELETE FROM player_inventory
+        WHERE player_id = %s AND item_name = %s AND quantity <= 0
+        """
+        return self.execute_update(query, (player_id, item_name))
+
     def update_item_quantity(self, player_id: int, item_name: str, quantity: int) -> bool:
-        """更新道具数量"""
+        """更新道具数量（数量<=0时删除，不存在时创建）"""
         try:
+            self._require_unique_key()
             if quantity <= 0:
-                # 删除道具
-                item = self.get_item(player_id, item_name)
-                if item:
-                    return self.delete(item['id'])
+                query = "DELETE FROM player_inventory WHERE player_id = %s AND item_name = %s"
+                self.execute_update(query, (player_id, item_name))
                 return True
-            else:
-                # 更新数量
-                item = self.get_item(player_id, item_name)
-                if item:
-                    query = """
-                    UPDATE player_inventory
-                    SET quantity = %s, updated_at = NOW()
-                    WHERE id = %s
-                    """
-                    return self.execute_update(query, (quantity, item['id'])) > 0
-                else:
-                    # 创建新记录
-                    self.add_item(player_id, item_name, quantity)
-                    return True
+
+            query = """
+            INSERT INTO player_inventory (player_id, item_name, quantity, created_at, updated_at)
+            VALUES (%s, %s, %s, NOW(), NOW())
+            ON DUPLICATE KEY UPDATE
+                quantity = VALUES(quantity),
+                updated_at = NOW()
+            """
+            self.execute_update(query, (player_id, item_name, quantity))
+            return True
         except Exception as e:
             logger.error(f"更新道具数量失败: {e}")
             return False
 
+    def replace_inventory(self, player_id: int, items: Dict[str, int]) -> bool:
+        """
+        用给定的 {道具名: 数量} 整体替换玩家背包
+
+        一条多行upsert写入全部道具，再删除字典中不存在的道具；两条语句在同一连接的
+        一个事务中执行，失败时整体回滚，不会留下新旧混合的背包。
+        """
+        try:
+            self._require_unique_key()
+            items = {item_name: quantity for item_name, quantity in items.items() if quantity > 0}
+            if not items:
+                self.clear_inventory(player_id)
+                return True
+
+            rows = ', '.join(['(%s, %s, %s, NOW(), NOW())'] * len(items))
+            params = tuple(value for item_name, quantity in items.items()
+                           for value in (player_id, item_name, quantity))
+            upsert_query = f"""
+            INSERT INTO player_inventory (player_id, item_name, quantity, created_at, updated_at)
+            VALUES {rows}
+            ON DUPLICATE KEY UPDATE
+                quantity = VALUES(quantity),
+                updated_at = NOW()
+            """
+
+            placeholders = ', '.join(['%s'] * len(items))
+            delete_query = f"DELETE FROM player_inventory WHERE player_id = %s AND item_name NOT IN ({placeholders})"
+
+            self.execute_transaction([
+                (upsert_query, params),
+                (delete_query, (player_id, *items)),
+            ])
+            return True
+        except Exception as e:
+            logger.error(f"替换背包失败: {e}")
+            return False
+
     def transfer_item(self, from_player_id: int, to_player_id: int, item_name: str, quantity: int) -> bool:
         """转移道具（用于交易等场景）"""
         try:
@@ -75,6 +75,28 @@ class LoginLogDAO(BaseDAO):
         """
         return self.execute_insert(query, data)
 
+    def create_logs(self, logs: List[Dict[str, Any]]) -> int:
+        """
+        批量创建登录日志
+
+        Args:
+            logs: 日志行列表，每行包含 player_id/username/ip_address/user_agent/login_type/reason/created_at
+
+        Returns:
+            写入条数
+        """
+        if not logs:
+            return 0
+
+        query = """
+        INSERT INTO login_logs (
+            player_id, username, ip_address, user_agent, login_type, reason, created_at
+        ) VALUES (
+            %(player_id)s, %(username)s, %(ip_address)s, %(user_agent)s, %(login_type)s, %(reason)s, %(created_at)s
+        )
+        """
+        return self.execute_batch(query, logs)
+
     def get_player_login_logs(self, player_id: int, limit: int = 50) -> List[Dict[str, Any]]:
         """获取玩家的登录日志"""
         query = """
@@ -167,6 +189,24 @@ class LoginLogDAO(BaseDAO):
         """
         return self.execute_update(query, (days,))
 
+    def get_old_log_max_id(self, days: int = 90) -> int:
+        """获取超过保留期的日志中的最大ID（分批清理的上界），没有则返回0"""
+        query = """
+        SELECT MAX(id) as max_id FROM login_logs
+        WHERE created_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+        """
+        result = self.execute_query(query, (days,))
+        return result[0]['max_id'] or 0 if result else 0
+
+    def delete_old_logs_in_range(self, start_id: int, end_id: int, days: int = 90) -> int:
+        """删除主键区间 [start_id, end_id) 内超过保留期的日志"""
+        query = """
+        DELETE FROM login_logs
+        WHERE id >= %s AND id < %s
+        AND created_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+        """
+        return self.execute_update(query, (start_id, end_id, days))
+
     def get_player_last_login(self, player_id: int) -> Optional[Dict[str, Any]]:
         """获取玩家最后登录信息"""
         query = """
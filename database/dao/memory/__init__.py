@@ -0,0 +1,59 @@
+"""
+内存DAO后端
+与SQL DAO行为一致的纯内存实现，用于测试、基准测试与无数据库模式
+"""
+from typing import Dict, Optional
+
+from .store import MemoryDatabase, MemoryTable
+from .daos import (
+    MemoryPlayerDAO, MemoryWeaponAttributeDAO, MemoryEquipmentAttributeDAO,
+    MemoryGameSaveDAO, MemoryEquipmentDAO, MemoryFloorDAO, MemoryItemDAO,
+    MemoryMerchantDAO, MemoryMerchantInventoryDAO, MemorySessionDAO,
+    MemoryLoginLogDAO, MemoryInventoryDAO
+)
+
+
+def create_memory_daos(database: Optional[MemoryDatabase] = None) -> Dict[str, object]:
+    """
+    创建共享同一内存数据库的全部DAO
+
+    Args:
+        database: 内存数据库，默认新建
+
+    Returns:
+        {DAO名称: DAO实例}，键与 DAOManager.get_all_daos() 一致
+    """
+    database = database or MemoryDatabase()
+    return {
+        'player': MemoryPlayerDAO(database),
+        'weapon_attribute': MemoryWeaponAttributeDAO(database),
+        'equipment_attribute': MemoryEquipmentAttributeDAO(database),
+        'game_save': MemoryGameSaveDAO(database),
+        'equipment': MemoryEquipmentDAO(database),
+        'floor': MemoryFloorDAO(database),
+        'item': MemoryItemDAO(database),
+        'merchant': MemoryMerchantDAO(database),
+        'merchant_inventory': MemoryMerchantInventoryDAO(database),
+        'session': MemorySessionDAO(database),
+        'login_log': MemoryLoginLogDAO(database),
+        'inventory': MemoryInventoryDAO(database)
+    }
+
+
+__all__ = [
+    'MemoryDatabase',
+    'MemoryTable',
+    'MemoryPlayerDAO',
+    'MemoryWeaponAttributeDAO',
+    'MemoryEquipmentAttributeDAO',
+    'MemoryGameSaveDAO',
+    'MemoryEquipmentDAO',
+    'MemoryFloorDAO',
+    'MemoryItemDAO',
+    'MemoryMerchantDAO',
+    'MemoryMerchantInventoryDAO',
+    'MemorySessionDAO',
+    'MemoryLoginLogDAO',
+    'MemoryInventoryDAO',
+    'create_memory_daos'
+]
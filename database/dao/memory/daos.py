@@ -0,0 +1,1035 @@
+"""
+内存DAO实现
+逐一覆盖SQL DAO中直接执行SQL的方法，其余组合方法沿用父类逻辑，
+保证返回值、排序与影响行数语义与MySQL实现一致。
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from database.dao.player_dao import PlayerDAO
+from database.dao.weapon_attribute_dao import WeaponAttributeDAO
+from database.dao.equipment_attribute_dao import EquipmentAttributeDAO
+from database.dao.game_save_dao import GameSaveDAO
+from database.dao.equipment_dao import EquipmentDAO
+from database.dao.floor_dao import FloorDAO
+from database.dao.item_dao import ItemDAO
+from database.dao.merchant_dao import MerchantDAO
+from database.dao.merchant_inventory_dao import MerchantInventoryDAO
+from database.dao.session_dao import SessionDAO
+from database.dao.login_log_dao import LoginLogDAO
+from database.dao.inventory_dao import InventoryDAO
+from database.dao.memory.store import MemoryDatabase, MemoryTable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _by_created_at(row: Dict[str, Any]):
+    return row['created_at']
+
+
+def _by_updated_at(row: Dict[str, Any]):
+    return row['updated_at']
+
+
+def _average(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+class MemoryDAOMixin:
+    """内存DAO公共实现（需放在SQL DAO之前继承）"""
+
+    table_name: str = ''
+
+    def __init__(self, database: MemoryDatabase):
+        self.pool = None
+        self.db = database
+
+    @property
+    def table(self) -> MemoryTable:
+        return self.db[self.table_name]
+
+    # 未迁移到内存实现的方法一旦执行SQL立即报错，避免静默返回错误结果
+    def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        raise NotImplementedError(f"内存后端不支持直接执行SQL: {query.strip()[:60]}")
+
+    def execute_update(self, query: str, params: tuple = ()) -> int:
+        raise NotImplementedError(f"内存后端不支持直接执行SQL: {query.strip()[:60]}")
+
+    def execute_insert(self, query: str, data: dict = None) -> int:
+        raise NotImplementedError(f"内存后端不支持直接执行SQL: {query.strip()[:60]}")
+
+    def execute_batch(self, query: str, params_list: List[tuple]) -> int:
+        raise NotImplementedError(f"内存后端不支持直接执行SQL: {query.strip()[:60]}")
+
+    def execute_transaction(self, statements: List[tuple]) -> List[int]:
+        raise NotImplementedError("内存后端不支持直接执行SQL事务")
+
+    def exists(self, table: str, condition: str, params: tuple = ()) -> bool:
+        raise NotImplementedError("内存后端不支持SQL条件表达式")
+
+    def get_max_id(self, table: str, id_column: str = 'id') -> int:
+        with self.db.lock:
+            return max((row[id_column] for row in self.db[table].rows.values()), default=0)
+
+    def get_id_bounds(self, table: str) -> tuple:
+        with self.db.lock:
+            ids = self.db[table].rows.keys()
+            return (min(ids), max(ids)) if ids else (0, 0)
+
+    # ---------- 通用单表操作 ----------
+
+    def get_by_id(self, record_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.get(record_id)
+
+    def update(self, record_id: int, data: Dict[str, Any]) -> bool:
+        values = {key: value for key, value in data.items() if key != 'id'}
+        if not values:
+            return False
+        with self.db.lock:
+            return self.table.update_by_id(record_id, values) > 0
+
+    def delete(self, record_id: int) -> bool:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['id'] == record_id) > 0
+
+    def _insert_columns(self, data: Dict[str, Any], columns: List[str]) -> int:
+        """按SQL中列出的列插入（缺少参数时与命名参数格式化一样抛出KeyError）"""
+        values = {column: data[column] for column in columns}
+        with self.db.lock:
+            return self.table.insert(values)
+
+
+# ==================== 玩家 ====================
+
+class MemoryPlayerDAO(MemoryDAOMixin, PlayerDAO):
+    """玩家DAO内存实现"""
+
+    table_name = 'players'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        columns = ['name', 'hp', 'max_hp', 'attack', 'defense', 'level', 'exp', 'gold']
+        columns += [column for column in ('password_hash', 'salt', 'nickname') if column in data]
+        return self._insert_columns(data, columns)
+
+    def _first(self, **conditions) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: all(row.get(key) == value for key, value in conditions.items()),
+                limit=1
+            )
+        return rows[0] if rows else None
+
+    def exists_by_name(self, name: str) -> bool:
+        return self._first(name=name) is not None
+
+    def get_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        return self._first(name=username)
+
+    def get_by_nickname(self, nickname: str) -> Optional[Dict[str, Any]]:
+        return self._first(nickname=nickname)
+
+    def _update_one(self, player_id: int, changes, touch: bool = False) -> bool:
+        with self.db.lock:
+            return self.table.update_where(lambda row: row['id'] == player_id, changes, touch) > 0
+
+    def update_last_login(self, player_id: int) -> bool:
+        return self._update_one(player_id, lambda row: {'last_login': datetime.now()})
+
+    def increment_login_attempts(self, player_id: int) -> bool:
+        return self._update_one(player_id, lambda row: {'login_attempts': (row.get('login_attempts') or 0) + 1})
+
+    def reset_login_attempts(self, player_id: int) -> bool:
+        return self._update_one(player_id, lambda row: {'login_attempts': 0, 'locked_until': None})
+
+    def lock_account(self, player_id: int, lock_hours: int = 1) -> bool:
+        return self._update_one(
+            player_id, lambda row: {'locked_until': datetime.now() + timedelta(hours=lock_hours)}
+        )
+
+    def update_password(self, player_id: int, password_hash: str, salt: str) -> bool:
+        return self._update_one(player_id, lambda row: {'password_hash': password_hash, 'salt': salt}, touch=True)
+
+    def get_active_sessions_count(self, player_id: int) -> int:
+        now = datetime.now()
+        with self.db.lock:
+            return len(self.db['user_sessions'].select(
+                lambda row: row['player_id'] == player_id and row['is_active'] and row['expires_at'] > now
+            ))
+
+    def update_nickname(self, player_id: int, nickname: str) -> bool:
+        return self._update_one(player_id, lambda row: {'nickname': nickname}, touch=True)
+
+    def get_by_save_id(self, save_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            save = self.db['game_saves'].get(save_id)
+            return self.table.get(save['player_id']) if save else None
+
+    def get_latest_player(self) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(order_by=_by_created_at, reverse=True, limit=1)
+        return rows[0] if rows else None
+
+    def get_player_stats(self, player_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            player = self.table.get(player_id)
+            if not player:
+                return None
+            equipment_count = len(self.db['player_equipment'].select(lambda row: row['player_id'] == player_id))
+            inventory_count = len(self.db['player_inventory'].select(lambda row: row['player_id'] == player_id))
+            floor_count = len(self.db['saved_floors'].select(lambda row: row['player_id'] == player_id))
+
+        # 两个 LEFT JOIN 叠加后 COUNT 的结果是两侧行数的乘积
+        player['equipment_count'] = equipment_count * max(inventory_count, 1)
+        player['inventory_count'] = inventory_count * max(equipment_count, 1)
+        player['floor_count'] = floor_count
+        return player
+
+
+# ==================== 游戏存档 ====================
+
+class MemoryGameSaveDAO(MemoryDAOMixin, GameSaveDAO):
+    """游戏存档DAO内存实现"""
+
+    table_name = 'game_saves'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, ['player_id', 'floor_level', 'save_name', 'is_active'])
+
+    def _join_player(self, rows: List[Dict[str, Any]], with_level: bool = True) -> List[Dict[str, Any]]:
+        """INNER JOIN players：玩家不存在的存档被过滤"""
+        players = self.db['players']
+        joined = []
+        for row in rows:
+            player = players.rows.get(row['player_id'])
+            if player is None:
+                continue
+            row['player_name'] = player['name']
+            if with_level:
+                row['player_level'] = player['level']
+            joined.append(row)
+        return joined
+
+    def get_by_id(self, save_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self._join_player(self.table.select(lambda row: row['id'] == save_id))
+        return rows[0] if rows else None
+
+    def get_all_saves(self, player_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                (lambda row: row['player_id'] == player_id) if player_id else None,
+                order_by=_by_updated_at, reverse=True
+            )
+            return self._join_player(rows)
+
+    def get_latest_save(self, player_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                (lambda row: row['player_id'] == player_id) if player_id else None,
+                order_by=_by_updated_at, reverse=True
+            )
+            rows = self._join_player(rows, with_level=False)
+        return rows[0] if rows else None
+
+    def deactivate_all_saves(self, player_id: int) -> bool:
+        with self.db.lock:
+            return self.table.update_where(
+                lambda row: row['player_id'] == player_id, lambda row: {'is_active': False}, touch=False
+            ) > 0
+
+    def get_save_count(self, player_id: Optional[int] = None) -> int:
+        with self.db.lock:
+            return len(self.table.select((lambda row: row['player_id'] == player_id) if player_id else None))
+
+    def get_saves_by_floor_range(self, min_floor: int, max_floor: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: min_floor <= row['floor_level'] <= max_floor,
+                order_by=lambda row: (row['floor_level'], row['updated_at']), reverse=True
+            )
+            return self._join_player(rows)
+
+
+# ==================== 玩家装备 ====================
+
+class MemoryEquipmentDAO(MemoryDAOMixin, EquipmentDAO):
+    """玩家装备DAO内存实现"""
+
+    table_name = 'player_equipment'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, [
+            'player_id', 'equipment_type', 'item_name', 'attack_value',
+            'defense_value', 'rarity_level', 'is_equipped', 'slot_position'
+        ])
+
+    def get_by_player_id(self, player_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['player_id'] == player_id, order_by=_by_created_at)
+        # ORDER BY is_equipped DESC, created_at ASC
+        rows.sort(key=lambda row: not row['is_equipped'])
+        return rows
+
+    def get_equipped_by_player(self, player_id: int, equipment_type: str) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: (row['player_id'] == player_id and row['equipment_type'] == equipment_type
+                             and row['is_equipped']),
+                limit=1
+            )
+        return rows[0] if rows else None
+
+    def unequip_type(self, player_id: int, equipment_type: str) -> bool:
+        with self.db.lock:
+            return self.table.update_where(
+                lambda row: (row['player_id'] == player_id and row['equipment_type'] == equipment_type
+                             and row['is_equipped']),
+                lambda row: {'is_equipped': False}
+            ) > 0
+
+    def delete_by_player_id(self, player_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['player_id'] == player_id)
+
+    def get_equipment_stats(self, player_id: int) -> Dict[str, Any]:
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in self.get_by_player_id(player_id):
+            entry = stats.setdefault(row['equipment_type'], {'count': 0, 'equipped_count': 0})
+            entry['count'] += 1
+            entry['equipped_count'] += 1 if row['is_equipped'] else 0
+        return stats
+
+
+# ==================== 装备词条 ====================
+
+class MemoryWeaponAttributeDAO(MemoryDAOMixin, WeaponAttributeDAO):
+    """武器词条DAO内存实现"""
+
+    table_name = 'weapon_attributes'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, ['player_id', 'attribute_type', 'value', 'level', 'description'])
+
+    def update(self, attribute_id: int, data: Dict[str, Any]) -> bool:
+        values = {key: value for key, value in data.items() if key != 'id'}
+        if not values:
+            return False
+        with self.db.lock:
+            return self.table.update_by_id(attribute_id, values, touch=False) > 0
+
+    def get_by_player_id(self, player_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['player_id'] == player_id, order_by=lambda row: row['id'])
+
+    def delete_by_player_id(self, player_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['player_id'] == player_id)
+
+    def create_player_attributes(self, player_id: int, attributes: List[Dict[str, Any]]) -> List[int]:
+        if not attributes:
+            return []
+
+        with self.db.lock:
+            for attr in attributes:
+                self.table.insert({
+                    'player_id': player_id,
+                    'attribute_type': attr.get('attribute_type'),
+                    'value': attr.get('value'),
+                    'level': attr.get('level', 0),
+                    'description': attr.get('description', '')
+                })
+
+        return list(range(len(attributes)))
+
+    def get_attribute_stats(self, player_id: int) -> Dict[str, Any]:
+        values_by_type = defaultdict(list)
+        for row in self.get_by_player_id(player_id):
+            values_by_type[row['attribute_type']].append(row['value'])
+
+        return {
+            attribute_type: {
+                'count': len(values),
+                'avg_value': _average(values),
+                'max_value': max(values),
+                'min_value': min(values)
+            }
+            for attribute_type, values in values_by_type.items()
+        }
+
+
+class MemoryEquipmentAttributeDAO(MemoryDAOMixin, EquipmentAttributeDAO):
+    """装备词条DAO内存实现（与武器词条共用 weapon_attributes 表）"""
+
+    table_name = 'weapon_attributes'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, ['player_id', 'attribute_type', 'value', 'level', 'description'])
+
+    def create_for_equipment(self, data: Dict[str, Any]) -> int:
+        columns = ['player_id', 'attribute_type', 'value', 'level', 'description']
+        if 'equipment_type' in data:
+            columns.append('equipment_type')
+        return self._insert_columns(data, columns)
+
+    def get_by_player(self, player_id: int, equipment_type: str = None) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['player_id'] == player_id, order_by=lambda row: row['id'])
+
+        if not equipment_type:
+            return rows
+
+        matched = [row for row in rows if row.get('equipment_type') == equipment_type]
+        if matched:
+            return matched
+
+        # 与SQL实现一致：按 equipment_type 查不到时按词条类型推断
+        if equipment_type not in ('weapon', 'armor'):
+            return []
+        from game_model import ATTRIBUTE_TYPES, ARMOR_ATTRIBUTE_TYPES
+        valid_types = ATTRIBUTE_TYPES if equipment_type == 'weapon' else ARMOR_ATTRIBUTE_TYPES
+        return [row for row in rows if row['attribute_type'] in valid_types]
+
+    def update(self, attribute_id: int, data: Dict[str, Any]) -> bool:
+        values = {key: value for key, value in data.items() if key != 'id'}
+        if not values:
+            return False
+        with self.db.lock:
+            return self.table.update_by_id(attribute_id, values, touch=False) > 0
+
+    def delete_by_player(self, player_id: int, equipment_type: str = None) -> bool:
+        if equipment_type:
+            return super().delete_by_player(player_id, equipment_type)
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['player_id'] == player_id) > 0
+
+
+# ==================== 背包 ====================
+
+class MemoryInventoryDAO(MemoryDAOMixin, InventoryDAO):
+    """背包道具DAO内存实现"""
+
+    table_name = 'player_inventory'
+
+    def add_item(self, player_id: int, item_name: str, quantity: int = 1) -> int:
+        with self.db.lock:
+            existing = self.get_item(player_id, item_name)
+            if existing:
+                new_quantity = existing['quantity'] + quantity
+                self.table.update_by_id(existing['id'], {'quantity': new_quantity})
+                return existing['id']
+            return self.table.insert({'player_id': player_id, 'item_name': item_name, 'quantity': quantity})
+
+    def get_item(self, player_id: int, item_name: str) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: row['player_id'] == player_id and row['item_name'] == item_name, limit=1
+            )
+        return rows[0] if rows else None
+
+    def get_player_inventory(self, player_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['player_id'] == player_id, order_by=_by_created_at)
+
+    def consume_item(self, player_id: int, item_name: str, quantity: int = 1) -> bool:
+        with self.db.lock:
+            item = self.get_item(player_id, item_name)
+            if not item or item['quantity'] < quantity:
+                return False
+
+            new_quantity = item['quantity'] - quantity
+            if new_quantity <= 0:
+                return self.table.delete_where(lambda row: row['id'] == item['id']) > 0
+            return self.table.update_by_id(item['id'], {'quantity': new_quantity}) > 0
+
+    def update_item_quantity(self, player_id: int, item_name: str, quantity: int) -> bool:
+        with self.db.lock:
+            item = self.get_item(player_id, item_name)
+            if quantity <= 0:
+                return self.delete(item['id']) if item else True
+            if item:
+                return self.table.update_by_id(item['id'], {'quantity': quantity}) > 0
+            self.add_item(player_id, item_name, quantity)
+            return True
+
+    def replace_inventory(self, player_id: int, items: Dict[str, int]) -> bool:
+        items = {item_name: quantity for item_name, quantity in items.items() if quantity > 0}
+        with self.db.lock:
+            for item_name, quantity in items.items():
+                self.update_item_quantity(player_id, item_name, quantity)
+            self.table.delete_where(lambda row: row['player_id'] == player_id and row['item_name'] not in items)
+        return True
+
+    def transfer_item(self, from_player_id: int, to_player_id: int, item_name: str, quantity: int) -> bool:
+        with self.db.lock:
+            return super().transfer_item(from_player_id, to_player_id, item_name, quantity)
+
+    def clear_inventory(self, player_id: int) -> bool:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['player_id'] == player_id) > 0
+
+    def get_inventory_summary(self, player_id: int) -> Dict[str, int]:
+        rows = self.get_player_inventory(player_id)
+        return {
+            'total_items': len(rows),
+            'total_quantity': sum(row['quantity'] for row in rows)
+        }
+
+    def get_items_by_type(self, player_id: int, item_type: str) -> List[Dict[str, Any]]:
+        keyword = item_type.lower()
+        return [row for row in self.get_player_inventory(player_id) if keyword in row['item_name'].lower()]
+
+
+# ==================== 楼层 ====================
+
+class MemoryFloorDAO(MemoryDAOMixin, FloorDAO):
+    """楼层DAO内存实现"""
+
+    table_name = 'saved_floors'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, [
+            'save_id', 'floor_level', 'width', 'height', 'player_start_x',
+            'player_start_y', 'stairs_x', 'stairs_y', 'is_merchant_floor'
+        ])
+
+    def get_floors_by_save(self, save_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['save_id'] == save_id,
+                                     order_by=lambda row: row['floor_level'])
+
+    def get_by_save_id(self, save_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['save_id'] == save_id,
+                                     order_by=lambda row: row['floor_level'], reverse=True, limit=1)
+        return rows[0] if rows else None
+
+    def get_by_save_and_level(self, save_id: int, floor_level: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: row['save_id'] == save_id and row['floor_level'] == floor_level, limit=1
+            )
+        return rows[0] if rows else None
+
+    def delete_by_save_id(self, save_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['save_id'] == save_id)
+
+    def get_floor_stats(self, save_id: int) -> Dict[str, Any]:
+        rows = self.get_floors_by_save(save_id)
+        levels = [row['floor_level'] for row in rows]
+        return {
+            'total_floors': len(rows),
+            'max_floor': max(levels, default=None),
+            'min_floor': min(levels, default=None),
+            'merchant_floors': sum(1 for row in rows if row['is_merchant_floor']) if rows else None
+        }
+
+    def get_max_floor_level(self, save_id: int) -> int:
+        return max((row['floor_level'] for row in self.get_floors_by_save(save_id)), default=0)
+
+
+# ==================== 楼层物品 ====================
+
+class MemoryItemDAO(MemoryDAOMixin, ItemDAO):
+    """楼层物品DAO内存实现"""
+
+    table_name = 'floor_items'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, [
+            'floor_id', 'item_type', 'item_name', 'symbol', 'effect_type',
+            'effect_value', 'position_x', 'position_y', 'rarity_level'
+        ])
+
+    def get_by_floor_id(self, floor_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['floor_id'] == floor_id,
+                                     order_by=lambda row: (row['position_y'], row['position_x']))
+
+    def save_floor_items(self, floor_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        if not items:
+            return []
+
+        with self.db.lock:
+            for item in items:
+                self.table.insert({
+                    'floor_id': floor_id,
+                    'item_type': item.get('item_type', 'item'),
+                    'item_name': item.get('name', ''),
+                    'symbol': item.get('symbol', '+'),
+                    'effect_type': item.get('effect_type', ''),
+                    'effect_value': item.get('effect_value', 0),
+                    'position_x': item.get('position', {}).get('x', 0),
+                    'position_y': item.get('position', {}).get('y', 0),
+                    'rarity_level': item.get('rarity', 'common')
+                })
+
+        return list(range(len(items)))
+
+    def delete_by_floor_id(self, floor_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['floor_id'] == floor_id)
+
+    def get_items_by_position(self, floor_id: int, x: int, y: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(
+                lambda row: row['floor_id'] == floor_id and row['position_x'] == x and row['position_y'] == y
+            )
+
+    def get_item_stats(self, floor_id: int) -> Dict[str, Any]:
+        values_by_key = defaultdict(list)
+        for row in self.get_by_floor_id(floor_id):
+            values_by_key[f"{row['item_type']}_{row['effect_type']}"].append(row['effect_value'])
+
+        return {
+            key: {'count': len(values), 'avg_value': _average(values)}
+            for key, values in values_by_key.items()
+        }
+
+
+# ==================== 商人 ====================
+
+class MemoryMerchantDAO(MemoryDAOMixin, MerchantDAO):
+    """商人DAO内存实现"""
+
+    table_name = 'floor_merchants'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, ['floor_id', 'merchant_name', 'merchant_type', 'is_active'])
+
+    def get_by_floor_id(self, floor_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['floor_id'] == floor_id and row['is_active'], limit=1)
+        return rows[0] if rows else None
+
+    def delete_by_floor_id(self, floor_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['floor_id'] == floor_id)
+
+    def get_merchant_stats(self, floor_id: Optional[int] = None) -> Dict[str, Any]:
+        with self.db.lock:
+            rows = self.table.select((lambda row: row['floor_id'] == floor_id) if floor_id else None)
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            entry = stats.setdefault(row['merchant_type'], {'count': 0, 'active_count': 0})
+            entry['count'] += 1
+            entry['active_count'] += 1 if row['is_active'] else 0
+        return stats
+
+    def get_all_merchants(self, is_active_only: bool = True) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            floors = self.db['saved_floors'].rows
+            merchants = []
+            for row in self.table.select(lambda row: row['is_active'] or not is_active_only):
+                floor = floors.get(row['floor_id'])
+                if floor is None:
+                    continue
+                row['floor_level'] = floor['floor_level']
+                row['save_id'] = floor['save_id']
+                merchants.append(row)
+
+        merchants.sort(key=lambda row: row['floor_level'])
+        return merchants
+
+
+class MemoryMerchantInventoryDAO(MemoryDAOMixin, MerchantInventoryDAO):
+    """商人库存DAO内存实现"""
+
+    table_name = 'merchant_inventories'
+
+    def create(self, data: Dict[str, Any]) -> int:
+        return self._insert_columns(data, [
+            'merchant_id', 'item_name', 'item_type', 'quantity', 'price',
+            'rarity_level', 'effect_type', 'effect_value'
+        ])
+
+    def get_by_id(self, inventory_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            row = self.table.get(inventory_id)
+            if row is None:
+                return None
+            merchant = self.db['floor_merchants'].rows.get(row['merchant_id'])
+            row['merchant_name'] = merchant['merchant_name'] if merchant else None
+            return row
+
+    def _select_merchant(self, merchant_id: int, where=None, order_by=None) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(
+                lambda row: row['merchant_id'] == merchant_id and (where is None or where(row)),
+                order_by=order_by
+            )
+
+    def _active_floor_merchants(self, floor_id: int) -> Dict[int, Dict[str, Any]]:
+        return {
+            merchant_id: merchant
+            for merchant_id, merchant in self.db['floor_merchants'].rows.items()
+            if merchant['floor_id'] == floor_id and merchant['is_active']
+        }
+
+    def get_by_merchant_id(self, merchant_id: int) -> List[Dict[str, Any]]:
+        return self._select_merchant(merchant_id, order_by=lambda row: (row['item_type'], row['item_name']))
+
+    def get_by_floor_id(self, floor_id: int) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            merchants = self._active_floor_merchants(floor_id)
+            return self.table.select(lambda row: row['merchant_id'] in merchants,
+                                     order_by=lambda row: (row['item_type'], row['item_name']))
+
+    def save_merchant_inventory(self, merchant_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        if not items:
+            return []
+
+        with self.db.lock:
+            self.delete_by_merchant_id(merchant_id)
+            for item in items:
+                self.table.insert({
+                    'merchant_id': merchant_id,
+                    'item_name': item.get('name', ''),
+                    'item_type': item.get('type', 'item'),
+                    'quantity': item.get('quantity', 1),
+                    'price': item.get('price', 10),
+                    'rarity_level': item.get('rarity', 'common'),
+                    'effect_type': item.get('effect_type', ''),
+                    'effect_value': item.get('effect_value', 0)
+                })
+
+        return list(range(len(items)))
+
+    def delete_by_merchant_id(self, merchant_id: int) -> int:
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['merchant_id'] == merchant_id)
+
+    def decrease_quantity(self, inventory_id: int, amount: int = 1) -> bool:
+        with self.db.lock:
+            return self.table.update_where(
+                lambda row: row['id'] == inventory_id and row['quantity'] >= amount,
+                lambda row: {'quantity': max(0, row['quantity'] - amount)}
+            ) > 0
+
+    def increase_quantity(self, inventory_id: int, amount: int = 1) -> bool:
+        with self.db.lock:
+            return self.table.update_where(
+                lambda row: row['id'] == inventory_id,
+                lambda row: {'quantity': row['quantity'] + amount}
+            ) > 0
+
+    def get_by_item_type(self, merchant_id: int, item_type: str) -> List[Dict[str, Any]]:
+        return self._select_merchant(
+            merchant_id, lambda row: row['item_type'] == item_type and row['quantity'] > 0,
+            order_by=lambda row: row['price']
+        )
+
+    def get_by_rarity(self, merchant_id: int, rarity_level: str) -> List[Dict[str, Any]]:
+        return self._select_merchant(
+            merchant_id, lambda row: row['rarity_level'] == rarity_level and row['quantity'] > 0,
+            order_by=lambda row: row['price']
+        )
+
+    def get_available_items(self, merchant_id: int) -> List[Dict[str, Any]]:
+        return self._select_merchant(
+            merchant_id, lambda row: row['quantity'] > 0,
+            order_by=lambda row: (row['item_type'], row['price'])
+        )
+
+    def get_inventory_stats(self, merchant_id: int) -> Dict[str, Any]:
+        rows_by_type = defaultdict(list)
+        for row in self._select_merchant(merchant_id):
+            rows_by_type[row['item_type']].append(row)
+
+        stats = {}
+        total_items = 0
+        total_value = 0
+
+        for item_type, rows in rows_by_type.items():
+            prices = [row['price'] for row in rows]
+            total_quantity = sum(row['quantity'] for row in rows)
+            avg_price = _average(prices)
+            stats[item_type] = {
+                'item_count': len(rows),
+                'total_quantity': total_quantity,
+                'avg_price': float(avg_price) if avg_price else 0,
+                'min_price': min(prices),
+                'max_price': max(prices)
+            }
+            total_items += len(rows)
+            total_value += total_quantity * (avg_price or 0)
+
+        stats['_total'] = {
+            'item_count': total_items,
+            'total_value': total_value
+        }
+
+        return stats
+
+    def get_merchant_all_items(self, floor_id: int) -> List[Dict[str, Any]]:
+        columns = ('id', 'item_name', 'item_type', 'quantity', 'price',
+                   'rarity_level', 'effect_type', 'effect_value')
+        with self.db.lock:
+            merchants = self._active_floor_merchants(floor_id)
+            rows = self.table.select(lambda row: row['merchant_id'] in merchants and row['quantity'] > 0,
+                                     order_by=lambda row: (row['item_type'], row['price']))
+
+        items = []
+        for row in rows:
+            merchant = merchants[row['merchant_id']]
+            item = {column: row[column] for column in columns}
+            item['merchant_name'] = merchant['merchant_name']
+            item['merchant_type'] = merchant['merchant_type']
+            items.append(item)
+        return items
+
+    def find_items_by_name(self, merchant_id: int, item_name: str) -> List[Dict[str, Any]]:
+        keyword = item_name.lower()
+        return self._select_merchant(
+            merchant_id, lambda row: keyword in row['item_name'].lower() and row['quantity'] > 0,
+            order_by=lambda row: row['price']
+        )
+
+    def get_price_range_items(self, merchant_id: int, min_price: int, max_price: int) -> List[Dict[str, Any]]:
+        return self._select_merchant(
+            merchant_id, lambda row: min_price <= row['price'] <= max_price and row['quantity'] > 0,
+            order_by=lambda row: row['price']
+        )
+
+
+# ==================== 会话 ====================
+
+class MemorySessionDAO(MemoryDAOMixin, SessionDAO):
+    """用户会话DAO内存实现"""
+
+    table_name = 'user_sessions'
+
+    def create_session(self, player_id: int, session_token: str,
+                       expires_at: datetime, websocket_session_id: str = None,
+                       ip_address: str = None, user_agent: str = None) -> int:
+        with self.db.lock:
+            return self.table.insert({
+                'player_id': player_id,
+                'session_token': session_token,
+                'websocket_session_id': websocket_session_id,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'expires_at': expires_at
+            })
+
+    def _join_player_name(self, rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """INNER JOIN players 取第一行"""
+        players = self.db['players'].rows
+        for row in rows:
+            player = players.get(row['player_id'])
+            if player is not None:
+                row['player_name'] = player['name']
+                return row
+        return None
+
+    def _is_live(self, row: Dict[str, Any], now: datetime) -> bool:
+        return bool(row['is_active']) and row['expires_at'] > now
+
+    def get_by_token(self, session_token: str) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['session_token'] == session_token and row['is_active'])
+            return self._join_player_name(rows)
+
+    def get_active_sessions_by_player(self, player_id: int) -> List[Dict[str, Any]]:
+        now = datetime.now()
+        with self.db.lock:
+            return self.table.select(lambda row: row['player_id'] == player_id and self._is_live(row, now),
+                                     order_by=_by_created_at, reverse=True)
+
+    def _update_sessions(self, where, changes) -> int:
+        with self.db.lock:
+            return self.table.update_where(where, changes, touch=False)
+
+    def update_websocket_session(self, session_id: int, websocket_session_id: str) -> bool:
+        return self._update_sessions(lambda row: row['id'] == session_id,
+                                     lambda row: {'websocket_session_id': websocket_session_id}) > 0
+
+    def deactivate_session(self, session_id: int) -> bool:
+        return self._update_sessions(lambda row: row['id'] == session_id,
+                                     lambda row: {'is_active': False, 'revoked_at': datetime.now()}) > 0
+
+    def deactivate_session_by_token(self, session_token: str) -> bool:
+        return self._update_sessions(lambda row: row['session_token'] == session_token,
+                                     lambda row: {'is_active': False, 'revoked_at': datetime.now()}) > 0
+
+    def deactivate_all_player_sessions(self, player_id: int) -> int:
+        return self._update_sessions(lambda row: row['player_id'] == player_id,
+                                     lambda row: {'is_active': False, 'revoked_at': datetime.now()})
+
+    def extend_session(self, session_token: str, hours: int = 24) -> bool:
+        return self._update_sessions(
+            lambda row: row['session_token'] == session_token and row['is_active'],
+            lambda row: {'expires_at': row['expires_at'] + timedelta(hours=hours)}
+        ) > 0
+
+    def cleanup_expired_sessions(self) -> int:
+        now = datetime.now()
+        return self._update_sessions(lambda row: row['expires_at'] < now or not row['is_active'],
+                                     lambda row: {'is_active': False})
+
+    def expire_sessions_in_range(self, start_id: int, end_id: int) -> int:
+        now = datetime.now()
+        return self._update_sessions(
+            lambda row: start_id <= row['id'] < end_id and row['is_active'] and row['expires_at'] < now,
+            lambda row: {'is_active': False})
+
+    def delete_stale_sessions_in_range(self, start_id: int, end_id: int, days: int = 7) -> int:
+        cutoff = datetime.now() - timedelta(days=days)
+        with self.db.lock:
+            return self.table.delete_where(lambda row: start_id <= row['id'] < end_id and row['expires_at'] < cutoff)
+
+    def get_revoked_sessions(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = datetime.now()
+
+        def revoked(row: Dict[str, Any]) -> bool:
+            if since is None:
+                return not row['is_active']
+            return row['revoked_at'] is not None and row['revoked_at'] >= since
+
+        with self.db.lock:
+            return [
+                {'player_id': row['player_id'], 'session_token': row['session_token'], 'expires_at': row['expires_at']}
+                for row in self.table.select(lambda row: revoked(row) and row['expires_at'] > now)
+            ]
+
+    def get_session_count_by_player(self, player_id: int) -> int:
+        return len(self.get_active_sessions_by_player(player_id))
+
+    def is_session_valid(self, session_token: str) -> bool:
+        now = datetime.now()
+        with self.db.lock:
+            return bool(self.table.select(
+                lambda row: row['session_token'] == session_token and self._is_live(row, now), limit=1
+            ))
+
+    def get_session_by_websocket_id(self, websocket_session_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.now()
+        with self.db.lock:
+            rows = self.table.select(
+                lambda row: row['websocket_session_id'] == websocket_session_id and self._is_live(row, now)
+            )
+            return self._join_player_name(rows)
+
+
+# ==================== 登录日志 ====================
+
+class MemoryLoginLogDAO(MemoryDAOMixin, LoginLogDAO):
+    """登录日志DAO内存实现"""
+
+    table_name = 'login_logs'
+
+    def create_log(self, player_id: Optional[int], username: str,
+                   login_type: str, ip_address: str = None,
+                   user_agent: str = None, reason: str = None) -> int:
+        with self.db.lock:
+            return self.table.insert({
+                'player_id': player_id,
+                'username': username,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'login_type': login_type,
+                'reason': reason
+            })
+
+    def create_logs(self, logs: List[Dict[str, Any]]) -> int:
+        with self.db.lock:
+            for log in logs:
+                self.table.insert(dict(log))
+        return len(logs)
+
+    def _select_since(self, since: datetime, where=None) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['created_at'] >= since and (where is None or where(row)))
+
+    def get_player_login_logs(self, player_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            return self.table.select(lambda row: row['player_id'] == player_id,
+                                     order_by=_by_created_at, reverse=True, limit=limit)
+
+    def get_recent_failed_attempts(self, username: str, hours: int = 1) -> int:
+        return len(self._select_since(
+            datetime.now() - timedelta(hours=hours),
+            lambda row: row['username'] == username and row['login_type'] == 'failed'
+        ))
+
+    def get_ip_login_attempts(self, ip_address: str, minutes: int = 15) -> int:
+        return len(self._select_since(
+            datetime.now() - timedelta(minutes=minutes),
+            lambda row: row['ip_address'] == ip_address
+        ))
+
+    @staticmethod
+    def _summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'total_logins': len(rows),
+            'successful_logins': sum(1 for row in rows if row['login_type'] == 'success'),
+            'failed_logins': sum(1 for row in rows if row['login_type'] == 'failed'),
+            'registrations': sum(1 for row in rows if row['login_type'] == 'register'),
+            'unique_players': len({row['player_id'] for row in rows if row['player_id'] is not None})
+        }
+
+    def get_login_statistics(self, days: int = 30) -> Dict[str, Any]:
+        rows = self._select_since(datetime.now() - timedelta(days=days))
+        stats = self._summarize(rows)
+        stats['unique_ips'] = len({row['ip_address'] for row in rows if row['ip_address'] is not None})
+        return stats
+
+    def get_daily_login_stats(self, days: int = 7) -> List[Dict[str, Any]]:
+        rows_by_date = defaultdict(list)
+        for row in self._select_since(datetime.now() - timedelta(days=days)):
+            rows_by_date[row['created_at'].date()].append(row)
+
+        return [
+            dict(date=day, **self._summarize(rows))
+            for day, rows in sorted(rows_by_date.items(), reverse=True)
+        ]
+
+    def get_suspicious_activities(self, hours: int = 24) -> List[Dict[str, Any]]:
+        groups = defaultdict(list)
+        for row in self._select_since(datetime.now() - timedelta(hours=hours),
+                                      lambda row: row['login_type'] == 'failed'):
+            groups[(row['username'], row['ip_address'])].append(row)
+
+        activities = []
+        for (username, ip_address), rows in groups.items():
+            if len(rows) < 3:
+                continue
+            reasons = list(dict.fromkeys(row['reason'] for row in rows if row['reason'] is not None))
+            activities.append({
+                'username': username,
+                'ip_address': ip_address,
+                'failed_attempts': len(rows),
+                'last_attempt': max(row['created_at'] for row in rows),
+                'failure_reasons': ','.join(reasons) if reasons else None
+            })
+
+        activities.sort(key=lambda item: (item['failed_attempts'], item['last_attempt']), reverse=True)
+        return activities
+
+    def cleanup_old_logs(self, days: int = 90) -> int:
+        cutoff = datetime.now() - timedelta(days=days)
+        with self.db.lock:
+            return self.table.delete_where(lambda row: row['created_at'] < cutoff)
+
+    def get_old_log_max_id(self, days: int = 90) -> int:
+        cutoff = datetime.now() - timedelta(days=days)
+        with self.db.lock:
+            return max((row['id'] for row in self.table.rows.values() if row['created_at'] < cutoff), default=0)
+
+    def delete_old_logs_in_range(self, start_id: int, end_id: int, days: int = 90) -> int:
+        cutoff = datetime.now() - timedelta(days=days)
+        with self.db.lock:
+            return self.table.delete_where(lambda row: start_id <= row['id'] < end_id and row['created_at'] < cutoff)
+
+    def get_player_last_login(self, player_id: int) -> Optional[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.table.select(lambda row: row['player_id'] == player_id and row['login_type'] == 'success',
+                                     order_by=_by_created_at, reverse=True, limit=1)
+        return rows[0] if rows else None
+
+    def is_account_locked(self, username: str) -> bool:
+        return self.get_recent_failed_attempts(username, 1) >= 5
@@ -0,0 +1,129 @@
+"""
+内存数据存储
+按表保存行字典，提供自增主键、列默认值、时间戳维护与按条件读写
+"""
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from database.schema import TABLE_MODELS, TIMESTAMP_COLUMNS, get_column_defaults, get_table_columns
+
+Row = Dict[str, Any]
+RowFilter = Callable[[Row], bool]
+
+
+class MemoryTable:
+    """单张内存表（调用方负责加锁）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.columns = set(get_table_columns(name))
+        self.defaults = get_column_defaults(name)
+        self.has_updated_at = 'updated_at' in self.columns
+        self.rows: Dict[int, Row] = {}
+        self.next_id = 1
+
+    def _check_columns(self, columns: Iterable[str]):
+        """未知列与MySQL一样直接报错"""
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown:
+            raise ValueError(f"表 {self.name} 不存在列: {', '.join(unknown)}")
+
+    def insert(self, data: Row) -> int:
+        """插入一行，返回新主键"""
+        self._check_columns(data)
+        now = datetime.now()
+        row = dict(self.defaults)
+        for column in TIMESTAMP_COLUMNS:
+            if column in self.columns:
+                row[column] = now
+        row.update(data)
+        record_id = self.next_id
+        self.next_id += 1
+        row['id'] = record_id
+        self.rows[record_id] = row
+        return record_id
+
+    def get(self, record_id: int) -> Optional[Row]:
+        """按主键获取行副本"""
+        row = self.rows.get(record_id)
+        return dict(row) if row is not None else None
+
+    def select(self, where: Optional[RowFilter] = None, order_by: Optional[Callable[[Row], Any]] = None,
+               reverse: bool = False, limit: Optional[int] = None) -> List[Row]:
+        """
+        按条件查询行副本
+
+        Args:
+            where: 行过滤函数
+            order_by: 排序键函数（相同键按主键排序，结果稳定）
+            reverse: 是否降序
+            limit: 返回行数上限
+        """
+        rows = [row for row in self.rows.values() if where is None or where(row)]
+        if order_by is not None:
+            rows.sort(key=lambda row: (order_by(row), row['id']), reverse=reverse)
+        if limit is not None:
+            rows = rows[:limit]
+        return [dict(row) for row in rows]
+
+    def update_where(self, where: RowFilter, changes: Callable[[Row], Row], touch: bool = True) -> int:
+        """
+        按条件更新行
+
+        Args:
+            where: 行过滤函数
+            changes: 根据旧行计算新列值的函数
+            touch: 是否同时刷新 updated_at（对应SQL中的 updated_at = NOW()）
+
+        Returns:
+            实际发生变化的行数（与MySQL的 affected rows 一致）
+        """
+        affected = 0
+        now = datetime.now()
+        for row in self.rows.values():
+            if not where(row):
+                continue
+            new_values = changes(row)
+            self._check_columns(new_values)
+            if touch and self.has_updated_at:
+                new_values = dict(new_values, updated_at=now)
+            if any(row.get(key) != value for key, value in new_values.items()):
+                row.update(new_values)
+                affected += 1
+        return affected
+
+    def update_by_id(self, record_id: int, values: Row, touch: bool = True) -> int:
+        """按主键更新行"""
+        if record_id not in self.rows:
+            return 0
+        return self.update_where(lambda row: row['id'] == record_id, lambda row: values, touch)
+
+    def delete_where(self, where: RowFilter) -> int:
+        """按条件删除行，返回删除行数"""
+        matched = [record_id for record_id, row in self.rows.items() if where(row)]
+        for record_id in matched:
+            del self.rows[record_id]
+        return len(matched)
+
+    def clear(self):
+        """清空表并重置自增主键"""
+        self.rows.clear()
+        self.next_id = 1
+
+
+class MemoryDatabase:
+    """内存数据库：所有表共用一把可重入锁，DAO方法内的复合操作在锁内完成"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables: Dict[str, MemoryTable] = {name: MemoryTable(name) for name in TABLE_MODELS}
+
+    def __getitem__(self, table: str) -> MemoryTable:
+        return self.tables[table]
+
+    def clear(self):
+        """清空所有表"""
+        with self.lock:
+            for table in self.tables.values():
+                table.clear()
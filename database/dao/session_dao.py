@@ -107,17 +107,17 @@ class SessionDAO(BaseDAO):
 
     def deactivate_session(self, session_id: int) -> bool:
         """停用会话"""
-        query = "UPDATE user_sessions SET is_active = FALSE WHERE id = %s"
+        query = "UPDATE user_sessions SET is_active = FALSE, revoked_at = NOW() WHERE id = %s"
         return self.execute_update(query, (session_id,)) > 0
 
     def deactivate_session_by_token(self, session_token: str) -> bool:
         """根据令牌停用会话"""
-        query = "UPDATE user_sessions SET is_active = FALSE WHERE session_token = %s"
+        query = "UPDATE user_sessions SET is_active = FALSE, revoked_at = NOW() WHERE session_token = %s"
         return self.execute_update(query, (session_token,)) > 0
 
     def deactivate_all_player_sessions(self, player_id: int) -> int:
         """停用玩家的所有会话"""
-        query = "UPDATE user_sessions SET is_active = FALSE WHERE player_id = %s"
+        query = "UPDATE user_sessions SET is_active = FALSE, revoked_at = NOW() WHERE player_id = %s"
         return self.execute_update(query, (player_id,))
 
     def extend_session(self, session_token: str, hours: int = 24) -> bool:
@@ -138,6 +138,47 @@ class SessionDAO(BaseDAO):
         """
         return self.execute_update(query)
 
+    def expire_sessions_in_range(self, start_id: int, end_id: int) -> int:
+        """停用主键区间 [start_id, end_id) 内已过期的活跃会话"""
+        query = """
+        UPDATE user_sessions
+        SET is_active = FALSE
+        WHERE id >= %s AND id < %s AND is_active = TRUE AND expires_at < NOW()
+        """
+        return self.execute_update(query, (start_id, end_id))
+
+    def delete_stale_sessions_in_range(self, start_id: int, end_id: int, days: int = 7) -> int:
+        """删除主键区间 [start_id, end_id) 内过期超过指定天数的会话"""
+        query = """
+        DELETE FROM user_sessions
+        WHERE id >= %s AND id < %s
+        AND expires_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+        """
+        return self.execute_update(query, (start_id, end_id, days))
+
+    def get_revoked_sessions(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        获取已停用但尚未过期的会话（用于同步内存吊销列表）
+
+        Args:
+            since: 只取该时间及之后吊销的会话（按 revoked_at 索引增量读取）；
+                   为None时全量读取，包括迁移前停用、revoked_at 为空的会话
+        """
+        if since is None:
+            query = """
+            SELECT player_id, session_token, expires_at
+            FROM user_sessions
+            WHERE is_active = FALSE AND expires_at > NOW()
+            """
+            return self.execute_query(query)
+
+        query = """
+        SELECT player_id, session_token, expires_at
+        FROM user_sessions
+        WHERE revoked_at >= %s AND expires_at > NOW()
+        """
+        return self.execute_query(query, (since,))
+
     def get_session_count_by_player(self, player_id: int) -> int:
         """获取玩家的会话数量"""
         query = """
@@ -0,0 +1,262 @@
+"""
+SQL执行监控
+包装连接池的 execute_* 方法：按归一化语句统计次数与耗时、记录慢查询（参数脱敏），
+并通过上下文变量把查询次数归属到当前处理的WebSocket命令，便于发现N+1查询
+"""
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 慢查询阈值（毫秒）
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '100'))
+# 单个命令的查询次数超过该值时告警（疑似N+1）
+REQUEST_QUERY_WARN = int(os.getenv('DB_REQUEST_QUERY_WARN', '20'))
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\?|:\w+')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_VALUES_ROWS = re.compile(r'(\(\?(?:, \?)*(?:, NOW\(\))*\))(?:\s*,\s*\1)+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(query: str) -> str:
+    """
+    归一化SQL语句：去掉字面量与多余空白，占位符统一为 ?，
+    IN列表与多行VALUES折叠为一组，使同类语句聚合到同一统计项
+    """
+    statement = _WHITESPACE.sub(' ', query).strip()
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _VALUES_ROWS.sub(r'\1', statement)
+    return _PLACEHOLDER_LIST.sub('(?...)', statement)
+
+
+def redact_params(params: Any) -> Any:
+    """参数脱敏：只保留类型与长度信息"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact_params(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        if len(params) > 10:
+            return f"<{len(params)} params>"
+        return [redact_params(value) for value in params]
+    if isinstance(params, (str, bytes)):
+        return f"<{type(params).__name__}:{len(params)}>"
+    return f"<{type(params).__name__}>"
+
+
+@dataclass
+class StatementStats:
+    """单类语句的累计统计"""
+    count: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def record(self, elapsed: float, failed: bool):
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        if failed:
+            self.errors += 1
+
+
+@dataclass
+class CommandStats:
+    """按命令累计的查询统计"""
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    total_time: float = 0.0
+
+
+@dataclass
+class RequestQueryStats:
+    """单次命令处理期间的查询统计"""
+    name: str
+    count: int = 0
+    total_time: float = 0.0
+    statements: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, elapsed: float):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated_statements(self, threshold: int = 2) -> List[str]:
+        """同一语句执行多次的列表（N+1的典型特征）"""
+        return [statement for statement, count in self.statements.items() if count >= threshold]
+
+
+# 当前命令的查询统计（asyncio.to_thread 会复制上下文，线程内执行的查询同样计入）
+current_request: ContextVar[Optional[RequestQueryStats]] = ContextVar('current_request', default=None)
+
+
+class QueryMonitor:
+    """全局查询统计"""
+
+    def __init__(self):
+        self._stats: Dict[str, StatementStats] = {}
+        self._command_stats: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, query: str, params: Any, elapsed: float, failed: bool):
+        """记录一次语句执行"""
+        statement = normalize_statement(query)
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None:
+                stats = self._stats[statement] = StatementStats()
+            stats.record(elapsed, failed)
+
+        request = current_request.get()
+        if request is not None:
+            request.record(statement, elapsed)
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            command = f" [命令: {request.name}]" if request is not None else ''
+            logger.warning(f"慢查询 {elapsed * 1000:.1f}ms{command}: {statement} 参数: {redact_params(params)}")
+
+    def record_request(self, request: RequestQueryStats):
+        """按命令累计查询次数与耗时"""
+        with self._lock:
+            stats = self._command_stats.get(request.name)
+            if stats is None:
+                stats = self._command_stats[request.name] = CommandStats()
+            stats.requests += 1
+            stats.queries += request.count
+            stats.max_queries = max(stats.max_queries, request.count)
+            stats.total_time += request.total_time
+
+    def get_statement_stats(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """按累计耗时排序的语句统计"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+        return [{
+            'statement': statement,
+            'count': stats.count,
+            'errors': stats.errors,
+            'total_ms': stats.total_time * 1000,
+            'avg_ms': stats.total_time * 1000 / stats.count if stats.count else 0.0,
+            'max_ms': stats.max_time * 1000
+        } for statement, stats in items]
+
+    def get_command_stats(self) -> Dict[str, Dict[str, Any]]:
+        """按命令统计：处理次数、查询总数、平均/最多查询次数与累计耗时"""
+        with self._lock:
+            return {name: {
+                'requests': stats.requests,
+                'queries': stats.queries,
+                'avg_queries': stats.queries / stats.requests,
+                'max_queries': stats.max_queries,
+                'total_ms': stats.total_time * 1000
+            } for name, stats in self._command_stats.items()}
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+            self._command_stats.clear()
+
+
+# 全局查询监控实例
+query_monitor = QueryMonitor()
+
+
+@contextmanager
+def track_request(name: str):
+    """
+    将块内执行的SQL归属到指定命令
+
+    Args:
+        name: 命令名（如WebSocket消息的 cmd/action）
+    """
+    request = RequestQueryStats(name)
+    token = current_request.set(request)
+    try:
+        yield request
+    finally:
+        current_request.reset(token)
+        if request.count:
+            query_monitor.record_request(request)
+            if request.count >= REQUEST_QUERY_WARN:
+                logger.warning(f"命令 {name} 执行了 {request.count} 条SQL，重复语句: {request.repeated_statements()}")
+            else:
+                logger.debug(f"命令 {name}: {request.count} 条SQL，耗时 {request.total_time * 1000:.1f}ms")
+
+
+class InstrumentedPool:
+    """为连接池的 execute_* 方法计时，其余属性透传给被包装的连接池"""
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def __getattr__(self, name: str):
+        return getattr(self._pool, name)
+
+    def _timed(self, method, query: str, params: Any):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return method(query, params)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            query_monitor.record(query, params, time.perf_counter() - started, failed)
+
+    def execute_query(self, query: str, params: tuple = None) -> list:
+        return self._timed(self._pool.execute_query, query, params)
+
+    def execute_update(self, query: str, params: tuple = None) -> int:
+        return self._timed(self._pool.execute_update, query, params)
+
+    def execute_insert(self, query: str, data: dict = None) -> int:
+        return self._timed(self._pool.execute_insert, query, data)
+
+    def execute_batch(self, query: str, params_list: list) -> None:
+        return self._timed(self._pool.execute_batch, query, params_list)
+
+    def execute_transaction(self, statements: list) -> list:
+        # 整个事务按拼接后的语句计为一项
+        started = time.perf_counter()
+        failed = False
+        try:
+            return self._pool.execute_transaction(statements)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            query = '; '.join(query for query, _ in statements)
+            params = [params for _, params in statements]
+            query_monitor.record(query, params, time.perf_counter() - started, failed)
+
+
+_instrumented: Dict[int, InstrumentedPool] = {}
+_instrumented_lock = threading.Lock()
+
+
+def instrument_pool(pool):
+    """获取连接池的监控包装（同一连接池共享一个包装实例，重复包装直接返回）"""
+    if isinstance(pool, InstrumentedPool):
+        return pool
+    with _instrumented_lock:
+        wrapper = _instrumented.get(id(pool))
+        if wrapper is None:
+            wrapper = _instrumented[id(pool)] = InstrumentedPool(pool)
+        return wrapper
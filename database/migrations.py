@@ -0,0 +1,181 @@
+"""
+数据库结构迁移
+把已有的数据库升级到DAO依赖的表结构（新增列、唯一键等），各迁移幂等，可重复执行
+
+用法:
+    python -m database.migrations           # 检查并执行缺失的迁移
+    python -m database.migrations --check   # 只检查，缺失时以非0状态退出
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import List, Optional, Tuple
+
+from database.schema import UNIQUE_KEYS
+
+logger = logging.getLogger(__name__)
+
+# 启动时发现缺失的唯一键是否自动迁移（默认只报错，由运维执行迁移）
+AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', '0') == '1'
+
+# 后续版本新增的列（表名 -> ((列名, 列定义), ...)），迁移时同时按 idx_<表>_<列> 建立索引（供增量读取）
+ADDED_COLUMNS = {
+    'user_sessions': (('revoked_at', 'DATETIME NULL DEFAULT NULL'),),
+}
+
+# 合并重复行时需要求和的列（其余列保留ID最小的一行）
+MERGE_SUM_COLUMNS = {
+    'player_inventory': ('quantity',),
+}
+
+
+class SchemaMismatchError(RuntimeError):
+    """数据库缺少DAO依赖的表结构"""
+
+
+def unique_key_name(table: str, columns: Tuple[str, ...]) -> str:
+    """唯一键名称（与SQLite建表时的索引名一致）"""
+    return f"uk_{table}_{'_'.join(columns)}"
+
+
+def find_missing_columns(pool) -> List[Tuple[str, str, str]]:
+    """
+    检查 ADDED_COLUMNS 中的新增列
+
+    Args:
+        pool: 连接池（需提供 has_column）
+
+    Returns:
+        缺失的 (表名, 列名, 列定义) 列表
+    """
+    return [(table, column, definition)
+            for table, columns in ADDED_COLUMNS.items()
+            for column, definition in columns
+            if not pool.has_column(table, column)]
+
+
+def add_column(pool, table: str, column: str, definition: str):
+    """
+    添加新增列及其索引
+
+    Args:
+        pool: 连接池
+        table: 表名
+        column: 列名
+        definition: 列定义
+    """
+    pool.execute_update(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    pool.execute_update(f"CREATE INDEX idx_{table}_{column} ON {table} ({column})")
+    logger.info(f"{table} 已添加列 {column} 及索引")
+
+
+def find_missing_unique_keys(pool) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    检查 database.schema.UNIQUE_KEYS 中声明的唯一键
+
+    Args:
+        pool: 连接池（需提供 has_unique_key）
+
+    Returns:
+        缺失的 (表名, 列) 列表
+    """
+    return [(table, columns)
+            for table, keys in UNIQUE_KEYS.items()
+            for columns in keys
+            if not pool.has_unique_key(table, columns)]
+
+
+def add_unique_key(pool, table: str, columns: Tuple[str, ...]) -> int:
+    """
+    合并重复行后添加唯一键（MySQL）
+
+    同一唯一键的多行保留ID最小的一行，MERGE_SUM_COLUMNS 中的列取各行之和，其余行删除；
+    合并在一个事务中完成，随后执行 ALTER TABLE。合并与加键之间若有新的重复写入，
+    ALTER TABLE 会因重复键失败，重新执行即可。
+
+    Args:
+        pool: MySQL连接池
+        table: 表名
+        columns: 唯一键列
+
+    Returns:
+        删除的重复行数
+    """
+    key_columns = ', '.join(columns)
+    sum_columns = MERGE_SUM_COLUMNS.get(table, ())
+    duplicates = (f"SELECT {key_columns}, MIN(id) AS keep_id"
+                  + ''.join(f", SUM({column}) AS merged_{column}" for column in sum_columns)
+                  + f" FROM {table} GROUP BY {key_columns} HAVING COUNT(*) > 1")
+
+    statements = []
+    if sum_columns:
+        assignments = ', '.join(f"t.{column} = d.merged_{column}" for column in sum_columns)
+        statements.append((f"UPDATE {table} t JOIN ({duplicates}) d ON t.id = d.keep_id SET {assignments}", ()))
+    join_condition = ' AND '.join(f"t.{column} = d.{column}" for column in columns)
+    statements.append((f"DELETE t FROM {table} t JOIN ({duplicates}) d "
+                       f"ON {join_condition} AND t.id <> d.keep_id", ()))
+
+    removed = pool.execute_transaction(statements)[-1]
+    pool.execute_update(f"ALTER TABLE {table} ADD UNIQUE KEY {unique_key_name(table, columns)} ({key_columns})")
+    logger.info(f"{table} 已添加唯一键 ({key_columns})，合并删除重复行 {removed} 条")
+    return removed
+
+
+def describe_missing(pool) -> List[str]:
+    """列出缺失的表结构（用于报错与 --check 输出）"""
+    return ([f"列 {table}.{column}" for table, column, _ in find_missing_columns(pool)]
+            + [f"唯一键 {table}({', '.join(columns)})" for table, columns in find_missing_unique_keys(pool)])
+
+
+def ensure_schema(pool, auto_migrate: Optional[bool] = None) -> List[str]:
+    """
+    确认DAO依赖的新增列与唯一键存在
+
+    Args:
+        pool: 连接池
+        auto_migrate: 缺失时是否自动迁移，默认读取 DB_AUTO_MIGRATE
+
+    Returns:
+        本次迁移的表结构说明列表
+
+    Raises:
+        SchemaMismatchError: 表结构缺失且未开启自动迁移
+    """
+    if auto_migrate is None:
+        auto_migrate = AUTO_MIGRATE
+
+    missing = describe_missing(pool)
+    if missing and not auto_migrate:
+        raise SchemaMismatchError(f"数据库缺少: {', '.join(missing)}；请执行 python -m database.migrations "
+                                  f"或设置 DB_AUTO_MIGRATE=1")
+
+    for table, column, definition in find_missing_columns(pool):
+        add_column(pool, table, column, definition)
+    for table, columns in find_missing_unique_keys(pool):
+        add_unique_key(pool, table, columns)
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据库结构迁移')
+    parser.add_argument('--check', action='store_true', help='只检查，不执行迁移')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from database.simple_connection_pool import get_connection_pool
+    pool = get_connection_pool()
+
+    if args.check:
+        missing = describe_missing(pool)
+        for item in missing:
+            logger.error(f"缺少{item}")
+        sys.exit(1 if missing else 0)
+
+    migrated = ensure_schema(pool, auto_migrate=True)
+    logger.info(f"迁移完成，共 {len(migrated)} 项" + (f": {', '.join(migrated)}" if migrated else ''))
+
+
+if __name__ == '__main__':
+    main()
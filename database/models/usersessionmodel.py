@@ -30,6 +30,7 @@ class UserSessionModel(BaseModel):
     ip_address: str = None
     user_agent: str = None
     is_active: Optional[int] = 1
+    revoked_at: Optional[datetime] = None
 
     # 用户自定义方法保护区域
     # === USER_CUSTOM_METHODS_START ===
@@ -112,6 +113,10 @@ class UserSessionModel(BaseModel):
         if self.is_active is not None:
             if not isinstance(self.is_active, int) or isinstance(self.is_active, bool):
                 errors.append("会话状态必须是整数")
+        # revoked_at 类型验证
+        if self.revoked_at is not None:
+            if not isinstance(self.revoked_at, datetime):
+                errors.append("会话吊销时间必须是日期时间对象")
         return errors
 
     def _validate_field_constraints(self) -> List[str]:
@@ -159,6 +164,10 @@ class UserSessionModel(BaseModel):
         if self.is_active is not None:
             # 整数类型不需要范围验证
             pass
+        # revoked_at 约束验证
+        if self.revoked_at is not None:
+            # datetime类型不需要长度验证
+            pass
         return errors
 
     def _validate_foreign_keys(self) -> List[str]:
@@ -199,7 +208,7 @@ class UserSessionModel(BaseModel):
             'valid': len(errors) == 0,
             'error_count': len(errors),
             'errors': errors,
-            'field_count': 9,
+            'field_count': 10,
             'required_fields': ['player_id','session_token','expires_at',],
             'foreign_keys': []
         }
@@ -280,3 +289,4 @@ class UserSessionModel(BaseModel):
         # created_at 数据清理
         # expires_at 数据清理
         # is_active 数据清理
+        # revoked_at 数据清理
@@ -0,0 +1,69 @@
+"""
+数据表结构描述
+表名与自动生成实体类的对应关系，供非MySQL后端推导列与默认值
+"""
+from dataclasses import MISSING, fields
+from typing import Any, Dict, List, Tuple, Type, Union, get_args, get_origin
+
+from database.models import (
+    FloorItemModel, FloorMerchantModel, GameSaveModel, LoginLogModel,
+    MerchantInventorieModel, PlayerEquipmentModel, PlayerInventoryModel,
+    PlayerModel, SavedFloorModel, UserSessionModel, UserSettingModel,
+    WeaponAttributeModel
+)
+
+# 表名 -> 实体类
+TABLE_MODELS: Dict[str, Type] = {
+    'players': PlayerModel,
+    'game_saves': GameSaveModel,
+    'player_equipment': PlayerEquipmentModel,
+    'player_inventory': PlayerInventoryModel,
+    'weapon_attributes': WeaponAttributeModel,
+    'saved_floors': SavedFloorModel,
+    'floor_items': FloorItemModel,
+    'floor_merchants': FloorMerchantModel,
+    'merchant_inventories': MerchantInventorieModel,
+    'user_sessions': UserSessionModel,
+    'login_logs': LoginLogModel,
+    'user_settings': UserSettingModel,
+}
+
+# 唯一键（upsert语句依赖；MySQL需对应建立 UNIQUE KEY）
+UNIQUE_KEYS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    'player_inventory': (('player_id', 'item_name'),),
+}
+
+# 由数据库自动维护的时间戳列
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')
+
+
+def get_table_columns(table: str) -> List[str]:
+    """获取表的全部列名（按实体类字段顺序）"""
+    return [field.name for field in fields(TABLE_MODELS[table])]
+
+
+def get_column_defaults(table: str) -> Dict[str, Any]:
+    """
+    获取表的列默认值
+
+    没有默认值的列（NOT NULL 且无 DEFAULT）不包含在结果中；
+    主键与时间戳列由存储层自行生成，同样不包含。
+    """
+    defaults = {}
+    for field in fields(TABLE_MODELS[table]):
+        if field.name == 'id' or field.name in TIMESTAMP_COLUMNS:
+            continue
+        if field.default is not MISSING:
+            defaults[field.name] = field.default
+    return defaults
+
+
+def get_column_types(table: str) -> Dict[str, type]:
+    """获取表的列类型（Optional[X] 展开为 X）"""
+    types = {}
+    for field in fields(TABLE_MODELS[table]):
+        column_type = field.type
+        if get_origin(column_type) is Union:
+            column_type = next(arg for arg in get_args(column_type) if arg is not type(None))
+        types[field.name] = column_type
+    return types
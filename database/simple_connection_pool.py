@@ -4,18 +4,33 @@
 """
 import pymysql
 import logging
-from typing import Optional
+import threading
+from typing import List, Optional, Sequence, Tuple
 from contextlib import contextmanager
 from config.database_config import config_manager, DatabaseConfig
+from database.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
+# 表示连接不可用的MySQL错误码（连接失败、连接中断、连接数已满）
+CONNECTION_ERROR_CODES = {1040, 1053, 2002, 2003, 2005, 2006, 2013, 2055}
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """判断异常是否由连接不可用引起（区别于SQL错误、约束冲突等）"""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    if isinstance(error, pymysql.err.OperationalError):
+        return bool(error.args) and error.args[0] in CONNECTION_ERROR_CODES
+    return False
+
 
 class SimpleDatabaseConnectionPool:
     """简化的数据库连接池"""
 
     def __init__(self):
         self._config: Optional[DatabaseConfig] = None
+        self.breaker = CircuitBreaker('mysql')
         self._initialize_pool()
 
     def _initialize_pool(self):
@@ -28,37 +43,42 @@ class SimpleDatabaseConnectionPool:
             raise
 
     @contextmanager
-    def get_connection(self, max_retries: int = 2):
-        """获取数据库连接的上下文管理器，支持重试"""
-        for attempt in range(max_retries + 1):
-            conn = None
+    def get_connection(self):
+        """
+        获取数据库连接的上下文管理器
+
+        连接失败不在当前线程中睡眠重试，而是计入熔断器；熔断期间直接抛出 CircuitOpenError，
+        由熔断器在退避时间到期后放行探测请求自动恢复
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("数据库暂时不可用（熔断中）")
+
+        try:
+            conn = self._create_connection()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        try:
+            yield conn
+            self.breaker.record_success()
+        except Exception as e:
             try:
-                conn = self._create_connection()
-                yield conn
-                break  # 成功则退出重试循环
-            except Exception as e:
-                if conn:
-                    try:
-                        conn.rollback()
-                    except:
-                        pass
-
-                if attempt < max_retries:
-                    wait_time = (attempt + 1) * 2  # 2秒、4秒递增等待
-                    logger.warning(f"数据库连接失败 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
-                    logger.info(f"等待 {wait_time} 秒后重试...")
-                    import time
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"数据库操作失败，已达到最大重试次数: {e}")
-                    raise
-            finally:
-                if conn:
-                    try:
-                        conn.close()
-                        logger.debug("数据库连接已关闭")
-                    except:
-                        pass
+                conn.rollback()
+            except Exception:
+                pass
+            if _is_connection_error(e):
+                self.breaker.record_failure()
+            else:
+                # 数据库已正常响应（如约束冲突），连接本身健康
+                self.breaker.record_success()
+            raise
+        finally:
+            try:
+                conn.close()
+                logger.debug("数据库连接已关闭")
+            except Exception:
+                pass
 
     def _create_connection(self) -> pymysql.Connection:
         """创建新的数据库连接"""
@@ -82,38 +102,22 @@ class SimpleDatabaseConnectionPool:
             logger.error(f"创建数据库连接失败: {str(e)}")
             raise
 
-    def test_connection(self, max_retries: int = 2) -> bool:
-        """测试数据库连接是否可用，支持重试"""
-        for attempt in range(max_retries + 1):
-            try:
-                # 添加连接超时设置
-                conn = pymysql.Connect(
-                    host=self._config.host,
-                    port=self._config.port,
-                    user=self._config.user,
-                    password=self._config.password,
-                    database=self._config.database,
-                    charset=self._config.charset,
-                    autocommit=False,
-                    cursorclass=pymysql.cursors.DictCursor,
-                    connect_timeout=10,  # 10秒连接超时
-                    read_timeout=10,     # 10秒读取超时
-                    write_timeout=10     # 10秒写入超时
-                )
-                conn.close()
-                logger.info("数据库连接测试成功")
-                return True
-            except Exception as e:
-                if attempt < max_retries:
-                    wait_time = (attempt + 1) * 2
-                    logger.warning(f"数据库连接测试失败 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
-                    logger.info(f"等待 {wait_time} 秒后重试...")
-                    import time
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"数据库连接测试失败，已达到最大重试次数: {e}")
-                    return False
-        return False
+    def test_connection(self) -> bool:
+        """测试数据库连接是否可用（单次尝试，结果计入熔断器）"""
+        try:
+            with self.get_connection() as conn:
+                conn.ping(reconnect=False)
+            logger.info("数据库连接测试成功")
+            return True
+        except CircuitOpenError:
+            return False
+        except Exception as e:
+            logger.error(f"数据库连接测试失败: {e}")
+            return False
+
+    def is_healthy(self) -> bool:
+        """按熔断器状态判断数据库当前是否可用（不发起连接）"""
+        return self.breaker.available
 
     def execute_query(self, query: str, params: tuple = None) -> list:
         """执行查询"""
@@ -176,6 +180,60 @@ class SimpleDatabaseConnectionPool:
             finally:
                 cursor.close()
 
+    def has_column(self, table: str, column: str) -> bool:
+        """检查表上是否存在指定列"""
+        query = """
+        SELECT COUNT(*) AS column_count
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """
+        result = self.execute_query(query, (table, column))
+        return bool(result and result[0]['column_count'])
+
+    def has_unique_key(self, table: str, columns: Sequence[str]) -> bool:
+        """检查表上是否存在恰好由指定列组成的唯一索引（含主键）"""
+        query = """
+        SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS index_columns
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 0
+        GROUP BY INDEX_NAME
+        """
+        wanted = set(columns)
+        return any(set(row['index_columns'].split(',')) == wanted
+                   for row in self.execute_query(query, (table,)))
+
+    def execute_transaction(self, statements: Sequence[Tuple[str, tuple]]) -> List[int]:
+        """在同一连接的一个事务中依次执行多条语句，任一失败整体回滚，返回各语句影响行数"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                affected = [cursor.execute(query, params or ()) for query, params in statements]
+                conn.commit()
+                logger.debug(f"事务执行成功，共 {len(statements)} 条语句")
+                return affected
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+
+_connection_pool: Optional[SimpleDatabaseConnectionPool] = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> SimpleDatabaseConnectionPool:
+    """获取全局连接池实例（首次调用时创建）"""
+    global _connection_pool
+    if _connection_pool is None:
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                _connection_pool = SimpleDatabaseConnectionPool()
+    return _connection_pool
+
 
-# 全局连接池实例
-connection_pool = SimpleDatabaseConnectionPool()
+def __getattr__(name: str):
+    # 兼容 from database.simple_connection_pool import connection_pool（访问时才创建）
+    if name == 'connection_pool':
+        return get_connection_pool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,387 @@
+"""
+SQLite数据库连接池
+单机部署使用的嵌入式后端：WAL模式、每个工作线程一个连接、支持批量写入，
+对外接口与 SimpleDatabaseConnectionPool 一致，DAO中的MySQL语句在执行前自动转换
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.database_config import config_manager
+from database.schema import (
+    TABLE_MODELS, TIMESTAMP_COLUMNS, UNIQUE_KEYS, get_column_defaults, get_column_types, get_table_columns
+)
+
+logger = logging.getLogger(__name__)
+
+# RETURNING 子句需要 SQLite 3.35+
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# 与MySQL DATETIME一致的秒级时间格式
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 实体类字段类型 -> SQLite列类型（DATETIME/DATE列读取时自动转换回Python对象）
+SQLITE_COLUMN_TYPES = {
+    int: 'INTEGER',
+    bool: 'INTEGER',
+    float: 'REAL',
+    str: 'TEXT',
+    datetime: 'DATETIME',
+    date: 'DATE',
+}
+
+# 除 *_id 外额外建立索引的查询列
+SQLITE_EXTRA_INDEXES = {
+    'players': ('name', 'nickname'),
+    'user_sessions': ('session_token', 'revoked_at'),
+    'login_logs': ('username', 'created_at'),
+}
+
+# 时间间隔单位 -> timedelta参数
+_INTERVAL_UNITS = {'SECOND': 'seconds', 'MINUTE': 'minutes', 'HOUR': 'hours', 'DAY': 'days'}
+
+_INTERVAL_PATTERN = re.compile(
+    r'(DATE_ADD|DATE_SUB)\(([^,()]+(?:\(\))?),\s*INTERVAL\s+(%s|\d+)\s+(SECOND|MINUTE|HOUR|DAY)\)',
+    re.IGNORECASE
+)
+_NAMED_PARAM_PATTERN = re.compile(r'%\((\w+)\)s')
+_LAST_INSERT_ID_PATTERN = re.compile(r'LAST_INSERT_ID\((\w+)\)', re.IGNORECASE)
+_UPSERT_VALUES_PATTERN = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_ON_DUPLICATE_PATTERN = re.compile(r'ON\s+DUPLICATE\s+KEY\s+UPDATE', re.IGNORECASE)
+_INSERT_TABLE_PATTERN = re.compile(r'INSERT\s+INTO\s+(\w+)', re.IGNORECASE)
+
+
+# ==================== 类型与函数注册 ====================
+
+sqlite3.register_adapter(datetime, lambda value: value.strftime(DATETIME_FORMAT))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DATETIME', lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()))
+
+
+def _now() -> str:
+    return datetime.now().strftime(DATETIME_FORMAT)
+
+
+def _shift(value: Optional[str], amount: Optional[int], unit: str, sign: int) -> Optional[str]:
+    if value is None or amount is None:
+        return None
+    delta = timedelta(**{_INTERVAL_UNITS[unit.upper()]: int(amount) * sign})
+    return (datetime.fromisoformat(str(value)) + delta).strftime(DATETIME_FORMAT)
+
+
+def _date_add(value, amount, unit):
+    return _shift(value, amount, unit, 1)
+
+
+def _date_sub(value, amount, unit):
+    return _shift(value, amount, unit, -1)
+
+
+def _greatest(*values):
+    # 与MySQL一致：任一参数为NULL时返回NULL
+    return None if None in values else max(values)
+
+
+def _least(*values):
+    return None if None in values else min(values)
+
+
+@lru_cache(maxsize=512)
+def translate_sql(query: str) -> str:
+    """
+    将DAO中的MySQL语句转换为SQLite语句
+
+    - DATE_ADD/DATE_SUB(x, INTERVAL n UNIT) -> DATE_ADD/DATE_SUB(x, n, 'UNIT')（由注册函数实现）
+    - NOW()、GREATEST()、LEAST() 无需转换，由连接上注册的同名函数实现
+    - ON DUPLICATE KEY UPDATE ... VALUES(col) -> ON CONFLICT (唯一键列) DO UPDATE SET ... excluded.col
+      （冲突目标取 database.schema.UNIQUE_KEYS 中该表的第一个唯一键）
+    - id = LAST_INSERT_ID(id) -> RETURNING id（upsert命中已有行时也能取到记录ID）
+    - %(name)s -> :name，%s -> ?
+    """
+    query = _INTERVAL_PATTERN.sub(lambda m: f"{m.group(1)}({m.group(2)}, {m.group(3)}, '{m.group(4).upper()}')", query)
+    if _ON_DUPLICATE_PATTERN.search(query):
+        table = _INSERT_TABLE_PATTERN.search(query)
+        unique_keys = UNIQUE_KEYS.get(table.group(1)) if table else None
+        if not unique_keys:
+            raise ValueError(f"upsert语句的目标表未在 UNIQUE_KEYS 中声明唯一键: {query.strip()[:60]}")
+        returning = _LAST_INSERT_ID_PATTERN.search(query)
+        query = _ON_DUPLICATE_PATTERN.sub(f"ON CONFLICT ({', '.join(unique_keys[0])}) DO UPDATE SET", query)
+        query = _UPSERT_VALUES_PATTERN.sub(r'excluded.\1', query)
+        if returning:
+            query = _LAST_INSERT_ID_PATTERN.sub(r'\1', query).rstrip() + f' RETURNING {returning.group(1)}'
+    query = _NAMED_PARAM_PATTERN.sub(r':\1', query)
+    return query.replace('%s', '?').replace('%%', '%')
+
+
+def _dict_factory(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+# ==================== 表结构生成 ====================
+
+def _format_default(value: Any) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(int(value) if isinstance(value, bool) else value)
+
+
+def build_column_definitions(table: str) -> Dict[str, str]:
+    """根据实体类生成各列的定义（列名 -> 列定义）"""
+    types = get_column_types(table)
+    defaults = get_column_defaults(table)
+
+    columns = {}
+    for column in get_table_columns(table):
+        if column == 'id':
+            columns[column] = 'id INTEGER PRIMARY KEY AUTOINCREMENT'
+            continue
+        definition = f"{column} {SQLITE_COLUMN_TYPES.get(types[column], 'TEXT')}"
+        if column in TIMESTAMP_COLUMNS:
+            definition += " NOT NULL DEFAULT (datetime('now', 'localtime'))"
+        elif column not in defaults:
+            definition += ' NOT NULL'
+        elif defaults[column] is not None:
+            definition += f' DEFAULT {_format_default(defaults[column])}'
+        columns[column] = definition
+    return columns
+
+
+def build_table_ddl(table: str) -> List[str]:
+    """根据实体类生成建表与索引语句（第一条为建表语句）"""
+    types = get_column_types(table)
+    columns = build_column_definitions(table).values()
+
+    statements = [f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ',\n    '.join(columns) + '\n)']
+
+    for key_columns in UNIQUE_KEYS.get(table, ()):
+        statements.append(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uk_{table}_{'_'.join(key_columns)} "
+            f"ON {table} ({', '.join(key_columns)})"
+        )
+
+    indexed = [column for column in types if column.endswith('_id')]
+    indexed.extend(SQLITE_EXTRA_INDEXES.get(table, ()))
+    for column in indexed:
+        statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+
+    # 对应MySQL的 ON UPDATE CURRENT_TIMESTAMP
+    if 'updated_at' in types:
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_updated_at AFTER UPDATE ON {table} "
+            f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN "
+            f"UPDATE {table} SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id; END"
+        )
+    return statements
+
+
+# ==================== 连接池 ====================
+
+class SQLiteConnectionPool:
+    """
+    SQLite连接池
+
+    每个线程持有一个长连接（autocommit模式），单条写语句即一个事务；
+    在 batch_writes() 内的写操作合并为一个事务统一提交。
+    注意：影响行数按匹配行计算，而MySQL默认按实际变化行计算。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(f"SQLite后端需要 SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} 及以上版本，"
+                               f"当前为 {sqlite3.sqlite_version}")
+        self.path = path or config_manager.get_config().sqlite_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        logger.info(f"初始化SQLite连接池，数据库文件: {self.path}")
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """创建新的数据库连接"""
+        if self.path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.path,
+            timeout=10,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        connection.row_factory = _dict_factory
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        connection.create_function('NOW', 0, _now)
+        connection.create_function('DATE_ADD', 3, _date_add, deterministic=True)
+        connection.create_function('DATE_SUB', 3, _date_sub, deterministic=True)
+        connection.create_function('GREATEST', -1, _greatest, deterministic=True)
+        connection.create_function('LEAST', -1, _least, deterministic=True)
+
+        with self._lock:
+            self._connections.append(connection)
+            if not self._schema_ready:
+                self._create_schema(connection)
+                self._schema_ready = True
+        logger.debug(f"创建SQLite连接，线程: {threading.current_thread().name}")
+        return connection
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection):
+        """按实体类创建缺失的表，并为已有的表补齐实体类新增的列（需可为空或有常量默认值）"""
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for table in TABLE_MODELS:
+                create_table, *statements = build_table_ddl(table)
+                connection.execute(create_table)
+                existing = {row['name'] for row in connection.execute(f"PRAGMA table_info({table})").fetchall()}
+                for column, definition in build_column_definitions(table).items():
+                    if column not in existing:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+                        logger.info(f"SQLite表 {table} 已补齐列 {column}")
+                for statement in statements:
+                    connection.execute(statement)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        logger.info(f"SQLite表结构已就绪，共 {len(TABLE_MODELS)} 张表")
+
+    @contextmanager
+    def get_connection(self):
+        """获取当前线程的数据库连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._create_connection()
+            self._local.connection = connection
+            self._local.batch_depth = 0
+        yield connection
+
+    @contextmanager
+    def batch_writes(self):
+        """
+        批量写入：块内当前线程的所有写操作在同一事务中执行，退出时统一提交，
+        发生异常则整体回滚。支持嵌套，仅最外层负责提交。
+        """
+        with self.get_connection() as conn:
+            outermost = self._local.batch_depth == 0
+            if outermost:
+                conn.execute('BEGIN IMMEDIATE')
+            self._local.batch_depth += 1
+            try:
+                yield conn
+            except Exception:
+                self._local.batch_depth -= 1
+                if outermost:
+                    conn.execute('ROLLBACK')
+                raise
+            self._local.batch_depth -= 1
+            if outermost:
+                conn.execute('COMMIT')
+
+    def _in_batch(self) -> bool:
+        return getattr(self._local, 'batch_depth', 0) > 0
+
+    def test_connection(self) -> bool:
+        """测试数据库是否可用"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"SQLite连接测试失败: {e}")
+            return False
+
+    def execute_query(self, query: str, params: tuple = None) -> list:
+        """执行查询"""
+        with self.get_connection() as conn:
+            result = conn.execute(translate_sql(query), params or ()).fetchall()
+            logger.debug(f"查询成功，返回 {len(result)} 条记录")
+            return result
+
+    def execute_update(self, query: str, params: tuple = None) -> int:
+        """执行更新操作"""
+        with self.get_connection() as conn:
+            affected_rows = conn.execute(translate_sql(query), params or ()).rowcount
+            logger.debug(f"更新成功，影响 {affected_rows} 行")
+            return affected_rows
+
+    def execute_insert(self, query: str, data: dict = None) -> int:
+        """执行插入操作并返回ID"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(translate_sql(query), data or ())
+            if cursor.description:
+                # RETURNING 子句返回的记录ID
+                insert_id = next(iter(cursor.fetchone().values()))
+                cursor.fetchall()
+            else:
+                insert_id = cursor.lastrowid
+            logger.debug(f"插入成功，ID: {insert_id}")
+            return insert_id
+
+    def execute_batch(self, query: str, params_list: list) -> None:
+        """批量执行操作（未处于批量写入块时自动包裹一个事务）"""
+        if self._in_batch():
+            with self.get_connection() as conn:
+                conn.executemany(translate_sql(query), params_list)
+        else:
+            with self.batch_writes() as conn:
+                conn.executemany(translate_sql(query), params_list)
+        logger.debug(f"批量操作成功，执行 {len(params_list)} 条")
+
+    def has_column(self, table: str, column: str) -> bool:
+        """检查表上是否存在指定列"""
+        with self.get_connection() as conn:
+            return any(row['name'] == column for row in conn.execute(f"PRAGMA table_info({table})").fetchall())
+
+    def has_unique_key(self, table: str, columns: Sequence[str]) -> bool:
+        """检查表上是否存在恰好由指定列组成的唯一索引"""
+        wanted = set(columns)
+        with self.get_connection() as conn:
+            for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+                if not index['unique']:
+                    continue
+                index_columns = {row['name'] for row in conn.execute(f"PRAGMA index_info({index['name']})").fetchall()}
+                if index_columns == wanted:
+                    return True
+        return False
+
+    def execute_transaction(self, statements: Sequence[Tuple[str, tuple]]) -> List[int]:
+        """在一个事务中依次执行多条语句（处于批量写入块时并入外层事务），返回各语句影响行数"""
+        with self.batch_writes() as conn:
+            affected = [conn.execute(translate_sql(query), params or ()).rowcount for query, params in statements]
+        logger.debug(f"事务执行成功，共 {len(statements)} 条语句")
+        return affected
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+# 全局SQLite连接池（首次使用时创建）
+_sqlite_pool: Optional[SQLiteConnectionPool] = None
+_sqlite_pool_lock = threading.Lock()
+
+
+def get_sqlite_pool() -> SQLiteConnectionPool:
+    """获取全局SQLite连接池"""
+    global _sqlite_pool
+    with _sqlite_pool_lock:
+        if _sqlite_pool is None:
+            _sqlite_pool = SQLiteConnectionPool()
+        return _sqlite_pool
@@ -0,0 +1,367 @@
+"""
+预生成楼层池
+
+离线工具（tools/floor_pool_generator.py）批量生成楼层布局并写入紧凑的二进制文件，
+每个楼层段一个文件；服务器启动时以 mmap 方式打开，运行时按玩家种子抽取布局，
+再随机对称变换并重新生成怪物/道具属性，避免请求路径上的地图生成开销。
+
+文件格式（小端）：
+- 文件头: 魔数 b'TFPL' | 版本 u8 | 起始层 u16 | 结束层 u16 | 记录数 u32
+- 偏移表: 每条记录的起始偏移 u32 × 记录数
+- 记录:   层数 u16 | 宽 u8 | 高 u8 | 出生点 x,y u8 | 楼梯 x,y u8 (255 表示无)
+          | 怪物数 u8 | 道具数 u8 | 可通行位图 ceil(宽×高/8) 字节
+          | 怪物 (x, y, 种类) u8×3 | 道具 (x, y, 种类) u8×3
+"""
+
+import logging
+import mmap
+import os
+import random
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from game_model import Floor, Position, Cell, CellType
+from map_generator import (
+    generate_monster, generate_guard_monster, generate_item,
+    generate_merchant_floor, generate_normal_floor, should_generate_merchant_floor
+)
+
+logger = logging.getLogger(__name__)
+
+POOL_MAGIC = b'TFPL'
+POOL_VERSION = 1
+POOL_FILE_SUFFIX = '.tfp'
+
+HEADER_STRUCT = struct.Struct('<4sBHHI')
+OFFSET_STRUCT = struct.Struct('<I')
+RECORD_STRUCT = struct.Struct('<HBBBBBBBB')
+ENTITY_STRUCT = struct.Struct('<BBB')
+
+NO_POSITION = 255
+
+# 怪物种类：0 普通，1 装备守卫，2 楼梯守卫
+MONSTER_KIND_NORMAL = 0
+MONSTER_KIND_ITEM_GUARD = 1
+MONSTER_KIND_STAIRS_GUARD = 2
+MONSTER_KIND_GUARDED_TYPE = {
+    MONSTER_KIND_ITEM_GUARD: 'weapon',
+    MONSTER_KIND_STAIRS_GUARD: 'stairs',
+}
+
+ITEM_KINDS = ('potion', 'weapon', 'armor')
+
+
+# ==================== 编码 ====================
+
+def _monster_kind(monster) -> int:
+    """根据守卫命名规则识别怪物种类"""
+    if monster.name.startswith('楼梯守卫'):
+        return MONSTER_KIND_STAIRS_GUARD
+    if monster.name.startswith('守卫'):
+        return MONSTER_KIND_ITEM_GUARD
+    return MONSTER_KIND_NORMAL
+
+
+def _encode_position(pos: Optional[Position]) -> Tuple[int, int]:
+    if pos is None:
+        return NO_POSITION, NO_POSITION
+    return pos.x, pos.y
+
+
+def encode_floor(floor: Floor) -> bytes:
+    """
+    将普通楼层编码为紧凑记录（只保留布局与实体位置/种类，属性在抽取时重新生成）
+
+    Args:
+        floor: 楼层对象（不支持商人楼层）
+
+    Returns:
+        记录字节串
+    """
+    if floor.is_merchant_floor:
+        raise ValueError("商人楼层不进入楼层池")
+
+    width, height = floor.width, floor.height
+    bitmap = bytearray((width * height + 7) // 8)
+    for x in range(width):
+        for y in range(height):
+            if floor.grid[x][y].passable:
+                index = x * height + y
+                bitmap[index >> 3] |= 1 << (index & 7)
+
+    monsters = list(floor.monsters.values())
+    items = [item for item in floor.items.values() if item.effect_type in ITEM_KINDS]
+
+    parts = [RECORD_STRUCT.pack(
+        floor.level, width, height,
+        *_encode_position(floor.player_start_pos),
+        *_encode_position(floor.stairs_pos),
+        len(monsters), len(items)
+    ), bytes(bitmap)]
+    for monster in monsters:
+        parts.append(ENTITY_STRUCT.pack(monster.position.x, monster.position.y, _monster_kind(monster)))
+    for item in items:
+        parts.append(ENTITY_STRUCT.pack(item.position.x, item.position.y, ITEM_KINDS.index(item.effect_type)))
+    return b''.join(parts)
+
+
+def write_pool_file(path: str, band_start: int, band_end: int, records: List[bytes]):
+    """
+    写入一个楼层段文件
+
+    Args:
+        path: 文件路径
+        band_start: 起始楼层（含）
+        band_end: 结束楼层（含）
+        records: encode_floor 生成的记录
+    """
+    offset = HEADER_STRUCT.size + OFFSET_STRUCT.size * len(records)
+    offsets = []
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER_STRUCT.pack(POOL_MAGIC, POOL_VERSION, band_start, band_end, len(records)))
+        for record_offset in offsets:
+            f.write(OFFSET_STRUCT.pack(record_offset))
+        for record in records:
+            f.write(record)
+    os.replace(tmp_path, path)
+
+
+def band_file_name(band_start: int, band_end: int) -> str:
+    """楼层段文件名"""
+    return f"floors_{band_start:03d}_{band_end:03d}{POOL_FILE_SUFFIX}"
+
+
+# ==================== 读取 ====================
+
+class FloorPoolFile:
+    """以 mmap 方式打开的楼层段文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, self.band_start, self.band_end, self.count = HEADER_STRUCT.unpack_from(self._data, 0)
+        if magic != POOL_MAGIC or version != POOL_VERSION:
+            self.close()
+            raise ValueError(f"无效的楼层池文件: {path}")
+
+        self._offsets = [
+            OFFSET_STRUCT.unpack_from(self._data, HEADER_STRUCT.size + i * OFFSET_STRUCT.size)[0]
+            for i in range(self.count)
+        ]
+
+        # 楼层 -> 记录下标列表（只读取每条记录的前两个字节）
+        self.level_index: Dict[int, List[int]] = {}
+        for i, offset in enumerate(self._offsets):
+            level = struct.unpack_from('<H', self._data, offset)[0]
+            self.level_index.setdefault(level, []).append(i)
+
+    def decode(self, index: int) -> Dict:
+        """解码指定记录"""
+        offset = self._offsets[index]
+        (level, width, height, start_x, start_y, stairs_x, stairs_y,
+         monster_count, item_count) = RECORD_STRUCT.unpack_from(self._data, offset)
+        offset += RECORD_STRUCT.size
+
+        bitmap_size = (width * height + 7) // 8
+        bitmap = self._data[offset:offset + bitmap_size]
+        offset += bitmap_size
+
+        monsters = []
+        for _ in range(monster_count):
+            monsters.append(ENTITY_STRUCT.unpack_from(self._data, offset))
+            offset += ENTITY_STRUCT.size
+        items = []
+        for _ in range(item_count):
+            items.append(ENTITY_STRUCT.unpack_from(self._data, offset))
+            offset += ENTITY_STRUCT.size
+
+        return {
+            'level': level,
+            'width': width,
+            'height': height,
+            'start': None if start_x == NO_POSITION else (start_x, start_y),
+            'stairs': None if stairs_x == NO_POSITION else (stairs_x, stairs_y),
+            'bitmap': bitmap,
+            'monsters': monsters,
+            'items': items,
+        }
+
+    def close(self):
+        """关闭映射与文件"""
+        try:
+            self._data.close()
+        finally:
+            self._file.close()
+
+
+def _transform(x: int, y: int, width: int, height: int, symmetry: int) -> Tuple[int, int]:
+    """对称变换：bit2 转置（仅方形地图），bit0 水平翻转，bit1 垂直翻转"""
+    if symmetry & 4 and width == height:
+        x, y = y, x
+    if symmetry & 1:
+        x = width - 1 - x
+    if symmetry & 2:
+        y = height - 1 - y
+    return x, y
+
+
+def materialize_floor(layout: Dict, symmetry: int = 0) -> Floor:
+    """
+    由布局记录构建楼层：应用对称变换，并重新生成怪物与道具属性
+
+    Args:
+        layout: FloorPoolFile.decode 的结果
+        symmetry: 对称变换编号（0-7）
+
+    Returns:
+        Floor对象
+    """
+    level, width, height = layout['level'], layout['width'], layout['height']
+    floor = Floor(level, width, height)
+    bitmap = layout['bitmap']
+
+    def pos_of(x: int, y: int) -> Position:
+        return Position(*_transform(x, y, width, height, symmetry))
+
+    for x in range(width):
+        for y in range(height):
+            index = x * height + y
+            if bitmap[index >> 3] & (1 << (index & 7)):
+                pos = pos_of(x, y)
+                floor.grid[pos.x][pos.y] = Cell(CellType.EMPTY, passable=True)
+
+    if layout['start']:
+        floor.player_start_pos = pos_of(*layout['start'])
+    if layout['stairs']:
+        floor.stairs_pos = pos_of(*layout['stairs'])
+        floor.grid[floor.stairs_pos.x][floor.stairs_pos.y] = Cell(CellType.STAIRS, passable=True)
+
+    for x, y, kind in layout['items']:
+        pos = pos_of(x, y)
+        item = generate_item(level, pos, forced_type=ITEM_KINDS[kind])
+        floor.items[item.item_id] = item
+        floor.grid[pos.x][pos.y] = Cell(CellType.EMPTY, passable=True, entity=item)
+
+    for x, y, kind in layout['monsters']:
+        pos = pos_of(x, y)
+        if kind in MONSTER_KIND_GUARDED_TYPE:
+            monster = generate_guard_monster(level, pos, MONSTER_KIND_GUARDED_TYPE[kind])
+        else:
+            monster = generate_monster(level, pos)
+        floor.monsters[monster.id] = monster
+        floor.grid[pos.x][pos.y].entity = monster
+
+    return floor
+
+
+class FloorPool:
+    """楼层池：管理目录下所有楼层段文件"""
+
+    def __init__(self):
+        self.files: List[FloorPoolFile] = []
+        self._level_map: Dict[int, List[Tuple[FloorPoolFile, int]]] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        """是否已加载任何楼层"""
+        return bool(self._level_map)
+
+    def load(self, directory: str) -> int:
+        """
+        加载目录下的楼层段文件
+
+        Args:
+            directory: 楼层池目录
+
+        Returns:
+            加载的楼层布局总数
+        """
+        self.close()
+        for path in sorted(Path(directory).glob(f"*{POOL_FILE_SUFFIX}")):
+            try:
+                pool_file = FloorPoolFile(str(path))
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"跳过无法读取的楼层池文件 {path}: {e}")
+                continue
+            self.files.append(pool_file)
+            for level, indexes in pool_file.level_index.items():
+                self._level_map.setdefault(level, []).extend((pool_file, i) for i in indexes)
+
+        total = sum(len(entries) for entries in self._level_map.values())
+        logger.info(f"楼层池加载完成: {len(self.files)} 个文件, {total} 个布局")
+        return total
+
+    def layout_count(self, level: int) -> int:
+        """指定楼层可用的布局数"""
+        return len(self._level_map.get(level, ()))
+
+    def draw_floor(self, level: int, seed: int) -> Optional[Floor]:
+        """
+        按种子抽取一个楼层
+
+        同一种子与楼层总是得到相同的布局与对称变换；怪物/道具属性每次重新生成。
+
+        Args:
+            level: 楼层数
+            seed: 抽取种子（通常由玩家种子与楼层组合得到）
+
+        Returns:
+            Floor对象，楼层池中没有该层时返回None
+        """
+        entries = self._level_map.get(level)
+        if not entries:
+            return None
+
+        rng = random.Random(seed)
+        pool_file, index = entries[rng.randrange(len(entries))]
+        return materialize_floor(pool_file.decode(index), rng.randrange(8))
+
+    def close(self):
+        """关闭所有文件"""
+        for pool_file in self.files:
+            pool_file.close()
+        self.files = []
+        self._level_map = {}
+
+
+def generate_floor_from_pool(level: int, prev_floor: Optional[Floor] = None,
+                             merchant_attempt_count: int = 0, seed: Optional[int] = None) -> Floor:
+    """
+    生成楼层：商人楼层判定与 generate_floor 一致，普通楼层优先从楼层池抽取
+
+    楼层池中的布局自带出生点，不沿用上一层楼梯位置；池中无该层时回退到实时生成。
+
+    Args:
+        level: 楼层数
+        prev_floor: 上一层
+        merchant_attempt_count: 距上次商人楼层的层数
+        seed: 玩家楼层种子，None表示不使用楼层池
+
+    Returns:
+        Floor对象
+    """
+    if should_generate_merchant_floor(level, merchant_attempt_count):
+        return generate_merchant_floor(level)
+
+    if seed is not None and floor_pool.is_loaded:
+        floor = floor_pool.draw_floor(level, seed * 1009 + level)
+        if floor is not None:
+            return floor
+
+    return generate_normal_floor(level, prev_floor)
+
+
+# 全局楼层池实例
+floor_pool = FloorPool()
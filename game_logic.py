@@ -538,25 +538,8 @@ def find_empty_position(center_pos: Position, floor: Floor) -> Position:
     Returns:
         空位置，如果没有则返回None
     """
-    # 螺旋搜索，从中心向外
-    for radius in range(1, min(floor.width, floor.height)):
-        # 搜索螺旋路径
-        for dx, dy in [(0, -radius), (radius, 0), (0, radius), (-radius, 0)]:
-            for i in range(radius * 2 + 1):
-                if dx == 0:  # 垂直方向
-                    x = center_pos.x + dx
-                    y = center_pos.y - radius + i
-                else:  # 水平方向
-                    x = center_pos.x - radius + i
-                    y = center_pos.y + dy
-
-                # 检查边界
-                if 0 <= x < floor.width and 0 <= y < floor.height:
-                    cell = floor.grid[x][y]
-                    if cell.passable and (cell.entity is None or cell.entity.symbol == '.'):
-                        return Position(x, y)
-
-    return None
+    # BFS从中心向外搜索（不含中心本身），只返回与中心连通的空位置
+    return floor.find_nearest_free_position(center_pos, include_start=False)
 
 
 def pickup_item(player: Player, floor: Floor) -> Dict[str, Any]:
@@ -683,7 +666,7 @@ def pickup_item(player: Player, floor: Floor) -> Dict[str, Any]:
         if old_weapon_item:
             # 添加武器到地图
             floor.items[old_weapon_item.item_id] = old_weapon_item
-            floor.grid[player.position.x][player.position.y].entity = old_weapon_item
+            floor.get_writable_cell(player.position).entity = old_weapon_item
             result['logs'].append(f"{old_weapon_item.name}掉落在地上")
 
         if old_armor_item:
@@ -691,19 +674,19 @@ def pickup_item(player: Player, floor: Floor) -> Dict[str, Any]:
             current_entity = floor.grid[player.position.x][player.position.y].entity
             if current_entity is None or current_entity.symbol == '.':
                 # 位置为空，直接放置防具
-                floor.grid[player.position.x][player.position.y].entity = old_armor_item
+                floor.get_writable_cell(player.position).entity = old_armor_item
             elif current_entity.symbol == '↑':
                 # 位置已有武器，防具放置在旁边
                 pos = find_empty_position(player.position, floor)
                 if pos:
                     old_armor_item.position = pos
-                    floor.grid[pos.x][pos.y].entity = old_armor_item
+                    floor.get_writable_cell(pos).entity = old_armor_item
                 else:
                     # 没有空位置，防具丢失
                     result['logs'].append(f"{old_armor_item.name}没有空间放置，丢失了")
             else:
                 # 其他情况，直接放置
-                floor.grid[player.position.x][player.position.y].entity = old_armor_item
+                floor.get_writable_cell(player.position).entity = old_armor_item
 
             # 添加防具到地图
             floor.items[old_armor_item.item_id] = old_armor_item
@@ -1,6 +1,7 @@
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import random
 
 # 导入新的工具类和配置
@@ -812,18 +813,37 @@ class Merchant:
 
 # ==================== 楼层类 ====================
 
+class FloorTemplate:
+    """
+    只读楼层布局模板
+
+    格子按列保存为元组，多个楼层直接引用同一组列（写时复制），
+    楼层首次修改某一列时才复制该列的格子。模板中的格子不可修改。
+    """
+    def __init__(self, grid: List[List[Cell]]):
+        self.width = len(grid)
+        self.height = len(grid[0]) if grid else 0
+        self.columns: Tuple[Tuple[Cell, ...], ...] = tuple(tuple(column) for column in grid)
+
+
 class Floor:
     """楼层类（15×15地图）"""
-    def __init__(self, level: int, width: int = 15, height: int = 15):
+    def __init__(self, level: int, width: int = 15, height: int = 15,
+                 template: Optional[FloorTemplate] = None):
         self.level = level
         self.width = width
         self.height = height
 
-        # 二维地图格子
-        self.grid: List[List[Cell]] = [
-            [Cell(CellType.WALL, passable=False) for _ in range(width)]
-            for _ in range(height)
-        ]
+        # 二维地图格子；基于模板创建时共享模板的列，写入前再复制
+        self._shared_columns: Set[int] = set()
+        if template is not None:
+            self.grid: List[List[Cell]] = list(template.columns)
+            self._shared_columns = set(range(width))
+        else:
+            self.grid = [
+                [Cell(CellType.WALL, passable=False) for _ in range(width)]
+                for _ in range(height)
+            ]
 
         self.monsters: Dict[str, Monster] = {}  # {monster_id: Monster}
         self.items: Dict[str, Item] = {}        # {item_id: Item}
@@ -844,8 +864,22 @@ class Floor:
     def set_cell(self, pos: Position, cell: Cell):
         """设置指定位置的格子"""
         if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
+            self._own_column(pos.x)
             self.grid[pos.x][pos.y] = cell
 
+    def get_writable_cell(self, pos: Position) -> Optional[Cell]:
+        """获取可修改的格子（共享模板的列会先复制）"""
+        if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
+            self._own_column(pos.x)
+            return self.grid[pos.x][pos.y]
+        return None
+
+    def _own_column(self, x: int):
+        """写时复制：首次写入共享列时复制该列的格子"""
+        if x in self._shared_columns:
+            self.grid[x] = [Cell(cell.type, cell.passable, cell.entity) for cell in self.grid[x]]
+            self._shared_columns.discard(x)
+
     def is_passable(self, pos: Position) -> bool:
         """判断位置是否可通行 - 允许道具但阻止怪物"""
         cell = self.get_cell(pos)
@@ -887,7 +921,7 @@ class Floor:
             item = self.items[item_id]
             pos = item.position
             if clear_entity:
-                self.grid[pos.x][pos.y].entity = None
+                self.get_writable_cell(pos).entity = None
             del self.items[item_id]
 
     def remove_monster(self, monster_id: str):
@@ -895,7 +929,7 @@ class Floor:
         if monster_id in self.monsters:
             monster = self.monsters[monster_id]
             pos = monster.position
-            self.grid[pos.x][pos.y].entity = None
+            self.get_writable_cell(pos).entity = None
             del self.monsters[monster_id]
 
     def get_connected_area(self, start_pos: Position) -> List[Position]:
@@ -942,6 +976,63 @@ class Floor:
 
         return area
 
+    def get_occupied_positions(self) -> set:
+        """
+        构建占用集合：怪物、道具所在位置以及挂有实体的格子
+
+        一次构建 O(怪物数+道具数)，之后每格查询 O(1)，替代逐格调用 get_monster_at/get_item_at
+        """
+        occupied = {monster.position for monster in self.monsters.values()}
+        occupied.update(item.position for item in self.items.values())
+        return occupied
+
+    def find_nearest_free_position(self, start_pos: Position, include_start: bool = True,
+                                   occupied: Optional[set] = None) -> Optional[Position]:
+        """
+        BFS查找距离起点最近的空闲可通行格子
+
+        搜索沿可通行格子扩展（实体不阻挡搜索，只是不能作为结果），因此结果一定与起点连通；
+        起点本身是墙时先穿过墙体找到最近的可通行区域。耗时与访问格子数成正比。
+
+        Args:
+            start_pos: 起点
+            include_start: 起点本身空闲时是否可直接返回
+            occupied: 预先构建的占用集合，默认调用 get_occupied_positions
+
+        Returns:
+            最近的空闲位置，找不到时返回None
+        """
+        if not (0 <= start_pos.x < self.width and 0 <= start_pos.y < self.height):
+            start_pos = Position(min(max(start_pos.x, 0), self.width - 1),
+                                 min(max(start_pos.y, 0), self.height - 1))
+
+        if occupied is None:
+            occupied = self.get_occupied_positions()
+
+        grid = self.grid
+        visited = {(start_pos.x, start_pos.y)}
+        queue = deque([(start_pos.x, start_pos.y)])
+
+        while queue:
+            x, y = queue.popleft()
+            cell = grid[x][y]
+
+            if cell.passable:
+                if ((include_start or (x, y) != (start_pos.x, start_pos.y)) and
+                        cell.entity is None and Position(x, y) not in occupied):
+                    return Position(x, y)
+
+            for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if not (0 <= nx < self.width and 0 <= ny < self.height) or (nx, ny) in visited:
+                    continue
+                # 可通行格子只向可通行格子扩展；墙体格子可穿墙寻找最近的可通行区域
+                if cell.passable and not grid[nx][ny].passable:
+                    continue
+                visited.add((nx, ny))
+                queue.append((nx, ny))
+
+        return None
+
     def has_monsters_in_area(self, area: List[Position]) -> bool:
         """
         检查指定区域内是否有存活的怪物
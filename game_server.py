@@ -1,33 +1,39 @@
 import asyncio
 import json
 import logging
+import random
 import websockets
 from typing import Dict, List, Optional
 
-from map_generator import generate_floor
-from game_model import Player, Floor, Position, CellType, Item, WeaponAttribute
+from game_model import Player, Floor, Position, CellType, Item, WeaponAttribute, ArmorAttribute
 from game_logic import (
     move_player, pickup_item, player_attack,
     handle_trade_request, get_merchant_info,
     forge_weapon_attribute, get_forge_info,
     forge_base_attribute, add_random_attribute, reforge_attribute
 )
+from combat_simulator import estimate_danger_rating
+from floor_pool import floor_pool, generate_floor_from_pool
 from services import service_manager
-from config.database_config import config_manager as db_config_manager
 from config.game_config import config_manager as game_config_manager
 from database.dao import dao_manager
-from database.simple_connection_pool import connection_pool
+from database.instrumentation import track_request
 
 
 logger = logging.getLogger(__name__)
 
 # 全局数据库可用性标志
-DATABASE_AVAILABLE = False
+DATABASE_CONFIGURED = False
+
+
+def database_available() -> bool:
+    """数据库是否可用：已配置且连接池熔断器未熔断（随数据库健康状况实时变化）"""
+    return DATABASE_CONFIGURED and dao_manager.is_healthy()
 
 
 def safe_database_operation(operation_name: str, operation_func, fallback_result=None):
     """安全执行数据库操作，失败时返回备用结果"""
-    if not DATABASE_AVAILABLE:
+    if not database_available():
         logger.info(f"数据库不可用，跳过 {operation_name}")
         return fallback_result
 
@@ -35,7 +41,6 @@ def safe_database_operation(operation_name: str, operation_func, fallback_result
         return operation_func()
     except Exception as e:
         logger.error(f"{operation_name} 失败: {e}")
-        logger.info("已启用本地模式，建议重启服务器以避免重复错误")
         return fallback_result
 
 
@@ -48,15 +53,24 @@ class GameState:
         self.game_over: bool = False
         self.game_over_reason: str = ""
         self.merchant_attempt_count: int = 0  # 商人楼层尝试计数器
+        self.floor_seed: int = random.getrandbits(32)  # 玩家楼层种子（用于从楼层池抽取）
         self.player_id: Optional[int] = None
         self.save_id: Optional[int] = None
-        self.db_enabled: bool = False
         self.session_token: Optional[str] = None
         self.authenticated_user: Optional[Dict] = None
         self.is_authenticated: bool = False
 
-        # 使用全局数据库可用性标志
-        self.db_enabled = DATABASE_AVAILABLE
+        # 本局是否使用数据库（实际可用性见 db_enabled）
+        self.use_database: bool = DATABASE_CONFIGURED
+
+    @property
+    def db_enabled(self) -> bool:
+        """本局使用数据库且数据库当前可用"""
+        return self.use_database and database_available()
+
+    @db_enabled.setter
+    def db_enabled(self, value: bool):
+        self.use_database = value
 
     def new_game(self):
         """开始新游戏"""
@@ -80,7 +94,8 @@ class GameState:
         self.is_authenticated = original_is_authenticated
 
         # 生成第一层
-        self.current_floor = generate_floor(1, None, self.merchant_attempt_count)
+        self.floor_seed = random.getrandbits(32)
+        self.current_floor = generate_floor_from_pool(1, None, self.merchant_attempt_count, self.floor_seed)
         self.player.position = self.current_floor.player_start_pos
 
         # 第一层不需要更新商人计数器（不是每10层的候选）
@@ -232,7 +247,9 @@ class GameState:
                         # 自动上楼成功，需要重新生成楼层
                         self.floor_level += 1
                         prev_floor = self.current_floor
-                        self.current_floor = generate_floor(self.floor_level, prev_floor, self.merchant_attempt_count)
+                        self.current_floor = generate_floor_from_pool(
+                            self.floor_level, prev_floor, self.merchant_attempt_count, self.floor_seed
+                        )
                         self.player.position = self.current_floor.player_start_pos
 
                         # 更新商人楼层尝试计数器（使用旧的楼层级别）
@@ -292,6 +309,13 @@ class GameState:
             'gold_gained': combat_result['gold_gained']
         })
 
+        # 可选：附带存活怪物的危险度评估
+        config = game_config_manager.get_config()
+        if config.DANGER_RATING_ENABLED and monster.is_alive():
+            messages[-1]['monster_danger'] = estimate_danger_rating(
+                self.player, monster, self.current_floor.level, trials=config.DANGER_RATING_TRIALS
+            )
+
         # 检查玩家死亡
         if not self.player.is_alive():
             messages.extend(self._finalize_game_over(f"被{monster.name}击败", cleanup_save=True))
@@ -586,37 +610,39 @@ class GameState:
             return False
 
         try:
-            # 更新玩家信息（玩家记录应该已经存在）
-            player_data = {
-                'hp': self.player.hp,
-                'max_hp': self.player.max_hp,
-                'attack': self.player.attack,
-                'defense': self.player.defense,
-                'exp': self.player.exp,
-                'level': self.player.level,
-                'gold': self.player.gold,
-                'position_x': self.player.position.x if self.player.position else 0,
-                'position_y': self.player.position.y if self.player.position else 0,
-                'floor_level': self.floor_level
-            }
-            updated = service_manager.player.update_player(self.player_id, player_data)
-            if not updated:
-                raise RuntimeError("更新玩家信息失败")
-
-            # 保存装备信息
-            self._save_equipment()
-
-            # 保存武器词条
-            self._save_weapon_attributes()
-
-            # 保存防具词条
-            self._save_armor_attributes()
-
-            # 保存道具信息
-            self._save_inventory()
-
-            # 保存游戏状态（覆盖最新存档或创建新存档）
-            self._save_game_state()
+            # 整个存档过程作为一批写入（sqlite后端合并为一个事务）
+            with dao_manager.batch_writes():
+                # 更新玩家信息（玩家记录应该已经存在）
+                player_data = {
+                    'hp': self.player.hp,
+                    'max_hp': self.player.max_hp,
+                    'attack': self.player.attack,
+                    'defense': self.player.defense,
+                    'exp': self.player.exp,
+                    'level': self.player.level,
+                    'gold': self.player.gold,
+                    'position_x': self.player.position.x if self.player.position else 0,
+                    'position_y': self.player.position.y if self.player.position else 0,
+                    'floor_level': self.floor_level
+                }
+                updated = service_manager.player.update_player(self.player_id, player_data)
+                if not updated:
+                    raise RuntimeError("更新玩家信息失败")
+
+                # 保存装备信息
+                self._save_equipment()
+
+                # 保存武器词条
+                self._save_weapon_attributes()
+
+                # 保存防具词条
+                self._save_armor_attributes()
+
+                # 保存道具信息
+                self._save_inventory()
+
+                # 保存游戏状态（覆盖最新存档或创建新存档）
+                self._save_game_state()
 
             return True
         except Exception as e:
@@ -710,7 +736,9 @@ class GameState:
             self._load_inventory()
 
             # 生成对应楼层
-            self.current_floor = generate_floor(self.floor_level, None, self.merchant_attempt_count)
+            self.current_floor = generate_floor_from_pool(
+                self.floor_level, None, self.merchant_attempt_count, self.floor_seed
+            )
 
             # 如果玩家位置有效，设置玩家位置
             if (0 <= position_x < len(self.current_floor.grid) and
@@ -899,13 +927,8 @@ class GameState:
     def _save_inventory(self):
         """保存玩家道具信息"""
         try:
-            # 先清空现有道具
-            service_manager.inventory.clear_inventory(self.player_id)
-
-            # 直接从字典保存道具
-            for item_name, quantity in self.player.inventory.items():
-                if quantity > 0:
-                    service_manager.inventory.add_item(self.player_id, item_name, quantity)
+            # 按字典整体同步道具（数量为0的道具会被删除）
+            service_manager.inventory.replace_inventory(self.player_id, self.player.inventory)
 
             total_items = sum(self.player.inventory.values())
 
@@ -1258,6 +1281,124 @@ async def handle_suicide(websocket, data: Dict, game: GameState):
 games: Dict[str, GameState] = {}
 
 
+# 分发到独立处理函数的消息类型与游戏命令（SQL统计按这些名称归类，其余一律计为 unknown）
+MESSAGE_TYPES = frozenset({'auth', 'update_nickname', 'suicide'})
+GAME_COMMANDS = frozenset({
+    'move', 'use_item', 'merchant_info', 'trade', 'forge_info', 'forge',
+    'forge_base_attr', 'add_random_attr', 'reforge_attr'
+})
+
+
+def resolve_request_name(data: Dict, game: GameState) -> str:
+    """
+    按消息实际分发到的处理函数确定统计名称（先看 type，再看 cmd），
+    客户端传入的任意字符串不会成为统计键
+
+    Args:
+        data: 客户端消息
+        game: 当前连接的游戏状态
+    """
+    if not isinstance(data, dict):
+        return 'unknown'
+    msg_type = data.get('type')
+    if isinstance(msg_type, str) and msg_type in MESSAGE_TYPES:
+        return msg_type if msg_type == 'auth' or game.authenticated_user else 'unauthenticated'
+    if not game.authenticated_user:
+        return 'unauthenticated'
+    cmd = data.get('cmd')
+    if isinstance(cmd, str) and cmd in GAME_COMMANDS:
+        return cmd
+    return 'unknown'
+
+
+async def dispatch_message(websocket, data: Dict, game: GameState, session_id: str):
+    """处理一条客户端消息"""
+    # 处理认证消息
+    if data.get('type') == 'auth':
+        await handle_auth_message(websocket, data, game, session_id)
+        return
+
+    # 检查是否已认证
+    if not game.authenticated_user:
+        await websocket.send(json.dumps({
+            'type': 'auth_error',
+            'message': '请先进行身份认证'
+        }))
+        return
+
+    # 处理昵称更新请求
+    if data.get('type') == 'update_nickname':
+        await handle_nickname_update(websocket, data, game)
+        return
+
+    # 处理自杀重启请求
+    if data.get('type') == 'suicide':
+        response_messages = game.suicide()
+        for msg in response_messages:
+            await websocket.send(json.dumps(msg))
+        return
+
+    cmd = data.get('cmd')
+    response_messages = []
+
+    if cmd == 'move':
+        direction = data.get('dir')
+        response_messages = game.move(direction)
+
+    elif cmd == 'use_item':
+        item_name = data.get('item_name')
+        response_messages = game.use_item(item_name)
+
+    elif cmd == 'merchant_info':
+        response_messages = game.merchant_info()
+
+    elif cmd == 'trade':
+        item_name = data.get('item_name')
+        response_messages = game.trade(item_name)
+
+    elif cmd == 'forge_info':
+        response_messages = game.forge_info()
+
+    elif cmd == 'forge':
+        attribute_index = data.get('attribute_index')
+        if attribute_index is not None:
+            response_messages = game.forge(int(attribute_index))
+        else:
+            response_messages = [{'type': 'log', 'message': '缺少词条索引参数'}]
+
+    elif cmd == 'forge_base_attr':
+        equipment_type = data.get('equipment_type')
+        if equipment_type:
+            response_messages = game.forge_base_attr(equipment_type)
+        else:
+            response_messages = [{'type': 'log', 'message': '缺少装备类型参数'}]
+
+    elif cmd == 'add_random_attr':
+        equipment_type = data.get('equipment_type')
+        if equipment_type:
+            response_messages = game.add_random_attr(equipment_type)
+        else:
+            response_messages = [{'type': 'log', 'message': '缺少装备类型参数'}]
+
+    elif cmd == 'reforge_attr':
+        equipment_type = data.get('equipment_type')
+        attribute_index = data.get('attribute_index')
+        if equipment_type and attribute_index is not None:
+            response_messages = game.reforge_attr(equipment_type, int(attribute_index))
+        else:
+            response_messages = [{'type': 'log', 'message': '缺少装备类型或词条索引参数'}]
+
+    else:
+        response_messages = [{
+            'type': 'log',
+            'message': f'未知命令: {cmd}'
+        }]
+
+    # 发送响应消息
+    for msg in response_messages:
+        await websocket.send(json.dumps(msg))
+
+
 async def handle_client(websocket):
     """处理WebSocket客户端连接"""
     session_id = str(id(websocket))
@@ -1279,90 +1420,9 @@ async def handle_client(websocket):
             try:
                 data = json.loads(message)
 
-                # 处理认证消息
-                if data.get('type') == 'auth':
-                    await handle_auth_message(websocket, data, game, session_id)
-                    continue
-
-                # 检查是否已认证
-                if not game.authenticated_user:
-                    await websocket.send(json.dumps({
-                        'type': 'auth_error',
-                        'message': '请先进行身份认证'
-                    }))
-                    continue
-
-                # 处理昵称更新请求
-                if data.get('type') == 'update_nickname':
-                    await handle_nickname_update(websocket, data, game)
-                    continue
-
-                # 处理自杀重启请求
-                if data.get('type') == 'suicide':
-                    response_messages = game.suicide()
-                    for msg in response_messages:
-                        await websocket.send(json.dumps(msg))
-                    continue
-
-                cmd = data.get('cmd')
-                response_messages = []
-
-                if cmd == 'move':
-                    direction = data.get('dir')
-                    response_messages = game.move(direction)
-
-                elif cmd == 'use_item':
-                    item_name = data.get('item_name')
-                    response_messages = game.use_item(item_name)
-
-                elif cmd == 'merchant_info':
-                    response_messages = game.merchant_info()
-
-                elif cmd == 'trade':
-                    item_name = data.get('item_name')
-                    response_messages = game.trade(item_name)
-
-                elif cmd == 'forge_info':
-                    response_messages = game.forge_info()
-
-                elif cmd == 'forge':
-                    attribute_index = data.get('attribute_index')
-                    if attribute_index is not None:
-                        response_messages = game.forge(int(attribute_index))
-                    else:
-                        response_messages = [{'type': 'log', 'message': '缺少词条索引参数'}]
-
-                elif cmd == 'forge_base_attr':
-                    equipment_type = data.get('equipment_type')
-                    if equipment_type:
-                        response_messages = game.forge_base_attr(equipment_type)
-                    else:
-                        response_messages = [{'type': 'log', 'message': '缺少装备类型参数'}]
-
-                elif cmd == 'add_random_attr':
-                    equipment_type = data.get('equipment_type')
-                    if equipment_type:
-                        response_messages = game.add_random_attr(equipment_type)
-                    else:
-                        response_messages = [{'type': 'log', 'message': '缺少装备类型参数'}]
-
-                elif cmd == 'reforge_attr':
-                    equipment_type = data.get('equipment_type')
-                    attribute_index = data.get('attribute_index')
-                    if equipment_type and attribute_index is not None:
-                        response_messages = game.reforge_attr(equipment_type, int(attribute_index))
-                    else:
-                        response_messages = [{'type': 'log', 'message': '缺少装备类型或词条索引参数'}]
-
-                else:
-                    response_messages = [{
-                        'type': 'log',
-                        'message': f'未知命令: {cmd}'
-                    }]
-
-                # 发送响应消息
-                for msg in response_messages:
-                    await websocket.send(json.dumps(msg))
+                # 按实际分发的处理函数统计本次执行的SQL（慢查询与N+1告警）
+                with track_request(resolve_request_name(data, game)):
+                    await dispatch_message(websocket, data, game, session_id)
 
             except json.JSONDecodeError:
                 await websocket.send(json.dumps({
@@ -1383,24 +1443,79 @@ async def handle_client(websocket):
             del games[session_id]
 
 
+async def monitor_database(interval: float = 5.0):
+    """
+    后台数据库健康检查：启动时测试一次连接，之后定期在熔断器到期时发起探测，
+    使数据库恢复不依赖玩家请求触发
+
+    数据库可用后检查一次表结构（背包upsert依赖的唯一键、会话吊销增量同步依赖的 revoked_at 列），缺失时报错并持续重试
+
+    Args:
+        interval: 检查间隔（秒）
+    """
+    available = False
+    try:
+        available = await asyncio.to_thread(dao_manager.is_available)
+        if not available:
+            logger.warning("数据库暂时不可用，恢复后自动启用")
+    except Exception as e:
+        logger.error(f"数据库连接测试失败: {e}")
+
+    schema_verified = False
+    while True:
+        if available and not schema_verified:
+            try:
+                schema_verified = await asyncio.to_thread(dao_manager.verify_schema)
+            except Exception as e:
+                logger.critical(f"数据库表结构检查失败，背包写入与会话停用将失败: {e}")
+
+        await asyncio.sleep(interval)
+        try:
+            available = await asyncio.to_thread(dao_manager.probe)
+        except Exception as e:
+            available = False
+            logger.error(f"数据库探测失败: {e}")
+
+
 async def main():
     """启动WebSocket服务器
 
     在Linux部署环境中，建议通过环境变量配置监听地址和端口：
     - TOWERGAME_HOST：默认 0.0.0.0
     - TOWERGAME_PORT：默认 8080
+    - TOWERGAME_FLOOR_POOL_DIR：可选，预生成楼层池目录（见 tools/floor_pool_generator.py）
+    - DB_BACKEND：可选，mysql（默认）、sqlite（单机嵌入式）或 memory（无需数据库，数据仅保存在进程内存中）
+    - RETENTION_ENABLED：可选，默认 1，数据库可用时在后台分批清理旧登录日志与过期会话
+    - DB_BREAKER_FAILURES / DB_BREAKER_RESET_SECONDS / DB_BREAKER_MAX_RESET_SECONDS：可选，数据库熔断阈值与退避时间
+    - DB_AUTO_MIGRATE：可选，默认 0；为 1 时启动发现缺失的新增列或唯一键会自动迁移（唯一键先合并重复数据）
     """
     import os
 
-    # 测试数据库连接
-    global DATABASE_AVAILABLE
-    DATABASE_AVAILABLE = False
+    # 检查数据库配置（DB_BACKEND=memory 时使用内存DAO，始终可用）；连接测试在后台进行，不阻塞启动，
+    # 运行期的可用性由连接池熔断器跟踪，数据库恢复后自动重新启用
+    global DATABASE_CONFIGURED
+    DATABASE_CONFIGURED = False
     try:
-        if db_config_manager.is_configured():
-            if connection_pool.test_connection():
-                DATABASE_AVAILABLE = True
-    except Exception:
-        pass
+        DATABASE_CONFIGURED = dao_manager.is_configured()
+    except Exception as e:
+        logger.error(f"数据库检查失败: {e}")
+
+    monitor_task = None
+    if DATABASE_CONFIGURED:
+        monitor_task = asyncio.create_task(monitor_database())
+
+    # 后台数据维护（分批清理登录日志与过期会话）
+    maintenance_task = None
+    if DATABASE_CONFIGURED and os.getenv("RETENTION_ENABLED", "1") != "0":
+        maintenance_task = asyncio.create_task(service_manager.maintenance.run_scheduler())
+
+    # 加载预生成楼层池（可选）
+    floor_pool_dir = os.getenv("TOWERGAME_FLOOR_POOL_DIR")
+    if floor_pool_dir:
+        try:
+            floor_pool.load(floor_pool_dir)
+        except Exception as e:
+            logger.warning(f"楼层池加载失败，使用实时生成: {e}")
 
     host = os.getenv("TOWERGAME_HOST", "0.0.0.0")
     port = int(os.getenv("TOWERGAME_PORT", "8080"))
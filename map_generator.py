@@ -1,8 +1,9 @@
 import random
-from typing import List, Optional, Dict
+from collections import deque
+from typing import List, Optional, Dict, Tuple
 
 from game_model import (
-    Floor, Room, Position, Cell, CellType,
+    Floor, FloorTemplate, Room, Position, Cell, CellType,
     Monster, Item, FINAL_BOSS, Merchant, MerchantItem,
     WeaponAttribute, ArmorAttribute, ATTRIBUTE_TYPES, ARMOR_ATTRIBUTE_TYPES, RARITY_CONFIG
 )
@@ -10,6 +11,7 @@ from game_model import (
 # 导入新的工具类和配置
 from utils.position_utils import PositionUtils
 from utils.game_utils import GameUtils
+from utils.sampling_utils import WeightedSampler, build_description_formatters
 from config.game_config import config_manager
 
 
@@ -35,48 +37,10 @@ def find_nearest_valid_position(floor: Floor, target_pos: Position) -> Position:
     Returns:
         最近的可用位置
     """
-    # 首先检查目标位置本身
-    if (0 <= target_pos.x < floor.width and
-        0 <= target_pos.y < floor.height and
-        floor.grid[target_pos.x][target_pos.y].passable):
-
-        has_entity = (floor.get_monster_at(target_pos) or
-                     floor.get_item_at(target_pos))
-
-        if not has_entity:
-            return target_pos
-
-    # 从目标位置开始，逐渐扩大搜索范围
-    max_radius = max(floor.width, floor.height)
-    for radius in range(1, max_radius):
-        # 在指定半径内搜索可用位置
-        for dx in range(-radius, radius + 1):
-            for dy in range(-radius, radius + 1):
-                if abs(dx) == radius or abs(dy) == radius:  # 只搜索边缘
-                    candidate_pos = Position(
-                        target_pos.x + dx,
-                        target_pos.y + dy
-                    )
-
-                    # 检查边界和通行性
-                    if (0 <= candidate_pos.x < floor.width and
-                        0 <= candidate_pos.y < floor.height and
-                        floor.grid[candidate_pos.x][candidate_pos.y].passable):
-
-                        has_entity = (floor.get_monster_at(candidate_pos) or
-                                     floor.get_item_at(candidate_pos))
-
-                        if not has_entity:
-                            return candidate_pos
-
-    # 如果找不到，返回任意可用位置
-    for x in range(floor.width):
-        for y in range(floor.height):
-            pos = Position(x, y)
-            if floor.grid[pos.x][pos.y].passable:
-                has_entity = (floor.get_monster_at(pos) or floor.get_item_at(pos))
-                if not has_entity:
-                    return pos
+    # BFS沿可通行格子向外搜索，结果与目标位置连通
+    pos = floor.find_nearest_free_position(target_pos)
+    if pos is not None:
+        return pos
 
     # 如果还是找不到（极端情况），返回地图中心位置
     default_pos = Position(floor.width // 2, floor.height // 2)
@@ -108,45 +72,6 @@ def get_guard_radius(item_type: str) -> int:
     else:
         return 2  # 血瓶守卫半径2格
 
-def calculate_guard_score(candidate_pos: Position, target_pos: Position, item_type: str) -> float:
-    """计算候选位置作为守卫位置的评分"""
-    distance = PositionUtils.manhattan_distance(candidate_pos, target_pos)
-
-    # 获取物品权重
-    base_weight = get_item_weight(item_type)
-
-    # 距离评分（越近越好，但不要太近）
-    if distance == 0:
-        return 0  # 不要直接站在物品上
-    elif distance <= 2:
-        return base_weight * 1.5  # 近距离高评分
-    elif distance <= get_guard_radius(item_type):
-        return base_weight * (1.0 - (distance - 2) * 0.2)  # 距离增加评分递减
-    else:
-        return base_weight * 0.1  # 超出半径低评分
-
-def is_valid_guard_position_relaxed(floor: Floor, pos: Position, existing_guards: List[Position], min_distance: int = 1) -> bool:
-    """检查位置是否适合作为守卫位置（宽松版）"""
-    # 检查边界
-    if not (0 <= pos.x < floor.width and 0 <= pos.y < floor.height):
-        return False
-
-    # 检查是否可通行（允许楼梯位置，因为楼梯本身是可通行的）
-    cell = floor.grid[pos.x][pos.y]
-    if cell.type == CellType.WALL or not cell.passable:
-        return False
-
-    # 检查是否已有实体（怪物或道具）
-    if cell.entity is not None:
-        return False
-
-    # 检查是否与现有守卫太近（使用指定的最小距离）
-    for guard_pos in existing_guards:
-        if PositionUtils.manhattan_distance(pos, guard_pos) < min_distance:
-            return False
-
-    return True
-
 def is_valid_guard_position(floor: Floor, pos: Position, existing_guards: List[Position]) -> bool:
     """检查位置是否适合作为守卫位置"""
     # 检查边界
@@ -169,47 +94,47 @@ def is_valid_guard_position(floor: Floor, pos: Position, existing_guards: List[P
 
     return True
 
+# ==================== 词条采样表 ====================
+
+# 词条配置为静态表，采样器与描述格式化器在导入时构建一次
+WEAPON_ATTRIBUTE_KEYS = tuple(ATTRIBUTE_TYPES.keys())
+WEAPON_DESCRIPTION_FORMATTERS = build_description_formatters(ATTRIBUTE_TYPES)
+ARMOR_ATTRIBUTE_SAMPLER = WeightedSampler(
+    list(ARMOR_ATTRIBUTE_TYPES.keys()),
+    [attr_config['weight'] for attr_config in ARMOR_ATTRIBUTE_TYPES.values()]
+)
+ARMOR_DESCRIPTION_FORMATTERS = build_description_formatters(ARMOR_ATTRIBUTE_TYPES)
+
 # ==================== 武器随机属性生成 ====================
 
+def _build_attribute(attr_class, attr_type: str, attr_config: Dict, formatter, floor_level: int, rarity_multiplier: float):
+    """基于楼层和稀有度计算词条数值并生成描述"""
+    base_value = attr_config['base_value'] + floor_level * attr_config['scale']
+    final_value = base_value * rarity_multiplier
+    return attr_class(
+        attribute_type=attr_type,
+        value=final_value,
+        description=formatter.format(final_value),
+        level=0
+    )
+
+
 def generate_weapon_attributes(floor_level: int, rarity: str) -> List[WeaponAttribute]:
     """为武器生成随机属性列表"""
     if rarity not in RARITY_CONFIG:
         rarity = 'common'
 
-    attr_count = RARITY_CONFIG[rarity]['attr_count']
+    rarity_config = RARITY_CONFIG[rarity]
+    attr_count = rarity_config['attr_count']
 
     # 随机选择属性类型（不重复）
-    available_types = list(ATTRIBUTE_TYPES.keys())
-    selected_types = random.sample(available_types, min(attr_count, len(available_types)))
-
-    attributes = []
-    for attr_type in selected_types:
-        attr_config = ATTRIBUTE_TYPES[attr_type]
-
-        # 基于楼层和稀有度计算数值，先计算浮点值，再按展示需求处理
-        base_value = attr_config['base_value'] + floor_level * attr_config['scale']
-        rarity_multiplier = RARITY_CONFIG[rarity]['multiplier']
-        final_value = base_value * rarity_multiplier
-
-        # 创建属性 - 处理特殊格式化字符串
-        description = attr_config['description']
-        if '{value*100}' in description:
-            # 百分比类词条：使用一位小数展示百分比
-            description = description.replace('{value*100}', f'{final_value*100:.1f}')
-        else:
-            # 非百分比词条：按整数四舍五入展示，避免出现长小数
-            value_str = str(int(round(final_value)))
-            description = description.format(value=value_str)
-
-        attribute = WeaponAttribute(
-            attribute_type=attr_type,
-            value=final_value,
-            description=description,
-            level=0
-        )
-        attributes.append(attribute)
+    selected_types = random.sample(WEAPON_ATTRIBUTE_KEYS, min(attr_count, len(WEAPON_ATTRIBUTE_KEYS)))
 
-    return attributes
+    return [
+        _build_attribute(WeaponAttribute, attr_type, ATTRIBUTE_TYPES[attr_type],
+                         WEAPON_DESCRIPTION_FORMATTERS[attr_type], floor_level, rarity_config['multiplier'])
+        for attr_type in selected_types
+    ]
 
 def generate_weapon_name(floor_level: int, rarity: str, attributes: List[WeaponAttribute]) -> str:
     """为武器生成动态名称"""
@@ -246,60 +171,28 @@ def generate_weapon_name(floor_level: int, rarity: str, attributes: List[WeaponA
 
 def generate_rarity() -> str:
     """随机生成稀有度"""
-    # 使用加权随机选择
-    weights = []
-    rarities = []
-    for rarity, config in RARITY_CONFIG.items():
-        weights.append(config['probability'])
-        rarities.append(rarity)
+    return config_manager.get_compiled().rarity_sampler.sample()
 
-    return random.choices(rarities, weights=weights)[0]
+def generate_rarities(count: int) -> List[str]:
+    """批量生成稀有度（用于模拟与批量生成）"""
+    return config_manager.get_compiled().rarity_sampler.sample_many(count)
 
 def generate_armor_attributes(floor_level: int, rarity: str) -> List[ArmorAttribute]:
     """为防具生成随机属性列表"""
     if rarity not in RARITY_CONFIG:
         rarity = 'common'
 
-    attr_count = RARITY_CONFIG[rarity]['attr_count']
+    rarity_config = RARITY_CONFIG[rarity]
+    attr_count = rarity_config['attr_count']
 
     # 按权重选择属性类型（不重复）
-    available_types = list(ARMOR_ATTRIBUTE_TYPES.keys())
-    selected_types = []
-
-    for _ in range(min(attr_count, len(available_types))):
-        weights = [ARMOR_ATTRIBUTE_TYPES[attr]['weight'] for attr in available_types]
-        selected = random.choices(available_types, weights=weights)[0]
-        selected_types.append(selected)
-        available_types.remove(selected)
-
-    attributes = []
-    for attr_type in selected_types:
-        attr_config = ARMOR_ATTRIBUTE_TYPES[attr_type]
-
-        # 基于楼层和稀有度计算数值，先计算浮点值，再按展示需求处理
-        base_value = attr_config['base_value'] + floor_level * attr_config['scale']
-        rarity_multiplier = RARITY_CONFIG[rarity]['multiplier']
-        final_value = base_value * rarity_multiplier
-
-        # 创建属性 - 处理特殊格式化字符串
-        description = attr_config['description']
-        if '{value*100}' in description:
-            # 百分比类词条：使用一位小数展示百分比
-            description = description.replace('{value*100}', f'{final_value*100:.1f}')
-        else:
-            # 非百分比词条：按整数四舍五入展示，避免出现长小数
-            value_str = str(int(round(final_value)))
-            description = description.format(value=value_str)
-
-        attribute = ArmorAttribute(
-            attribute_type=attr_type,
-            value=final_value,
-            description=description,
-            level=0
-        )
-        attributes.append(attribute)
+    selected_types = ARMOR_ATTRIBUTE_SAMPLER.sample_distinct(attr_count)
 
-    return attributes
+    return [
+        _build_attribute(ArmorAttribute, attr_type, ARMOR_ATTRIBUTE_TYPES[attr_type],
+                         ARMOR_DESCRIPTION_FORMATTERS[attr_type], floor_level, rarity_config['multiplier'])
+        for attr_type in selected_types
+    ]
 
 def generate_armor_name(floor_level: int, rarity: str, attributes: List[ArmorAttribute]) -> str:
     """为防具生成动态名称"""
@@ -336,12 +229,13 @@ def generate_armor_name(floor_level: int, rarity: str, attributes: List[ArmorAtt
 def generate_monster(floor_level: int, position: Position) -> Monster:
     """生成怪物，属性随层数指数增长"""
     config = config_manager.get_config()
+    stats = config_manager.get_compiled().floor(floor_level)
 
-    base_hp = config.MONSTER_BASE_HP + floor_level * config.MONSTER_HP_PER_FLOOR
-    base_atk = config.MONSTER_BASE_ATK + floor_level * config.MONSTER_ATK_PER_FLOOR
-    base_def = config.MONSTER_BASE_DEF + floor_level * config.MONSTER_DEF_PER_FLOOR
-    base_exp = config.MONSTER_BASE_EXP + floor_level * config.MONSTER_EXP_PER_FLOOR
-    base_gold = config.MONSTER_BASE_GOLD + floor_level * config.MONSTER_GOLD_PER_FLOOR
+    base_hp = stats.monster_hp
+    base_atk = stats.monster_atk
+    base_def = stats.monster_def
+    base_exp = stats.monster_exp
+    base_gold = stats.monster_gold
 
     hp = int(base_hp * random.uniform(1 - config.MONSTER_HP_VARIANCE, 1 + config.MONSTER_HP_VARIANCE))
     atk = int(base_atk * random.uniform(1 - config.MONSTER_ATK_VARIANCE, 1 + config.MONSTER_ATK_VARIANCE))
@@ -405,66 +299,108 @@ def generate_guard_monster(floor_level: int, position: Position, guarded_item_ty
 
     return monster
 
-def find_best_guard_position(floor: Floor, rooms: List[Room], target_item: Item,
-                           existing_guards: List[Position]) -> Optional[Position]:
-    """为指定物品找到最佳的守卫位置"""
-    best_score = 0
-    best_position = None
+def compute_distance_field(floor: Floor, source: Position, max_distance: int) -> Dict[tuple, int]:
+    """
+    从源点出发沿可通行格子做BFS，得到步行距离场
 
-    radius = get_guard_radius(target_item.effect_type)
+    Args:
+        floor: 楼层对象
+        source: 源点（通常是关键物品位置）
+        max_distance: 最大搜索距离
 
-    # 在物品周围搜索最佳守卫位置
-    for dx in range(-radius, radius + 1):
-        for dy in range(-radius, radius + 1):
-            if dx == 0 and dy == 0:
-                continue  # 跳过物品本身位置
+    Returns:
+        {(x, y): 步行距离}，按距离从近到远排列
+    """
+    field = {(source.x, source.y): 0}
+    queue = deque([(source.x, source.y)])
+    grid = floor.grid
+
+    while queue:
+        x, y = queue.popleft()
+        distance = field[(x, y)]
+        if distance >= max_distance:
+            continue
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if (0 <= nx < floor.width and 0 <= ny < floor.height and
+                    (nx, ny) not in field and grid[nx][ny].passable):
+                field[(nx, ny)] = distance + 1
+                queue.append((nx, ny))
+
+    return field
+
+
+def score_guard_distance(distance: int, base_weight: float, guard_radius: int) -> float:
+    """根据守卫与物品的步行距离计算评分"""
+    if distance == 0:
+        return 0
+    elif distance <= 2:
+        return base_weight * 1.5
+    elif distance <= guard_radius:
+        return base_weight * (1.0 - (distance - 2) * 0.2)
+    else:
+        return base_weight * 0.1
 
-            candidate_pos = Position(target_item.position.x + dx, target_item.position.y + dy)
 
-            # 检查位置有效性（使用更宽松的条件）
-            if not is_valid_guard_position_relaxed(floor, candidate_pos, existing_guards):
-                continue
+# 守卫搜索的最大步行距离（对应原先扩展半径5的方框范围）
+GUARD_SEARCH_MAX_DISTANCE = 10
 
-            # 计算守卫评分
-            score = calculate_guard_score(candidate_pos, target_item.position, target_item.effect_type)
 
-            if score > best_score:
-                best_score = score
-                best_position = candidate_pos
+def find_best_guard_position(floor: Floor, rooms: List[Room], target_item: Item,
+                           existing_guards: List[Position],
+                           exclusion_mask: Optional[set] = None) -> Optional[Position]:
+    """
+    为指定物品找到最佳的守卫位置
 
-    # 如果找不到合适位置，尝试扩大搜索半径
-    if best_position is None and radius < 5:
-        extended_radius = min(radius + 2, 5)
-        for dx in range(-extended_radius, extended_radius + 1):
-            for dy in range(-extended_radius, extended_radius + 1):
-                if dx == 0 and dy == 0:
-                    continue
+    从物品出发计算步行距离场，只在与物品连通的格子中选择评分最高的位置；
+    距离场按远近排列，同分时取更近的位置。
 
-                candidate_pos = Position(target_item.position.x + dx, target_item.position.y + dy)
+    Args:
+        floor: 楼层对象
+        rooms: 房间列表
+        target_item: 被守卫的物品
+        existing_guards: 已放置的守卫位置
+        exclusion_mask: 守卫排除集合 {(x, y)}，默认由 existing_guards 构建
 
-                # 使用更宽松的条件
-                if not is_valid_guard_position_relaxed(floor, candidate_pos, existing_guards, min_distance=0):
-                    continue
+    Returns:
+        守卫位置，找不到时返回None
+    """
+    if exclusion_mask is None:
+        exclusion_mask = {(pos.x, pos.y) for pos in existing_guards}
 
-                score = calculate_guard_score(candidate_pos, target_item.position, target_item.effect_type)
+    base_weight = get_item_weight(target_item.effect_type)
+    guard_radius = get_guard_radius(target_item.effect_type)
+    field = compute_distance_field(floor, target_item.position, GUARD_SEARCH_MAX_DISTANCE)
 
-                if score > best_score:
-                    best_score = score
-                    best_position = candidate_pos
+    best_score = 0
+    best_position = None
+    for (x, y), distance in field.items():
+        if (x, y) in exclusion_mask:
+            continue
+        cell = floor.grid[x][y]
+        if cell.entity is not None or cell.type == CellType.WALL:
+            continue
+
+        score = score_guard_distance(distance, base_weight, guard_radius)
+        if score > best_score:
+            best_score = score
+            best_position = Position(x, y)
 
     return best_position
 
 def place_guard_monsters(floor: Floor, rooms: List[Room], key_items: List[Item]) -> List[Position]:
     """在关键物品附近战略性放置守卫怪物"""
     guard_positions = []
+    # 出生点与楼梯不放置守卫
+    exclusion_mask = {(pos.x, pos.y) for pos in (floor.player_start_pos, floor.stairs_pos) if pos}
 
     # 按物品价值排序（武器/防具优先）
     sorted_items = sorted(key_items, key=lambda item: get_item_weight(item.effect_type), reverse=True)
 
     for item in sorted_items:
-        best_guard_pos = find_best_guard_position(floor, rooms, item, guard_positions)
+        best_guard_pos = find_best_guard_position(floor, rooms, item, guard_positions, exclusion_mask)
         if best_guard_pos:
             guard_positions.append(best_guard_pos)
+            exclusion_mask.add((best_guard_pos.x, best_guard_pos.y))
             # 创建守卫怪物
             monster = generate_guard_monster(floor.level, best_guard_pos, item.effect_type)
             floor.monsters[monster.id] = monster
@@ -526,59 +462,22 @@ def place_strategic_item(floor: Floor, rooms: List[Room], key_items: List[Item],
 
 def generate_item(floor_level: int, position: Position, forced_type: Optional[str] = None) -> Item:
     """生成道具，属性随层数增长"""
-    config = config_manager.get_config()
-    item_weights = config.ITEM_WEIGHTS
+    compiled = config_manager.get_compiled()
+    stats = compiled.floor(floor_level)
 
     if forced_type:
         item_type = forced_type
     else:
-        item_types = list(item_weights.keys())
-        weights = [item_weights[it] for it in item_types]
-        item_type = random.choices(item_types, weights=weights)[0]
+        item_type = compiled.item_type_sampler.sample()
 
     if item_type == 'potion':
         # 使用档位+百分比回血的药瓶系统
-        # 基础权重从配置读取，并根据楼层轻微偏向中/大药瓶
-        base_weights = getattr(config, 'POTION_TYPE_WEIGHTS', None) or {
-            'small': 0.5,
-            'medium': 0.35,
-            'large': 0.15
-        }
-
-        small_w = base_weights.get('small', 0.5)
-        medium_w = base_weights.get('medium', 0.35)
-        large_w = base_weights.get('large', 0.15)
-
-        # 楼层越高，中/大药瓶权重越高，掉落机制更加友好
-        if 20 <= floor_level < 50:
-            small_w *= 0.7
-            medium_w *= 1.2
-            large_w *= 1.4
-        elif floor_level >= 50:
-            small_w *= 0.4
-            medium_w *= 1.3
-            large_w *= 1.8
-
-        weight_sum = small_w + medium_w + large_w
-        if weight_sum <= 0:
-            small_w, medium_w, large_w = 0.5, 0.35, 0.15
-
-        potion_types = ['small', 'medium', 'large']
-        potion_weights = [small_w, medium_w, large_w]
-        potion_type = random.choices(potion_types, weights=potion_weights)[0]
-
-        if potion_type == 'medium':
-            potion_name = config.POTION_MEDIUM_NAME
-            heal_rate = config.POTION_MEDIUM_HEAL_RATE
-        elif potion_type == 'large':
-            potion_name = config.POTION_LARGE_NAME
-            heal_rate = config.POTION_LARGE_HEAL_RATE
-        else:
-            potion_name = config.POTION_SMALL_NAME
-            heal_rate = config.POTION_SMALL_HEAL_RATE
+        # 各楼层的档位权重已在配置快照中预计算（楼层越高越偏向中/大药瓶）
+        potion_type = stats.potion_sampler.sample()
+        potion_name, heal_percent = compiled.potion_types[potion_type]
 
         # effect_value 使用百分比数值，便于前端与商人界面展示
-        effect_value = int(heal_rate * 100)
+        effect_value = heal_percent
         symbol = '+'
         return Item(
             symbol=symbol,
@@ -591,7 +490,7 @@ def generate_item(floor_level: int, position: Position, forced_type: Optional[st
         rarity = generate_rarity()
         attributes = generate_weapon_attributes(floor_level, rarity)
         weapon_name = generate_weapon_name(floor_level, rarity, attributes)
-        attack_value = config.WEAPON_BASE_ATK + floor_level * config.WEAPON_ATK_PER_FLOOR
+        attack_value = stats.weapon_atk
 
         return Item(
             symbol='↑',
@@ -607,7 +506,7 @@ def generate_item(floor_level: int, position: Position, forced_type: Optional[st
         rarity = generate_rarity()
         armor_attributes = generate_armor_attributes(floor_level, rarity)
         armor_name = generate_armor_name(floor_level, rarity, armor_attributes)
-        effect_value = config.ARMOR_BASE_DEF + floor_level * config.ARMOR_DEF_PER_FLOOR
+        effect_value = stats.armor_def
         symbol = '◆'
 
         return Item(
@@ -622,6 +521,105 @@ def generate_item(floor_level: int, position: Position, forced_type: Optional[st
         )
 
 
+# ==================== 房间布局 ====================
+
+def build_summed_area_table(occupancy: List[List[int]]) -> List[List[int]]:
+    """
+    构建占用位图的二维前缀和（summed-area table）
+
+    Args:
+        occupancy: occupancy[x][y] 为1表示已占用
+
+    Returns:
+        sat，sat[x+1][y+1] 为 [0..x]×[0..y] 范围内的占用数
+    """
+    width = len(occupancy)
+    height = len(occupancy[0]) if width else 0
+    sat = [[0] * (height + 1) for _ in range(width + 1)]
+    for x in range(width):
+        column = occupancy[x]
+        prev = sat[x]
+        cur = sat[x + 1]
+        running = 0
+        for y in range(height):
+            running += column[y]
+            cur[y + 1] = prev[y + 1] + running
+    return sat
+
+
+def is_rect_free(sat: List[List[int]], x0: int, y0: int, x1: int, y1: int) -> bool:
+    """判断闭区间矩形 [x0..x1]×[y0..y1] 是否完全空闲（O(1)）"""
+    return sat[x1 + 1][y1 + 1] - sat[x0][y1 + 1] - sat[x1 + 1][y0] + sat[x0][y0] == 0
+
+
+def find_free_room_positions(sat: List[List[int]], room_width: int, room_height: int,
+                             width: int, height: int) -> List[Position]:
+    """
+    枚举指定尺寸房间的所有合法左上角位置（留出边界1格且不与已有房间重叠）
+
+    Room.intersects 将相邻房间也视为重叠，因此检查的是包含右/下侧一格的扩展矩形。
+    """
+    positions = []
+    for x in range(1, width - room_width):
+        for y in range(1, height - room_height):
+            if is_rect_free(sat, x, y, x + room_width, y + room_height):
+                positions.append(Position(x, y))
+    return positions
+
+
+def place_rooms(width: int, height: int, room_count: int) -> List[Room]:
+    """
+    基于占用位图放置房间
+
+    每个房间先随机尺寸，再在所有合法位置中均匀选取；当前尺寸放不下时依次尝试其它尺寸，
+    所有尺寸都放不下则提前结束。耗时只与地图大小和尺寸种类有关，不依赖随机重试。
+
+    Args:
+        width: 地图宽度
+        height: 地图高度
+        room_count: 期望房间数
+
+    Returns:
+        房间列表
+    """
+    config = config_manager.get_config()
+    sizes = [(w, h)
+             for w in range(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX + 1)
+             for h in range(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX + 1)]
+
+    occupancy = [[0] * height for _ in range(width)]
+    rooms: List[Room] = []
+
+    for _ in range(room_count):
+        sat = build_summed_area_table(occupancy)
+
+        # 首选随机尺寸，其余尺寸随机顺序作为后备
+        preferred = (random.randint(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX),
+                     random.randint(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX))
+        fallback = [size for size in sizes if size != preferred]
+        random.shuffle(fallback)
+
+        new_room = None
+        for room_width, room_height in [preferred] + fallback:
+            positions = find_free_room_positions(sat, room_width, room_height, width, height)
+            if positions:
+                pos = random.choice(positions)
+                new_room = Room(pos.x, pos.y, room_width, room_height)
+                break
+
+        if new_room is None:
+            break
+
+        rooms.append(new_room)
+        # 标记占用（含右/下侧一格，与 intersects 的判定一致）
+        for i in range(new_room.x, min(width, new_room.x + new_room.width + 1)):
+            column = occupancy[i]
+            for j in range(new_room.y, min(height, new_room.y + new_room.height + 1)):
+                column[j] = 1
+
+    return rooms
+
+
 def connect_rooms(room1: Room, room2: Room, floor: Floor):
     """连接两个房间，用直线走廊"""
     # 从room1中心到room2中心
@@ -677,6 +675,144 @@ def carve_corridor_between_positions(start: Position, end: Position, floor: Floo
         if cell.type == CellType.WALL:
             floor.grid[x2][y] = Cell(CellType.EMPTY, passable=True)
 
+# ==================== 连通性校验 ====================
+
+def label_passable_components(floor: Floor) -> List[List[int]]:
+    """
+    并查集单次扫描标记可通行连通块
+
+    每个可通行格子只与左侧、上方的可通行邻居合并，扫描一遍即可完成。
+    实体（怪物/道具）不影响连通性：怪物可被击败，道具可被拾取。
+
+    Args:
+        floor: 楼层对象
+
+    Returns:
+        labels[x][y]：可通行格子为连通块根编号，墙体为-1
+    """
+    width, height = floor.width, floor.height
+    parent = list(range(width * height))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    grid = floor.grid
+    for x in range(width):
+        column = grid[x]
+        for y in range(height):
+            if not column[y].passable:
+                continue
+            index = x * height + y
+            if x > 0 and grid[x - 1][y].passable:
+                root_a, root_b = find(index), find(index - height)
+                if root_a != root_b:
+                    parent[root_a] = root_b
+            if y > 0 and column[y - 1].passable:
+                root_a, root_b = find(index), find(index - 1)
+                if root_a != root_b:
+                    parent[root_a] = root_b
+
+    return [
+        [find(x * height + y) if grid[x][y].passable else -1 for y in range(height)]
+        for x in range(width)
+    ]
+
+
+def carve_shortest_connection(floor: Floor, labels: List[List[int]], source_label: int,
+                              target_label: int) -> int:
+    """
+    从源连通块出发做多源BFS（可穿墙，不挖边界），找到目标连通块后只挖开路径上的墙体
+
+    Returns:
+        挖开的墙体格子数
+    """
+    width, height = floor.width, floor.height
+    previous = {}
+    queue = deque()
+    for x in range(width):
+        for y in range(height):
+            if labels[x][y] == source_label:
+                previous[(x, y)] = None
+                queue.append((x, y))
+
+    while queue:
+        x, y = queue.popleft()
+        if labels[x][y] == target_label:
+            carved = 0
+            node = (x, y)
+            while node is not None:
+                cx, cy = node
+                if not floor.grid[cx][cy].passable:
+                    floor.grid[cx][cy] = Cell(CellType.EMPTY, passable=True)
+                    carved += 1
+                node = previous[node]
+            return carved
+
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if (nx, ny) in previous:
+                continue
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            # 墙体只允许挖内部格子，保留地图边界
+            if labels[nx][ny] == -1 and not (0 < nx < width - 1 and 0 < ny < height - 1):
+                continue
+            previous[(nx, ny)] = (x, y)
+            queue.append((nx, ny))
+
+    return 0
+
+
+def ensure_floor_connectivity(floor: Floor) -> int:
+    """
+    确保楼梯、所有道具和商人都能从出生点到达，不连通时用最短走廊修复
+
+    Args:
+        floor: 楼层对象
+
+    Returns:
+        为修复连通性挖开的格子总数
+    """
+    start = floor.player_start_pos
+    if start is None:
+        return 0
+
+    targets = [item.position for item in floor.items.values()]
+    if floor.stairs_pos:
+        targets.append(floor.stairs_pos)
+    if floor.merchant and floor.merchant.position:
+        targets.append(floor.merchant.position)
+
+    carved = 0
+    labels = label_passable_components(floor)
+    for target in targets:
+        start_label = labels[start.x][start.y]
+        target_label = labels[target.x][target.y]
+        if start_label == target_label and start_label != -1:
+            continue
+
+        if start_label == -1:
+            floor.grid[start.x][start.y] = Cell(CellType.EMPTY, passable=True)
+            carved += 1
+        if target_label == -1:
+            floor.grid[target.x][target.y] = Cell(
+                floor.grid[target.x][target.y].type, passable=True, entity=floor.grid[target.x][target.y].entity
+            )
+            carved += 1
+        if start_label == -1 or target_label == -1:
+            labels = label_passable_components(floor)
+            start_label = labels[start.x][start.y]
+            target_label = labels[target.x][target.y]
+            if start_label == target_label:
+                continue
+
+        carved += carve_shortest_connection(floor, labels, start_label, target_label)
+        labels = label_passable_components(floor)
+
+    return carved
+
 # ==================== 商人楼层生成 ====================
 
 def generate_merchant(floor_level: int) -> Merchant:
@@ -687,17 +823,14 @@ def generate_merchant(floor_level: int) -> Merchant:
 def generate_merchant_inventory(floor_level: int) -> List[MerchantItem]:
     """生成商人库存"""
     config = config_manager.get_config()
+    stats = config_manager.get_compiled().floor(floor_level)
     inventory: List[MerchantItem] = []
-    base_price = config.MERCHANT_BASE_PRICE + floor_level * config.MERCHANT_PRICE_PER_FLOOR
 
     # 药瓶 (3-4个)：与野外掉落共用档位/百分比配置
     potion_count = random.randint(*config.MERCHANT_POTION_RANGE)
-    medium_percent = int(getattr(config, 'POTION_MEDIUM_HEAL_RATE', 0.5) * 100) or 50
     for i in range(potion_count):
         potion_item = generate_item(floor_level, Position(0, 0), forced_type='potion')
-        rate_percent = potion_item.effect_value or medium_percent
-        price_factor = rate_percent / medium_percent
-        price = int(base_price * config.MERCHANT_POTION_PRICE_MULTIPLIER * price_factor)
+        price = stats.get_merchant_potion_price(potion_item.effect_value)
         inventory.append(MerchantItem(
             potion_item.name,
             "potion",
@@ -709,7 +842,7 @@ def generate_merchant_inventory(floor_level: int) -> List[MerchantItem]:
     weapon_count = random.randint(*config.MERCHANT_WEAPON_RANGE)
     for i in range(weapon_count):
         weapon_item = generate_item(floor_level, Position(0, 0), forced_type='weapon')
-        price = int(base_price * config.MERCHANT_WEAPON_PRICE_MULTIPLIER)
+        price = stats.merchant_weapon_price
         inventory.append(MerchantItem(
             weapon_item.name,
             "weapon",
@@ -724,7 +857,7 @@ def generate_merchant_inventory(floor_level: int) -> List[MerchantItem]:
     armor_count = random.randint(*config.MERCHANT_ARMOR_RANGE)
     for i in range(armor_count):
         armor_item = generate_item(floor_level, Position(0, 0), forced_type='armor')
-        price = int(base_price * config.MERCHANT_ARMOR_PRICE_MULTIPLIER)
+        price = stats.merchant_armor_price
         inventory.append(MerchantItem(
             armor_item.name,
             "armor",
@@ -737,33 +870,52 @@ def generate_merchant_inventory(floor_level: int) -> List[MerchantItem]:
 
     return inventory
 
+# 商人楼层布局模板缓存 {(宽, 高): 模板}
+_MERCHANT_FLOOR_TEMPLATES: Dict[Tuple[int, int], FloorTemplate] = {}
+
+
+def get_merchant_floor_template(width: int, height: int) -> FloorTemplate:
+    """
+    获取商人楼层的只读布局模板（首次调用时构建并缓存）
+
+    布局：只有边界墙壁的空房间，楼梯在角落 (1, 1)
+    """
+    key = (width, height)
+    template = _MERCHANT_FLOOR_TEMPLATES.get(key)
+    if template is None:
+        grid = [
+            [
+                Cell(CellType.WALL, passable=False)
+                if y == 0 or y == height - 1 or x == 0 or x == width - 1
+                else Cell(CellType.EMPTY, passable=True)
+                for y in range(height)
+            ]
+            for x in range(width)
+        ]
+        grid[1][1] = Cell(CellType.STAIRS, passable=True)
+        template = FloorTemplate(grid)
+        _MERCHANT_FLOOR_TEMPLATES[key] = template
+    return template
+
+
 def generate_merchant_floor(floor_level: int) -> Floor:
     """生成商人楼层：15×15空房间，商人在中央，楼梯在角落"""
     config = config_manager.get_config()
     width, height = config.GRID_SIZE, config.GRID_SIZE
 
-    floor = Floor(floor_level, width, height)
+    # 布局共享只读模板，每次只生成商人及其商品
+    floor = Floor(floor_level, width, height, template=get_merchant_floor_template(width, height))
     floor.is_merchant_floor = True
 
-    # 15×15空房间，只有边界墙壁
-    for y in range(height):
-        for x in range(width):
-            # 创建边界墙壁
-            if y == 0 or y == height - 1 or x == 0 or x == width - 1:
-                floor.grid[x][y] = Cell(CellType.WALL, passable=False)
-            else:
-                floor.grid[x][y] = Cell(CellType.EMPTY, passable=True)
-
     # 商人在中央 (7, 7)
     merchant_pos = Position(7, 7)
     merchant = generate_merchant(floor_level)
     merchant.position = merchant_pos
     floor.merchant = merchant
-    floor.grid[7][7] = Cell(CellType.EMPTY, passable=True, entity=merchant)
+    floor.set_cell(merchant_pos, Cell(CellType.EMPTY, passable=True, entity=merchant))
 
     # 楼梯在角落 (1, 1)
     floor.stairs_pos = Position(1, 1)
-    floor.grid[1][1] = Cell(CellType.STAIRS, passable=True)
 
     # 玩家起始位置在另一角 (13, 13)
     floor.player_start_pos = Position(13, 13)
@@ -782,52 +934,60 @@ def generate_floor(level: int, prev_floor: Optional[Floor] = None, merchant_atte
     Returns:
         Floor对象
     """
+    if should_generate_merchant_floor(level, merchant_attempt_count):
+        return generate_merchant_floor(level)
+    return generate_normal_floor(level, prev_floor)
+
+
+def should_generate_merchant_floor(level: int, merchant_attempt_count: int = 0) -> bool:
+    """
+    判断本层是否为商人楼层
+
+    Args:
+        level: 楼层数
+        merchant_attempt_count: 距上次商人楼层的层数
+
+    Returns:
+        是否生成商人楼层
+    """
     config = config_manager.get_config()
 
     merchant_first_floor = config.MERCHANT_FIRST_FLOOR
     if level == merchant_first_floor:
-        return generate_merchant_floor(level)
+        return True
     elif merchant_first_floor < level < config.MAX_FLOORS:
         floors_since_last = merchant_attempt_count
         if floors_since_last >= config.MERCHANT_FORCE_INTERVAL:
-            return generate_merchant_floor(level)
+            return True
 
         probability = min(
             1.0,
             config.MERCHANT_BASE_CHANCE + floors_since_last * config.MERCHANT_CHANCE_INCREMENT
         )
         if floors_since_last > 0 and random.random() < probability:
-            return generate_merchant_floor(level)
-
-    width, height = config.GRID_SIZE, config.GRID_SIZE
-    floor = Floor(level, width, height)
+            return True
 
-    # 1. 创建房间数量从配置获取
-    rooms: List[Room] = []
-    room_count = random.randint(config.ROOM_COUNT_MIN, config.ROOM_COUNT_MAX)
-    max_attempts = 100
+    return False
 
-    for _ in range(room_count):
-        attempts = 0
-        while attempts < max_attempts:
-            # 随机房间大小从配置获取
-            room_width = random.randint(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX)
-            room_height = random.randint(config.ROOM_SIZE_MIN, config.ROOM_SIZE_MAX)
-
-            # 随机位置（留出边界1格）
-            x = random.randint(1, width - room_width - 1)
-            y = random.randint(1, height - room_height - 1)
 
-            new_room = Room(x, y, room_width, room_height)
+def generate_normal_floor(level: int, prev_floor: Optional[Floor] = None) -> Floor:
+    """
+    生成普通楼层（房间+走廊风格，不做商人楼层判定）
 
-            # 检查是否与其他房间重叠
-            overlap = any(new_room.intersects(room) for room in rooms)
+    Args:
+        level: 楼层数（1-100）
+        prev_floor: 上一层（用于获取玩家出生点）
 
-            if not overlap:
-                rooms.append(new_room)
-                break
+    Returns:
+        Floor对象
+    """
+    config = config_manager.get_config()
+    width, height = config.GRID_SIZE, config.GRID_SIZE
+    floor = Floor(level, width, height)
 
-            attempts += 1
+    # 1. 创建房间数量从配置获取
+    room_count = random.randint(config.ROOM_COUNT_MIN, config.ROOM_COUNT_MAX)
+    rooms = place_rooms(width, height, room_count)
 
     # 2. 绘制房间
     for room in rooms:
@@ -886,11 +1046,8 @@ def generate_floor(level: int, prev_floor: Optional[Floor] = None, merchant_atte
                 CellType.STAIRS, passable=True
             )
 
-            # 初步确保出生点与楼梯连通（此时尚未放置怪物/道具）
-            if floor.player_start_pos:
-                connected_area = floor.get_connected_area(floor.player_start_pos)
-                if floor.stairs_pos not in connected_area:
-                    carve_corridor_between_positions(floor.player_start_pos, floor.stairs_pos, floor)
+            # 初步确保出生点与楼梯连通，守卫距离场依赖于此
+            ensure_floor_connectivity(floor)
 
         # === 新的战略性放置系统 ===
 
@@ -971,4 +1128,28 @@ def generate_floor(level: int, prev_floor: Optional[Floor] = None, merchant_atte
             for _ in range(remaining_potion_count):
                 place_strategic_item(floor, rooms, key_items, item_type='potion')
 
+        # 6. 最终校验：所有道具与楼梯都必须可达
+        ensure_floor_connectivity(floor)
+
     return floor
+
+
+def find_layout_violations(floor: Floor) -> List[str]:
+    """
+    检查楼层布局约束：出生点不能有实体，楼梯上不能有怪物
+
+    Args:
+        floor: 楼层对象
+
+    Returns:
+        违反约束的描述列表，为空表示布局有效
+    """
+    violations = []
+    start = floor.player_start_pos
+    if start and floor.grid[start.x][start.y].entity is not None:
+        violations.append(f"第{floor.level}层出生点({start.x}, {start.y})存在实体: "
+                          f"{getattr(floor.grid[start.x][start.y].entity, 'name', '?')}")
+    stairs = floor.stairs_pos
+    if stairs and floor.get_monster_at(stairs):
+        violations.append(f"第{floor.level}层楼梯({stairs.x}, {stairs.y})上存在怪物")
+    return violations
@@ -8,69 +8,98 @@ from .merchant_service import MerchantService
 from .auth_service import AuthService
 from .equipment_service import EquipmentService
 from .inventory_service import InventoryService
+from .maintenance_service import MaintenanceService
+from .base_service import BaseService
+from typing import Dict
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 class ServiceManager:
-    """服务层管理器"""
+    """服务层管理器（服务实例在首次访问时创建）"""
+
+    # 服务名 -> 服务类
+    SERVICE_CLASSES = {
+        'player': PlayerService,
+        'game_save': GameSaveService,
+        'merchant': MerchantService,
+        'auth': AuthService,
+        'equipment': EquipmentService,
+        'inventory': InventoryService,
+        'maintenance': MaintenanceService
+    }
 
     def __init__(self):
-        """初始化所有服务实例"""
-        self.player_service = PlayerService()
-        self.game_save_service = GameSaveService()
-        self.merchant_service = MerchantService()
-        self.auth_service = AuthService()
-        self.equipment_service = EquipmentService()
-        self.inventory_service = InventoryService()
+        """初始化服务管理器"""
+        self._services: Dict[str, BaseService] = {}
+        self._lock = threading.RLock()
+
+    def get_service(self, name: str) -> BaseService:
+        """获取服务实例（首次访问时创建）"""
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    service = self._services[name] = self.SERVICE_CLASSES[name]()
+        return service
 
     # 玩家相关服务
     @property
     def player(self) -> PlayerService:
         """玩家服务"""
-        return self.player_service
+        return self.get_service('player')
 
     # 游戏存档相关服务
     @property
     def game_save(self) -> GameSaveService:
         """游戏存档服务"""
-        return self.game_save_service
+        return self.get_service('game_save')
 
     # 商人相关服务
     @property
     def merchant(self) -> MerchantService:
         """商人服务"""
-        return self.merchant_service
+        return self.get_service('merchant')
 
     # 认证相关服务
     @property
     def auth(self) -> AuthService:
         """认证服务"""
-        return self.auth_service
+        return self.get_service('auth')
 
     # 装备相关服务
     @property
     def equipment(self) -> EquipmentService:
         """装备服务"""
-        return self.equipment_service
+        return self.get_service('equipment')
 
     # 背包道具相关服务
     @property
     def inventory(self) -> InventoryService:
         """背包道具服务"""
-        return self.inventory_service
+        return self.get_service('inventory')
+
+    # 数据维护相关服务
+    @property
+    def maintenance(self) -> MaintenanceService:
+        """数据维护服务"""
+        return self.get_service('maintenance')
+
+    # 兼容旧属性名（xxx_service）
+    player_service = player
+    game_save_service = game_save
+    merchant_service = merchant
+    auth_service = auth
+    equipment_service = equipment
+    inventory_service = inventory
+    maintenance_service = maintenance
 
     def get_all_services(self):
         """获取所有服务实例"""
-        return {
-            'player': self.player_service,
-            'game_save': self.game_save_service,
-            'merchant': self.merchant_service,
-            'auth': self.auth_service,
-            'equipment': self.equipment_service,
-            'inventory': self.inventory_service
-        }
+        return {name: self.get_service(name) for name in self.SERVICE_CLASSES}
 
     def close_all_connections(self):
         """关闭所有服务的数据库连接"""
@@ -82,7 +111,7 @@ class ServiceManager:
             logger.error(f"关闭服务连接失败: {e}")
 
 
-# 全局服务管理器实例
+# 全局服务管理器实例（延迟创建服务）
 service_manager = ServiceManager()
 
 
@@ -94,6 +123,7 @@ __all__ = [
     'AuthService',
     'EquipmentService',
     'InventoryService',
+    'MaintenanceService',
     'ServiceManager',
     'service_manager'
 ]
\ No newline at end of file
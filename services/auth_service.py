@@ -3,6 +3,7 @@
 处理用户注册、登录、会话管理等相关业务逻辑
 """
 import hashlib
+import os
 import secrets
 import jwt
 from datetime import datetime, timedelta, timezone
@@ -11,6 +12,10 @@ import re
 import logging
 
 from .base_service import BaseService
+from .cache import player_cache, session_cache
+from .login_throttle import LoginThrottle
+from .login_audit import DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL_MS, DEFAULT_MAX_PENDING, LoginAuditWriter
+from .session_revocation import DEFAULT_REFRESH_INTERVAL, MICROSECONDS, SessionRevocationList, now_us
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,23 @@ class AuthService(BaseService):
         self.max_login_attempts = 5
         self.account_lock_hours = 1
 
+        # JWT免查库校验：令牌签名与有效期通过即可，仅对照内存吊销列表（AUTH_JWT_ONLY=1 开启）
+        self.jwt_only_sessions = os.getenv('AUTH_JWT_ONLY', '0').strip().lower() in ('1', 'true', 'yes')
+        self.revocation_refresh_interval = int(os.getenv('AUTH_REVOCATION_REFRESH', str(DEFAULT_REFRESH_INTERVAL)))
+        self.revocations = SessionRevocationList(self.token_expiry_hours * 3600)
+
+        # 登录审计日志异步批量写入（LOGIN_LOG_ASYNC=0 时同步写入）
+        self.login_audit = LoginAuditWriter(
+            self.dao_manager.login_log.create_logs,
+            batch_size=int(os.getenv('LOGIN_LOG_BATCH_SIZE', str(DEFAULT_BATCH_SIZE))),
+            flush_interval_ms=int(os.getenv('LOGIN_LOG_FLUSH_MS', str(DEFAULT_FLUSH_INTERVAL_MS))),
+            max_pending=int(os.getenv('LOGIN_LOG_MAX_PENDING', str(DEFAULT_MAX_PENDING))),
+            enabled=os.getenv('LOGIN_LOG_ASYNC', '1').strip().lower() not in ('0', 'false', 'no')
+        )
+
+        # 按用户名/IP的滑动窗口登录限流（进程内，不查询login_logs）
+        self.login_throttle = LoginThrottle()
+
     def register_user(self, username: str, password: str, nickname: str) -> Dict[str, Any]:
         """
         用户注册
@@ -72,7 +94,7 @@ class AuthService(BaseService):
             )
 
             # 记录注册日志
-            self.dao_manager.login_log.create_log(
+            self.login_audit.log(
                 player_id=player_id,
                 username=username,
                 login_type='register',
@@ -88,7 +110,7 @@ class AuthService(BaseService):
             }, "注册成功，请登录游戏")
 
         except ValueError as e:
-            self.dao_manager.login_log.create_log(
+            self.login_audit.log(
                 player_id=None,
                 username=username,
                 login_type='failed',
@@ -117,10 +139,16 @@ class AuthService(BaseService):
             if not username or not password:
                 raise ValueError("请输入用户名和密码")
 
+            # 滑动窗口限流，在任何数据库操作之前拒绝暴力破解
+            retry_after = self.login_throttle.check(username, ip_address)
+            if retry_after is not None:
+                raise ValueError(f"登录尝试过于频繁，请 {int(retry_after) + 1} 秒后再试")
+
             # 获取用户信息
             player = self.dao_manager.player.get_by_username(username)
             if not player:
-                self.dao_manager.login_log.create_log(
+                self.login_throttle.record_failure(username, ip_address)
+                self.login_audit.log(
                     player_id=None,
                     username=username,
                     login_type='failed',
@@ -132,7 +160,7 @@ class AuthService(BaseService):
 
             # 检查账户是否被锁定
             if player.get('locked_until') and player['locked_until'] > datetime.now():
-                self.dao_manager.login_log.create_log(
+                self.login_audit.log(
                     player_id=player['id'],
                     username=username,
                     login_type='failed',
@@ -147,8 +175,9 @@ class AuthService(BaseService):
                 if not player.get('locked_until'):
                     # 锁定账户
                     self.dao_manager.player.lock_account(player['id'], self.account_lock_hours)
+                    player_cache.invalidate(player['id'])
 
-                self.dao_manager.login_log.create_log(
+                self.login_audit.log(
                     player_id=player['id'],
                     username=username,
                     login_type='failed',
@@ -160,11 +189,14 @@ class AuthService(BaseService):
 
             # 验证密码
             if not self._verify_password(password, player['password_hash'], player['salt']):
-                self._handle_failed_login(player['id'], username, ip_address, user_agent)
+                self.login_throttle.record_failure(username, ip_address)
+                self._handle_failed_login(player['id'], username, ip_address, user_agent,
+                                          previous_attempts=player.get('login_attempts') or 0)
                 raise ValueError("用户名或密码错误")
 
             # 登录成功，重置失败次数
             self.dao_manager.player.reset_login_attempts(player['id'])
+            self.login_throttle.record_success(username)
 
             # 检查是否已有活跃会话
             active_sessions = self.dao_manager.session.get_active_sessions_by_player(player['id'])
@@ -172,6 +204,8 @@ class AuthService(BaseService):
                 # 停用最旧的会话
                 oldest_session = min(active_sessions, key=lambda x: x['created_at'])
                 self.dao_manager.session.deactivate_session(oldest_session['id'])
+                session_cache.invalidate(oldest_session['session_token'])
+                self.revocations.revoke(oldest_session['session_token'], oldest_session['expires_at'])
 
             # 生成JWT令牌
             session_token = self._generate_session_token(player['id'])
@@ -188,9 +222,10 @@ class AuthService(BaseService):
 
             # 更新最后登录时间
             self.dao_manager.player.update_last_login(player['id'])
+            player_cache.invalidate(player['id'])
 
             # 记录成功登录
-            self.dao_manager.login_log.create_log(
+            self.login_audit.log(
                 player_id=player['id'],
                 username=username,
                 login_type='success',
@@ -243,8 +278,11 @@ class AuthService(BaseService):
                 logger.warning("无效的JWT令牌")
                 return None
 
-            # 检查数据库会话记录
-            session = self.dao_manager.session.get_by_token(session_token)
+            if self.jwt_only_sessions:
+                return self._validate_jwt_only(session_token, payload, websocket_session_id)
+
+            # 检查会话记录（优先读缓存，热重连路径不访问数据库）
+            session = self._get_session(session_token)
             if not session or not session['is_active']:
                 return None
 
@@ -258,11 +296,14 @@ class AuthService(BaseService):
 
             if expires_at < datetime.now():
                 self.dao_manager.session.deactivate_session(session['id'])
+                session_cache.invalidate(session_token)
                 return None
 
             # 更新WebSocket会话ID
             if websocket_session_id and session['websocket_session_id'] != websocket_session_id:
                 self.dao_manager.session.update_websocket_session(session['id'], websocket_session_id)
+                session_cache.update(session_token, {'websocket_session_id': websocket_session_id})
+                session['websocket_session_id'] = websocket_session_id
 
             return session
 
@@ -281,10 +322,12 @@ class AuthService(BaseService):
             是否登出成功
         """
         try:
-            session = self.dao_manager.session.get_by_token(session_token)
+            session = self._get_session(session_token)
             if session:
                 self.dao_manager.session.deactivate_session(session['id'])
-                self.dao_manager.login_log.create_log(
+                session_cache.invalidate(session_token)
+                self.revocations.revoke(session_token, session['expires_at'])
+                self.login_audit.log(
                     player_id=session['player_id'],
                     username=session.get('player_name', ''),
                     login_type='logout',
@@ -300,7 +343,9 @@ class AuthService(BaseService):
     def extend_session(self, session_token: str, hours: int = 24) -> bool:
         """延长会话有效期"""
         try:
-            return self.dao_manager.session.extend_session(session_token, hours)
+            extended = self.dao_manager.session.extend_session(session_token, hours)
+            session_cache.invalidate(session_token)
+            return extended
         except Exception as e:
             logger.error(f"延长会话失败: {e}")
             return False
@@ -317,8 +362,10 @@ class AuthService(BaseService):
         """强制用户所有会话下线"""
         try:
             count = self.dao_manager.session.deactivate_all_player_sessions(player_id)
+            session_cache.invalidate_where(lambda session: session['player_id'] == player_id)
+            self.revocations.revoke_player(player_id)
             if count > 0:
-                self.dao_manager.login_log.create_log(
+                self.login_audit.log(
                     player_id=player_id,
                     username='',
                     login_type='logout',
@@ -332,6 +379,38 @@ class AuthService(BaseService):
 
     # ================== 私有方法 ==================
 
+    def _validate_jwt_only(self, session_token: str, payload: Dict[str, Any],
+                           websocket_session_id: str = None) -> Optional[Dict[str, Any]]:
+        """
+        JWT免查库校验：签名与有效期已由jwt.decode验证，这里只检查吊销列表
+
+        返回的会话信息由令牌内容构造（无数据库会话ID），WebSocket会话ID不回写数据库。
+        """
+        self.revocations.start_refresh(self.dao_manager.session.get_revoked_sessions,
+                                       self.revocation_refresh_interval)
+        player_id = payload['player_id']
+        # 微秒签发时间；缺少该字段的旧令牌按签发秒的起点计（同一秒内的强制下线视为已吊销）
+        issued_at_us = payload.get('iat_us')
+        if issued_at_us is None and payload.get('iat') is not None:
+            issued_at_us = int(payload['iat']) * MICROSECONDS
+        if self.revocations.is_revoked(session_token, player_id, issued_at_us):
+            return None
+
+        return {
+            'id': None,
+            'player_id': player_id,
+            'session_token': session_token,
+            'websocket_session_id': websocket_session_id,
+            'is_active': True,
+            'expires_at': datetime.fromtimestamp(payload['exp'])
+        }
+
+    def _get_session(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """读穿缓存获取活跃会话记录"""
+        return session_cache.get_or_load(
+            session_token, lambda: self.dao_manager.session.get_by_token(session_token)
+        )
+
     def _validate_registration_input(self, username: str, password: str):
         """验证注册输入"""
         if not username or not password:
@@ -373,23 +452,27 @@ class AuthService(BaseService):
         return self._hash_password(password, salt) == stored_hash
 
     def _generate_session_token(self, player_id: int) -> str:
-        """生成JWT会话令牌"""
-        now = datetime.now(timezone.utc)
+        """生成JWT会话令牌（iat_us 为微秒精度的签发时间，用于与强制下线时间比较）"""
+        issued_at_us = now_us()
+        now = datetime.fromtimestamp(issued_at_us / MICROSECONDS, timezone.utc)
         payload = {
             'player_id': player_id,
             'exp': now + timedelta(hours=self.token_expiry_hours),
-            'iat': now
+            'iat': now,
+            'iat_us': issued_at_us
         }
         return jwt.encode(payload, self.token_secret, algorithm='HS256')
 
     def _handle_failed_login(self, player_id: int, username: str,
-                           ip_address: str = None, user_agent: str = None):
+                           ip_address: str = None, user_agent: str = None,
+                           previous_attempts: int = 0):
         """处理登录失败"""
         # 增加失败次数
         self.dao_manager.player.increment_login_attempts(player_id)
+        player_cache.invalidate(player_id)
 
         # 记录失败日志
-        self.dao_manager.login_log.create_log(
+        self.login_audit.log(
             player_id=player_id,
             username=username,
             login_type='failed',
@@ -398,13 +481,13 @@ class AuthService(BaseService):
             reason='密码错误'
         )
 
-        # 获取当前失败次数
-        player = self.dao_manager.player.get_by_id(player_id)
-        failed_attempts = player.get('login_attempts', 0) if player else 0
+        # 当前失败次数（由登录时读取的记录推算，不再回查玩家表）
+        failed_attempts = previous_attempts + 1
 
         # 如果达到最大失败次数，锁定账户
         if failed_attempts >= self.max_login_attempts:
             self.dao_manager.player.lock_account(player_id, self.account_lock_hours)
+            player_cache.invalidate(player_id)
             logger.warning(f"账户因多次登录失败被锁定: {username}")
 
     def update_nickname(self, player_id: int, new_nickname: str) -> Dict[str, Any]:
@@ -433,6 +516,7 @@ class AuthService(BaseService):
 
             # 更新昵称
             success = self.dao_manager.player.update_nickname(player_id, new_nickname)
+            player_cache.invalidate(player_id)
             if not success:
                 raise ValueError("更新昵称失败")
 
@@ -451,6 +535,10 @@ class AuthService(BaseService):
         """清理过期会话"""
         try:
             count = self.dao_manager.session.cleanup_expired_sessions()
+            now = datetime.now()
+            session_cache.invalidate_where(
+                lambda session: isinstance(session['expires_at'], datetime) and session['expires_at'] < now
+            )
             if count > 0:
                 self.log_operation(f"清理了 {count} 个过期会话")
             return count
@@ -0,0 +1,108 @@
+"""
+服务层读穿缓存
+TTL + LRU 淘汰的进程内缓存，缓存玩家记录与会话记录，写操作后由服务层显式失效
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 缓存容量与有效期（秒）
+PLAYER_CACHE_SIZE = 1024
+PLAYER_CACHE_TTL = 60
+SESSION_CACHE_SIZE = 2048
+SESSION_CACHE_TTL = 300
+
+
+class TTLCache:
+    """
+    线程安全的 TTL + LRU 缓存
+
+    值按字典浅拷贝存取，调用方修改返回结果不会污染缓存。
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """读取未过期的缓存值，命中时刷新LRU顺序"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, key: Hashable, value: Dict[str, Any]):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """读穿：未命中时调用loader加载并缓存（None不缓存）"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def update(self, key: Hashable, changes: Dict[str, Any]):
+        """就地更新已缓存条目的部分字段（未缓存则忽略）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1].update(changes)
+
+    def invalidate(self, key: Hashable):
+        """使单个条目失效"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """使满足条件的条目失效，返回失效条数"""
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+# 全局缓存实例（玩家服务与认证服务共享）
+player_cache = TTLCache('player', PLAYER_CACHE_SIZE, PLAYER_CACHE_TTL)
+session_cache = TTLCache('session', SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
@@ -96,6 +96,19 @@ class InventoryService(BaseService):
         except Exception as e:
             self.handle_error(e, "清空背包")
 
+    def replace_inventory(self, player_id: int, items: Dict[str, int]) -> bool:
+        """用 {道具名: 数量} 整体同步玩家背包"""
+        self.validate_id(player_id, "玩家ID")
+        for item_name, quantity in items.items():
+            self.validate_string(item_name, "道具名称")
+            self.validate_non_negative(quantity, "道具数量")
+
+        try:
+            self.log_operation(f"同步背包: 玩家{player_id}，{len(items)} 种道具")
+            return self.inventory_dao.replace_inventory(player_id, items)
+        except Exception as e:
+            self.handle_error(e, "同步背包")
+
     def get_inventory_summary(self, player_id: int) -> Dict[str, int]:
         """获取背包统计摘要"""
         self.validate_id(player_id, "玩家ID")
@@ -0,0 +1,166 @@
+"""
+登录审计异步写入器
+登录日志先进入有界缓冲区，由后台线程按条数或时间间隔批量写入数据库，
+登录流程不再等待审计日志落库
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 默认批量参数
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_MAX_PENDING = 10000
+
+
+class LoginAuditWriter:
+    """
+    登录日志批量写入器
+
+    - 缓冲区达到 batch_size 条或距上次写入超过 flush_interval_ms 时批量写入
+    - 缓冲区超过 max_pending 条时丢弃新日志并计数，内存占用有界
+    - 写入失败的批次记录日志并计数，不重试
+    """
+
+    def __init__(self, writer: Callable[[List[Dict[str, Any]]], Any],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 enabled: bool = True):
+        """
+        Args:
+            writer: 批量写入函数，接收日志行列表
+            batch_size: 触发写入的条数
+            flush_interval_ms: 最长缓冲时间（毫秒）
+            max_pending: 缓冲区容量
+            enabled: 为False时同步逐条写入（不启动后台线程）
+        """
+        self.writer = writer
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.max_pending = max(self.batch_size, max_pending)
+        self.enabled = enabled
+
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def log(self, player_id: Optional[int], username: str, login_type: str,
+            ip_address: str = None, user_agent: str = None, reason: str = None) -> bool:
+        """
+        记录一条登录日志（非阻塞）
+
+        Returns:
+            是否已接收（缓冲区已满时返回False）
+        """
+        row = {
+            'player_id': player_id,
+            'username': username,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'login_type': login_type,
+            'reason': reason,
+            'created_at': datetime.now()
+        }
+
+        if not self.enabled or self._stopping:
+            return self._write([row])
+
+        self._ensure_started()
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning(f"登录日志缓冲区已满，累计丢弃 {self.dropped} 条")
+                return False
+            self._pending.append(row)
+            self.enqueued += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return True
+
+    def flush(self) -> int:
+        """立即写入缓冲区中的全部日志，返回写入条数"""
+        written = 0
+        while True:
+            with self._condition:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return written
+            if self._write(batch):
+                written += len(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        # 串行写入，避免后台线程与手动flush并发提交
+        with self._flush_lock:
+            try:
+                self.writer(batch)
+                self.written += len(batch)
+                self.flushes += 1
+                return True
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"写入登录日志失败（{len(batch)} 条）: {e}")
+                return False
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='login-audit-writer', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def stop(self, timeout: float = 5.0):
+        """停止后台线程并写入剩余日志"""
+        thread = self._thread
+        if thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """获取写入统计"""
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes
+        }
@@ -0,0 +1,138 @@
+"""
+登录限流
+按用户名与IP维护进程内滑动窗口计数，在访问数据库之前拒绝暴力破解与登录洪泛，
+取代对 login_logs 表的 COUNT(*) 时间范围扫描
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 默认限流参数：(窗口内上限, 窗口秒数)
+DEFAULT_USERNAME_FAILURE_LIMIT = (5, 15 * 60)
+DEFAULT_IP_FAILURE_LIMIT = (20, 15 * 60)
+DEFAULT_IP_ATTEMPT_LIMIT = (30, 60)
+
+# 每个计数器最多跟踪的键数量（超出按LRU淘汰）
+DEFAULT_MAX_KEYS = 100000
+
+
+class SlidingWindowCounter:
+    """
+    滑动窗口计数器
+
+    每个键只保留窗口内最近 limit 个事件时间戳，判断是否超限无需更多历史；
+    键数量超过 max_keys 时淘汰最久未活动的键，内存占用有界。
+    """
+
+    def __init__(self, limit: int, window_seconds: float, max_keys: int = DEFAULT_MAX_KEYS):
+        self.limit = limit
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self._events: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live_events(self, key: Hashable, now: float) -> Optional[Deque[float]]:
+        events = self._events.get(key)
+        if events is None:
+            return None
+        cutoff = now - self.window
+        while events and events[0] <= cutoff:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def count(self, key: Hashable) -> int:
+        """窗口内事件数（不超过limit）"""
+        with self._lock:
+            events = self._live_events(key, time.monotonic())
+            return len(events) if events else 0
+
+    def is_limited(self, key: Hashable) -> bool:
+        """窗口内事件数是否已达上限"""
+        return self.count(key) >= self.limit
+
+    def retry_after(self, key: Hashable) -> float:
+        """距离窗口内事件数降到上限以下还需等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            events = self._live_events(key, now)
+            if not events or len(events) < self.limit:
+                return 0.0
+            return max(0.0, events[0] + self.window - now)
+
+    def hit(self, key: Hashable) -> int:
+        """记录一次事件，返回窗口内事件数"""
+        with self._lock:
+            now = time.monotonic()
+            events = self._live_events(key, now)
+            if events is None:
+                events = deque(maxlen=self.limit)
+                self._events[key] = events
+                while len(self._events) > self.max_keys:
+                    self._events.popitem(last=False)
+            else:
+                self._events.move_to_end(key)
+            events.append(now)
+            return len(events)
+
+    def reset(self, key: Hashable):
+        """清除键的计数"""
+        with self._lock:
+            self._events.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    登录限流器
+
+    - 用户名：窗口内密码错误次数
+    - IP：窗口内失败次数与全部登录尝试次数
+    """
+
+    def __init__(self, username_failures: Tuple[int, float] = DEFAULT_USERNAME_FAILURE_LIMIT,
+                 ip_failures: Tuple[int, float] = DEFAULT_IP_FAILURE_LIMIT,
+                 ip_attempts: Tuple[int, float] = DEFAULT_IP_ATTEMPT_LIMIT,
+                 max_keys: int = DEFAULT_MAX_KEYS):
+        self.username_failures = SlidingWindowCounter(*username_failures, max_keys=max_keys)
+        self.ip_failures = SlidingWindowCounter(*ip_failures, max_keys=max_keys)
+        self.ip_attempts = SlidingWindowCounter(*ip_attempts, max_keys=max_keys)
+        self.rejected = 0
+
+    def check(self, username: str, ip_address: str = None) -> Optional[float]:
+        """
+        登录前检查并记录一次尝试
+
+        Returns:
+            None 表示放行；被限流时返回建议等待秒数
+        """
+        limited = []
+        if self.username_failures.is_limited(username):
+            limited.append(self.username_failures.retry_after(username))
+        if ip_address:
+            if self.ip_failures.is_limited(ip_address):
+                limited.append(self.ip_failures.retry_after(ip_address))
+            if self.ip_attempts.is_limited(ip_address):
+                limited.append(self.ip_attempts.retry_after(ip_address))
+
+        if limited:
+            self.rejected += 1
+            return max(limited)
+        if ip_address:
+            self.ip_attempts.hit(ip_address)
+        return None
+
+    def record_failure(self, username: str, ip_address: str = None):
+        """记录一次登录失败"""
+        self.username_failures.hit(username)
+        if ip_address:
+            self.ip_failures.hit(ip_address)
+
+    def record_success(self, username: str):
+        """登录成功后清除用户名失败计数"""
+        self.username_failures.reset(username)
@@ -0,0 +1,168 @@
+"""
+数据维护服务
+后台定期清理登录日志与过期会话：按主键区间分批执行、批次间暂停限速，
+避免单条大范围 DELETE/UPDATE 长时间锁表，并记录每个任务的进度指标
+"""
+import asyncio
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionJobStats:
+    """单个维护任务的运行指标"""
+    runs: int = 0
+    errors: int = 0
+    total_rows: int = 0
+    total_chunks: int = 0
+    last_rows: int = 0
+    last_chunks: int = 0
+    last_duration: float = 0.0
+    last_started_at: Optional[str] = None
+    last_error: Optional[str] = None
+    # 运行中任务的进度：当前处理到的主键与本轮上界
+    cursor_id: int = 0
+    target_id: int = 0
+
+
+@dataclass
+class RetentionJob:
+    """维护任务定义"""
+    name: str
+    func: Callable[[], int]
+    interval: float
+    next_run: float = 0.0
+    stats: RetentionJobStats = field(default_factory=RetentionJobStats)
+
+
+class MaintenanceService(BaseService):
+    """数据维护服务"""
+
+    def __init__(self):
+        super().__init__()
+        self.login_log_retention_days = int(os.getenv('RETENTION_LOGIN_LOG_DAYS', '90'))
+        self.session_retention_days = int(os.getenv('RETENTION_SESSION_DAYS', '7'))
+        self.batch_size = int(os.getenv('RETENTION_BATCH_SIZE', '1000'))
+        self.chunk_pause = int(os.getenv('RETENTION_PAUSE_MS', '50')) / 1000
+        self.interval = int(os.getenv('RETENTION_INTERVAL_SECONDS', '3600'))
+        self.session_expire_interval = int(os.getenv('RETENTION_SESSION_EXPIRE_SECONDS', '600'))
+
+        self.jobs: Dict[str, RetentionJob] = {
+            job.name: job for job in (
+                RetentionJob('expire_sessions', self.expire_sessions, self.session_expire_interval),
+                RetentionJob('purge_sessions', self.purge_sessions, self.interval),
+                RetentionJob('purge_login_logs', self.purge_login_logs, self.interval),
+            )
+        }
+
+    # ==================== 分批执行 ====================
+
+    def _run_chunked(self, job_name: str, start_id: int, end_id: int,
+                     step: Callable[[int, int], int]) -> int:
+        """
+        按主键区间 [start_id, end_id] 分批执行
+
+        Args:
+            job_name: 任务名（用于进度指标）
+            start_id: 起始主键
+            end_id: 结束主键（包含）
+            step: 处理单个区间 [lo, hi) 的函数，返回影响行数
+
+        Returns:
+            影响总行数
+        """
+        stats = self.jobs[job_name].stats
+        stats.target_id = end_id
+        rows = chunks = 0
+        lo = start_id
+        while lo and lo <= end_id:
+            hi = lo + self.batch_size
+            rows += step(lo, hi)
+            chunks += 1
+            stats.cursor_id = min(hi, end_id + 1)
+            lo = hi
+            if lo <= end_id and self.chunk_pause > 0:
+                time.sleep(self.chunk_pause)
+
+        stats.last_rows = rows
+        stats.last_chunks = chunks
+        stats.total_rows += rows
+        stats.total_chunks += chunks
+        return rows
+
+    # ==================== 维护任务 ====================
+
+    def purge_login_logs(self) -> int:
+        """删除超过保留期的登录日志"""
+        dao = self.dao_manager.login_log
+        days = self.login_log_retention_days
+        min_id, _ = dao.get_id_bounds('login_logs')
+        max_old_id = dao.get_old_log_max_id(days)
+        return self._run_chunked('purge_login_logs', min_id, max_old_id,
+                                 lambda lo, hi: dao.delete_old_logs_in_range(lo, hi, days))
+
+    def expire_sessions(self) -> int:
+        """停用已过期的活跃会话"""
+        dao = self.dao_manager.session
+        min_id, max_id = dao.get_id_bounds('user_sessions')
+        return self._run_chunked('expire_sessions', min_id, max_id, dao.expire_sessions_in_range)
+
+    def purge_sessions(self) -> int:
+        """删除过期超过保留期的会话"""
+        dao = self.dao_manager.session
+        days = self.session_retention_days
+        min_id, max_id = dao.get_id_bounds('user_sessions')
+        return self._run_chunked('purge_sessions', min_id, max_id,
+                                 lambda lo, hi: dao.delete_stale_sessions_in_range(lo, hi, days))
+
+    def run_job(self, name: str) -> int:
+        """立即运行指定任务并记录指标"""
+        job = self.jobs[name]
+        stats = job.stats
+        stats.runs += 1
+        stats.last_started_at = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        try:
+            rows = job.func()
+            stats.last_error = None
+            if rows:
+                self.log_operation(f"维护任务 {name}", f"处理 {rows} 行，{stats.last_chunks} 批")
+            return rows
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = str(e)
+            logger.error(f"维护任务 {name} 失败: {e}")
+            return 0
+        finally:
+            stats.last_duration = time.perf_counter() - started
+
+    # ==================== 调度 ====================
+
+    async def run_scheduler(self, tick: float = 30.0):
+        """
+        后台调度循环：到期任务在工作线程中依次执行，互不重叠
+
+        Args:
+            tick: 检查到期任务的间隔（秒）
+        """
+        logger.info(f"维护调度已启动，任务: {', '.join(self.jobs)}")
+        while True:
+            now = time.monotonic()
+            for job in self.jobs.values():
+                # 数据库熔断期间跳过，恢复后再执行
+                if job.next_run <= now and self.dao_manager.is_healthy():
+                    await asyncio.to_thread(self.run_job, job.name)
+                    job.next_run = time.monotonic() + job.interval
+            await asyncio.sleep(tick)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有任务的运行指标"""
+        return {name: asdict(job.stats) for name, job in self.jobs.items()}
@@ -3,6 +3,7 @@
 处理玩家相关的业务逻辑
 """
 from services.base_service import BaseService
+from services.cache import player_cache
 from database.dao.player_dao import PlayerDAO
 from typing import Dict, Any, Optional, List
 import logging
@@ -33,7 +34,7 @@ class PlayerService(BaseService):
         self.validate_id(player_id, "玩家ID")
 
         try:
-            return self.player_dao.get_by_id(player_id)
+            return player_cache.get_or_load(player_id, lambda: self.player_dao.get_by_id(player_id))
         except Exception as e:
             self.handle_error(e, "获取玩家信息")
 
@@ -41,6 +42,10 @@ class PlayerService(BaseService):
         """根据ID获取玩家信息（别名方法）"""
         return self.get_player(player_id)
 
+    def invalidate_player(self, player_id: int):
+        """使玩家缓存失效（玩家记录发生写操作后调用）"""
+        player_cache.invalidate(player_id)
+
     def update_player_stats(self, player_id: int, stats: Dict[str, int]) -> bool:
         """更新玩家状态"""
         self.validate_id(player_id, "玩家ID")
@@ -50,7 +55,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"更新玩家状态: 玩家{player_id}")
-            return self.player_dao.update_player_stats(player_id, stats)
+            result = self.player_dao.update_player_stats(player_id, stats)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "更新玩家状态")
 
@@ -63,7 +70,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"更新玩家位置: 玩家{player_id}到{floor_level}层({x},{y})")
-            return self.player_dao.update_position(player_id, x, y, floor_level)
+            result = self.player_dao.update_position(player_id, x, y, floor_level)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "更新玩家位置")
 
@@ -77,7 +86,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"增加金币: 玩家{player_id}+{amount}金币")
-            return self.player_dao.add_gold(player_id, amount)
+            result = self.player_dao.add_gold(player_id, amount)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "增加金币")
 
@@ -91,7 +102,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"扣除金币: 玩家{player_id}-{amount}金币")
-            return self.player_dao.subtract_gold(player_id, amount)
+            result = self.player_dao.subtract_gold(player_id, amount)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "扣除金币")
 
@@ -105,7 +118,9 @@ class PlayerService(BaseService):
                 raise ValueError("玩家不存在")
 
             self.log_operation(f"玩家升级: {player['name']} 等级{player['level']}+1")
-            return self.player_dao.level_up(player_id)
+            result = self.player_dao.level_up(player_id)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "玩家升级")
 
@@ -119,10 +134,14 @@ class PlayerService(BaseService):
         try:
             if heal_amount is None:
                 self.log_operation(f"玩家完全治疗: 玩家{player_id}")
-                return self.player_dao.heal_player(player_id)
+                result = self.player_dao.heal_player(player_id)
+                self.invalidate_player(player_id)
+                return result
             else:
                 self.log_operation(f"玩家治疗: 玩家{player_id}+{heal_amount}血量")
-                return self.player_dao.heal_player(player_id, heal_amount)
+                result = self.player_dao.heal_player(player_id, heal_amount)
+                self.invalidate_player(player_id)
+                return result
         except Exception as e:
             self.handle_error(e, "治疗玩家")
 
@@ -136,10 +155,14 @@ class PlayerService(BaseService):
         try:
             if mana_amount is None:
                 self.log_operation(f"玩家完全恢复法力: 玩家{player_id}")
-                return self.player_dao.restore_mana(player_id)
+                result = self.player_dao.restore_mana(player_id)
+                self.invalidate_player(player_id)
+                return result
             else:
                 self.log_operation(f"玩家恢复法力: 玩家{player_id}+{mana_amount}法力")
-                return self.player_dao.restore_mana(player_id, mana_amount)
+                result = self.player_dao.restore_mana(player_id, mana_amount)
+                self.invalidate_player(player_id)
+                return result
         except Exception as e:
             self.handle_error(e, "恢复玩家法力")
 
@@ -153,7 +176,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"增加经验: 玩家{player_id}+{exp_amount}经验")
-            return self.player_dao.add_experience(player_id, exp_amount)
+            result = self.player_dao.add_experience(player_id, exp_amount)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "增加经验")
 
@@ -172,7 +197,9 @@ class PlayerService(BaseService):
 
         try:
             self.log_operation(f"更新玩家信息: 玩家{player_id}")
-            return self.player_dao.update(player_id, update_data)
+            result = self.player_dao.update(player_id, update_data)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "更新玩家信息")
 
@@ -186,7 +213,9 @@ class PlayerService(BaseService):
                 raise ValueError("玩家不存在")
 
             self.log_operation(f"删除玩家: {player['name']}")
-            return self.player_dao.delete(player_id)
+            result = self.player_dao.delete(player_id)
+            self.invalidate_player(player_id)
+            return result
         except Exception as e:
             self.handle_error(e, "删除玩家")
 
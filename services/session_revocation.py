@@ -0,0 +1,154 @@
+"""
+会话吊销列表
+JWT免查库校验模式下使用：记录已登出/被挤下线的令牌及按玩家的强制下线时间，
+定期从数据库增量同步其他进程产生的吊销记录，令牌校验只需CPU计算
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 默认同步间隔（秒）
+DEFAULT_REFRESH_INTERVAL = 30
+
+# 增量同步的水位回退（秒）：覆盖应用与数据库的时钟偏差和写入提交延迟，重复读到的记录合并时去重
+WATERMARK_OVERLAP_SECONDS = 5
+
+# 令牌签发时间使用微秒精度（JWT的 iat 只有秒级，同一秒内重新登录的令牌无法与下线时间区分）
+MICROSECONDS = 1_000_000
+
+Timestamp = Union[datetime, float, int, None]
+
+# 吊销记录加载函数：参数为水位（只取该时间及之后吊销的会话，None表示全量）
+RevocationLoader = Callable[[Optional[datetime]], Iterable[Dict[str, Any]]]
+
+
+def _token_key(session_token: str) -> bytes:
+    """令牌摘要（16字节），避免在内存中保存完整令牌"""
+    return hashlib.blake2b(session_token.encode('utf-8'), digest_size=16).digest()
+
+
+def _to_epoch(value: Timestamp) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def now_us() -> int:
+    """当前时间（微秒时间戳）"""
+    return time.time_ns() // 1000
+
+
+class SessionRevocationList:
+    """
+    会话吊销列表
+
+    吊销记录只需保留到令牌本身过期为止，过期条目在同步时清理，内存占用有界。
+    首次同步全量读取，之后按 revoked_at 水位只读取新吊销的会话。
+    """
+
+    def __init__(self, token_lifetime_seconds: float):
+        self.token_lifetime = token_lifetime_seconds
+        self._revoked: Dict[bytes, float] = {}
+        # 玩家ID -> 强制下线时间（微秒时间戳）
+        self._player_cutoffs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._watermark: Optional[datetime] = None
+        self.last_refresh: Optional[float] = None
+
+    def revoke(self, session_token: str, expires_at: Timestamp = None):
+        """吊销单个令牌（expires_at 缺省时按令牌最长有效期保留）"""
+        expiry = _to_epoch(expires_at) or time.time() + self.token_lifetime
+        with self._lock:
+            self._revoked[_token_key(session_token)] = expiry
+
+    def revoke_player(self, player_id: int, at: Timestamp = None):
+        """吊销玩家在指定时间（默认现在）及之前签发的全部令牌"""
+        cutoff = int(_to_epoch(at) * MICROSECONDS) if at is not None else now_us()
+        with self._lock:
+            self._player_cutoffs[player_id] = max(cutoff, self._player_cutoffs.get(player_id, 0))
+
+    def is_revoked(self, session_token: str, player_id: int = None, issued_at_us: Optional[int] = None) -> bool:
+        """
+        检查令牌是否已被吊销
+
+        Args:
+            session_token: 会话令牌
+            player_id: 令牌所属玩家
+            issued_at_us: 令牌签发时间（微秒时间戳），与玩家强制下线时间比较
+        """
+        key = _token_key(session_token)
+        with self._lock:
+            if key in self._revoked:
+                return True
+            cutoff = self._player_cutoffs.get(player_id)
+            return cutoff is not None and issued_at_us is not None and issued_at_us <= cutoff
+
+    def merge(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """合并数据库中的吊销记录，返回新增条数"""
+        added = 0
+        entries = [(_token_key(row['session_token']), _to_epoch(row.get('expires_at'))) for row in rows]
+        with self._lock:
+            for key, expiry in entries:
+                if key not in self._revoked:
+                    added += 1
+                self._revoked[key] = expiry or time.time() + self.token_lifetime
+        return added
+
+    def prune(self) -> int:
+        """清理已过期的吊销记录，返回清理条数"""
+        now = time.time()
+        oldest_live_issue = now - self.token_lifetime
+        with self._lock:
+            expired = [key for key, expiry in self._revoked.items() if expiry <= now]
+            for key in expired:
+                del self._revoked[key]
+            stale_players = [pid for pid, cutoff in self._player_cutoffs.items()
+                             if cutoff < oldest_live_issue * MICROSECONDS]
+            for player_id in stale_players:
+                del self._player_cutoffs[player_id]
+        return len(expired) + len(stale_players)
+
+    def refresh(self, loader: RevocationLoader) -> bool:
+        """从数据库同步一次（成功后水位推进到本次同步开始时间），失败时保留现有记录与水位"""
+        started = datetime.now()
+        try:
+            added = self.merge(loader(self._watermark))
+            pruned = self.prune()
+            self._watermark = started - timedelta(seconds=WATERMARK_OVERLAP_SECONDS)
+            self.last_refresh = time.time()
+            if added or pruned:
+                logger.debug(f"吊销列表同步: 新增 {added}，清理 {pruned}，当前 {len(self)}")
+            return True
+        except Exception as e:
+            logger.error(f"同步会话吊销列表失败: {e}")
+            return False
+
+    def start_refresh(self, loader: RevocationLoader,
+                      interval: float = DEFAULT_REFRESH_INTERVAL):
+        """首次同步后启动后台同步线程（重复调用无副作用）"""
+        with self._lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, args=(loader, interval),
+                name='session-revocation-refresh', daemon=True
+            )
+        self.refresh(loader)
+        self._refresh_thread.start()
+
+    def _refresh_loop(self, loader: RevocationLoader, interval: float):
+        while True:
+            time.sleep(interval)
+            self.refresh(loader)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._revoked)
@@ -67,7 +67,7 @@ def generate(ctx, generate_all, table, output, preview, force):
         if generate_all:
             # 生成所有表
             logger.info("Generating entities for all tables")
-            files = generator.generate_all_entities(preview_mode=preview)
+            files = generator.generate_all_entities(preview_mode=preview, force=force)
             logger.info(f"Would generate {len(files)} entity files")
 
         elif table:
@@ -37,6 +37,11 @@ class GenerationConfig:
     include_comments: bool = True
     table_prefix: str = ""  # 表名前缀，生成类名时会去掉
     suffix: str = "Model"  # 类名后缀
+    use_slots: bool = True  # 生成 __slots__ 数据类（需要 Python 3.10+）
+    fast_mapping: bool = True  # 生成直线式 to_dict/from_row 与元组行映射函数
+    render_workers: int = 0  # 并行渲染的进程数，0 表示按CPU核数
+    generate_dao_bases: bool = True  # 为每张表生成带批量操作的DAO基类
+    dao_output_dir: str = "./database/dao/generated"  # DAO基类输出目录
 
 @dataclass
 class TemplateConfig:
@@ -45,6 +50,7 @@ class TemplateConfig:
     entity_template: str = "entity.py.j2"
     init_template: str = "__init__.py.j2"
     base_template: str = "base_model.py.j2"
+    dao_template: str = "dao_base.py.j2"
 
 @dataclass
 class CodegenConfig:
@@ -106,6 +112,10 @@ class ConfigManager:
             f"{self.DEFAULT_ENV_PREFIX}LINE_LENGTH": ("generation", "line_length"),
             f"{self.DEFAULT_ENV_PREFIX}USE_BLACK": ("generation", "use_black"),
             f"{self.DEFAULT_ENV_PREFIX}USE_ISORT": ("generation", "use_isort"),
+            f"{self.DEFAULT_ENV_PREFIX}USE_SLOTS": ("generation", "use_slots"),
+            f"{self.DEFAULT_ENV_PREFIX}FAST_MAPPING": ("generation", "fast_mapping"),
+            f"{self.DEFAULT_ENV_PREFIX}GENERATE_DAO": ("generation", "generate_dao_bases"),
+            f"{self.DEFAULT_ENV_PREFIX}DAO_OUTPUT_DIR": ("generation", "dao_output_dir"),
             f"{self.DEFAULT_ENV_PREFIX}EXCLUDED_TABLES": ("excluded_tables", "list"),
         }
 
@@ -115,7 +125,8 @@ class ConfigManager:
                 try:
                     if key == "port" or key == "line_length":
                         value = int(value)
-                    elif key == "use_black" or key == "use_isort":
+                    elif key in ("use_black", "use_isort", "use_slots", "fast_mapping",
+                                 "generate_dao_bases"):
                         value = value.lower() in ('true', '1', 'yes', 'on')
                     elif key == "list":
                         value = [table.strip() for table in value.split(',') if table.strip()]
@@ -264,12 +275,18 @@ class ConfigManager:
                 'include_comments': self.config.generation.include_comments,
                 'table_prefix': self.config.generation.table_prefix,
                 'suffix': self.config.generation.suffix,
+                'use_slots': self.config.generation.use_slots,
+                'fast_mapping': self.config.generation.fast_mapping,
+                'render_workers': self.config.generation.render_workers,
+                'generate_dao_bases': self.config.generation.generate_dao_bases,
+                'dao_output_dir': self.config.generation.dao_output_dir,
             },
             'template': {
                 'template_dir': self.config.template.template_dir,
                 'entity_template': self.config.template.entity_template,
                 'init_template': self.config.template.init_template,
                 'base_template': self.config.template.base_template,
+                'dao_template': self.config.template.dao_template,
             },
             'excluded_tables': self.config.excluded_tables,
         }
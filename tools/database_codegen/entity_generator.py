@@ -6,8 +6,9 @@
 import os
 import black
 import isort
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
 from .metadata_reader import DatabaseMetadataReader, TableMetadata
@@ -18,6 +19,103 @@ from .incremental_updater import IncrementalUpdater
 
 logger = logging.getLogger(__name__)
 
+# 需要重新生成的表达到该数量时才启用进程池并行渲染（少量表时进程启动开销大于收益）
+PARALLEL_RENDER_THRESHOLD = 4
+
+
+def format_generated_code(generated_code: str, generation) -> str:
+    """
+    按配置使用 Black 与 isort 格式化生成的代码
+
+    Args:
+        generated_code: 生成的代码
+        generation: 生成配置
+
+    Returns:
+        格式化后的代码
+    """
+    # 格式化代码
+    if generation.use_black:
+        try:
+            generated_code = black.format_str(
+                generated_code,
+                mode=black.FileMode(line_length=generation.line_length)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to format code with Black: {e}")
+
+    # 排序导入语句
+    if generation.use_isort:
+        try:
+            generated_code = isort.code(
+                generated_code,
+                profile="black",
+                line_length=generation.line_length
+            )
+        except Exception as e:
+            logger.warning(f"Failed to sort imports with isort: {e}")
+
+    return generated_code
+
+
+def render_entity_code(template_engine: TemplateEngine, table: TableMetadata) -> str:
+    """
+    渲染并格式化单个实体类代码（不读写文件，可在工作进程中执行）
+
+    Args:
+        template_engine: 模板引擎
+        table: 表元数据
+
+    Returns:
+        生成的代码
+    """
+    generation = template_engine.config.config.generation
+    return format_generated_code(template_engine.render_entity_template(table), generation)
+
+
+def render_dao_code(template_engine: TemplateEngine, table: TableMetadata) -> Optional[str]:
+    """
+    渲染并格式化单个表的DAO基类代码（未启用或模板不存在时返回None）
+
+    Args:
+        template_engine: 模板引擎
+        table: 表元数据
+
+    Returns:
+        生成的代码
+    """
+    generation = template_engine.config.config.generation
+    if not generation.generate_dao_bases:
+        return None
+    generated_code = template_engine.render_dao_base_template(table)
+    if generated_code is None:
+        return None
+    return format_generated_code(generated_code, generation)
+
+
+def render_table_code(template_engine: TemplateEngine, table: TableMetadata) -> Tuple[str, Optional[str]]:
+    """
+    渲染单个表的实体类与DAO基类代码
+
+    Returns:
+        (实体类代码, DAO基类代码或None)
+    """
+    return render_entity_code(template_engine, table), render_dao_code(template_engine, table)
+
+
+# 工作进程内的模板引擎（进程内复用编译后的模板）
+_worker_template_engine: Optional[TemplateEngine] = None
+
+
+def _init_render_worker(config: ConfigManager):
+    global _worker_template_engine
+    _worker_template_engine = TemplateEngine(config)
+
+
+def _render_in_worker(table: TableMetadata) -> Tuple[str, Optional[str]]:
+    return render_table_code(_worker_template_engine, table)
+
+
 class EntityGenerator:
     """实体类生成器"""
 
@@ -33,12 +131,16 @@ class EntityGenerator:
         self.template_engine = TemplateEngine(config)
         self.incremental_updater = IncrementalUpdater(config)
 
-    def generate_all_entities(self, preview_mode: bool = False) -> List[str]:
+    def generate_all_entities(self, preview_mode: bool = False, force: bool = False) -> List[str]:
         """
         生成所有表的实体类
 
+        表元数据与模板指纹组成的内容哈希未变化且文件存在的表直接跳过，
+        其余表并行渲染后依次写入
+
         Args:
             preview_mode: 是否为预览模式（不实际生成文件）
+            force: 忽略内容哈希，重新生成全部表
 
         Returns:
             生成的文件路径列表
@@ -46,7 +148,7 @@ class EntityGenerator:
         logger.info("Starting to generate all entities")
 
         try:
-            # ��试数据库连接
+            # 测试数据库连接
             if not self.metadata_reader.test_connection():
                 raise ConnectionError("Failed to connect to database")
 
@@ -61,30 +163,22 @@ class EntityGenerator:
             if not preview_mode:
                 output_dir.mkdir(parents=True, exist_ok=True)
 
-            # 生成实体类文件
-            generated_files = []
-            class_names = []
-
-            for table in tables:
-                try:
-                    file_path = self._generate_entity_file(table, output_dir, preview_mode)
-                    if file_path:
-                        generated_files.append(file_path)
-                        class_name = safe_class_name(table.name) + self.config.config.generation.suffix
-                        class_names.append(class_name)
-                        logger.info(f"Generated entity for table: {table.name}")
-                except Exception as e:
-                    logger.error(f"Failed to generate entity for table {table.name}: {e}")
-                    continue
+            generated_files = self._generate_tables(tables, output_dir, preview_mode, force=force)
+            class_names = [safe_class_name(table.name) + self.config.config.generation.suffix
+                           for table in tables]
 
             # 生成基础模型类
             if not preview_mode:
                 self._generate_base_model_file(output_dir)
 
-            # 生成__init__.py文件
-            if class_names and not preview_mode:
+            # 生成__init__.py文件（有文件更新或尚不存在时）
+            if class_names and not preview_mode and (generated_files or not (output_dir / "__init__.py").exists()):
                 self._generate_init_file(output_dir, class_names)
 
+            # DAO基类包初始化文件
+            if not preview_mode and self.config.config.generation.generate_dao_bases:
+                self._generate_dao_package_file()
+
             logger.info(f"Successfully generated {len(generated_files)} entity files")
             return generated_files
 
@@ -92,6 +186,96 @@ class EntityGenerator:
             logger.error(f"Failed to generate entities: {e}")
             raise
 
+    def _generate_tables(self, tables: List[TableMetadata], output_dir: Path,
+                         preview_mode: bool = False, force: bool = False,
+                         protect_user_methods: Optional[bool] = None) -> List[str]:
+        """
+        按内容哈希生成发生变化的表
+
+        Args:
+            tables: 表元数据列表
+            output_dir: 输出目录
+            preview_mode: 是否为预览模式
+            force: 忽略内容哈希，全部重新生成
+            protect_user_methods: 是否保留用户自定义方法，默认按配置
+
+        Returns:
+            生成的文件路径列表
+        """
+        fingerprint = self.template_engine.template_fingerprint()
+        hashes = {table.name: self.incremental_updater.compute_content_hash(table, fingerprint)
+                  for table in tables}
+        cached_hashes = {} if force else self.incremental_updater.load_content_hashes()
+
+        generate_daos = self.config.config.generation.generate_dao_bases
+        stale_tables = [
+            table for table in tables
+            if cached_hashes.get(table.name) != hashes[table.name]
+            or not self._get_model_file_path(table.name, output_dir).exists()
+            or (generate_daos and not self._get_dao_file_path(table.name).exists())
+        ]
+        logger.info(f"{len(stale_tables)} of {len(tables)} tables changed, "
+                    f"skipping {len(tables) - len(stale_tables)} unchanged tables")
+
+        rendered = self._render_tables(stale_tables)
+
+        generated_files = []
+        new_hashes = {name: value for name, value in cached_hashes.items() if name in hashes}
+        for table in stale_tables:
+            if table.name not in rendered:
+                continue
+            generated_code, dao_code = rendered[table.name]
+            try:
+                file_path = self._write_entity_file(table, generated_code, output_dir,
+                                                    preview_mode, protect_user_methods)
+                generated_files.append(file_path)
+                if dao_code is not None:
+                    generated_files.append(self._write_dao_file(table, dao_code, preview_mode))
+                new_hashes[table.name] = hashes[table.name]
+                logger.info(f"Generated entity for table: {table.name}")
+            except Exception as e:
+                logger.error(f"Failed to generate entity for table {table.name}: {e}")
+
+        if not preview_mode:
+            self.incremental_updater.save_content_hashes(new_hashes)
+        return generated_files
+
+    def _render_tables(self, tables: List[TableMetadata]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        渲染多个表的实体与DAO基类代码，表数量较多时使用进程池并行渲染
+
+        Args:
+            tables: 表元数据列表
+
+        Returns:
+            表名到 (实体类代码, DAO基类代码) 的映射（渲染失败的表不包含在内）
+        """
+        workers = self.config.config.generation.render_workers or os.cpu_count() or 1
+        workers = min(workers, len(tables))
+
+        if workers > 1 and len(tables) >= PARALLEL_RENDER_THRESHOLD:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                         initargs=(self.config,)) as executor:
+                    futures = {table.name: executor.submit(_render_in_worker, table) for table in tables}
+                rendered = {}
+                for table_name, future in futures.items():
+                    try:
+                        rendered[table_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to render entity for table {table_name}: {e}")
+                return rendered
+            except Exception as e:
+                logger.warning(f"Parallel rendering unavailable, rendering serially: {e}")
+
+        rendered = {}
+        for table in tables:
+            try:
+                rendered[table.name] = render_table_code(self.template_engine, table)
+            except Exception as e:
+                logger.error(f"Failed to render entity for table {table.name}: {e}")
+        return rendered
+
     def generate_entity(self, table_name: str, preview_mode: bool = False) -> Optional[str]:
         """
         生成单个表的实体类
@@ -145,125 +329,149 @@ class EntityGenerator:
             生成的文件路径
         """
         try:
-            # 生成类名
-            class_name = safe_class_name(table.name) + self.config.config.generation.suffix
-            file_name = f"{class_name.lower()}.py"
-            file_path = output_dir / file_name
-
-            # 检查文件是否已存在
-            if file_path.exists() and not preview_mode:
-                if self.config.config.generation.custom_methods_protection:
-                    # 保护用户自定义方法
-                    existing_content = self._backup_user_methods(file_path)
-                    if existing_content:
-                        logger.info(f"Protected custom methods in existing file: {file_path}")
+            generated_code, dao_code = render_table_code(self.template_engine, table)
+            file_path = self._write_entity_file(table, generated_code, output_dir, preview_mode)
+            if dao_code is not None:
+                self._write_dao_file(table, dao_code, preview_mode)
 
-            # 使用模板引擎生成代码
-            generated_code = self.template_engine.render_entity_template(table)
+            # 同步内容哈希，下次全量生成时跳过该表
+            if not preview_mode:
+                hashes = self.incremental_updater.load_content_hashes()
+                hashes[table.name] = self.incremental_updater.compute_content_hash(
+                    table, self.template_engine.template_fingerprint())
+                self.incremental_updater.save_content_hashes(hashes)
+            return file_path
 
-            # 格式化代码
-            if self.config.config.generation.use_black:
-                try:
-                    generated_code = black.format_str(
-                        generated_code,
-                        mode=black.FileMode(line_length=self.config.config.generation.line_length)
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to format code with Black: {e}")
+        except Exception as e:
+            logger.error(f"Failed to generate entity file for table {table.name}: {e}")
+            raise
 
-            # 排序导入语句
-            if self.config.config.generation.use_isort:
-                try:
-                    generated_code = isort.code(
-                        generated_code,
-                        profile="black",
-                        line_length=self.config.config.generation.line_length
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to sort imports with isort: {e}")
+    def _write_entity_file(self, table: TableMetadata, generated_code: str, output_dir: Path,
+                           preview_mode: bool = False, protect_user_methods: Optional[bool] = None) -> str:
+        """
+        写入实体类文件（已有文件只读取一次，用于保留用户自定义方法）
+
+        Args:
+            table: 表元数据
+            generated_code: 生成的代码
+            output_dir: 输出目录
+            preview_mode: 是否为预览模式
+            protect_user_methods: 是否保留用户自定义方法，默认按配置
 
-            # 恢复用户自定义方法
-            if (file_path.exists() and self.config.config.generation.custom_methods_protection
-                    and not preview_mode):
-                generated_code = self._restore_user_methods(generated_code)
+        Returns:
+            文件路径
+        """
+        file_path = self._get_model_file_path(table.name, output_dir)
 
-            if preview_mode:
-                logger.info(f"Preview mode - would generate file: {file_path}")
-                logger.debug(f"Generated code preview:\n{generated_code}")
-                return str(file_path)
+        if preview_mode:
+            logger.info(f"Preview mode - would generate file: {file_path}")
+            logger.debug(f"Generated code preview:\n{generated_code}")
+            return str(file_path)
 
-            # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(generated_code)
+        if protect_user_methods is None:
+            protect_user_methods = self.config.config.generation.custom_methods_protection
 
-            logger.info(f"Generated entity file: {file_path}")
+        # 保护用户自定义方法
+        if protect_user_methods and file_path.exists():
+            user_methods = self._backup_user_methods(file_path)
+            if user_methods:
+                generated_code = self._restore_user_methods(generated_code, user_methods)
+                logger.info(f"Protected custom methods in existing file: {file_path}")
+
+        # 写入文件
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(generated_code)
+
+        logger.info(f"Generated entity file: {file_path}")
+        return str(file_path)
+
+    def _write_dao_file(self, table: TableMetadata, generated_code: str, preview_mode: bool = False) -> str:
+        """
+        写入DAO基类文件（整个文件由工具生成，业务查询写在继承它的DAO中）
+
+        Args:
+            table: 表元数据
+            generated_code: 生成的代码
+            preview_mode: 是否为预览模式
+
+        Returns:
+            文件路径
+        """
+        file_path = self._get_dao_file_path(table.name)
+
+        if preview_mode:
+            logger.info(f"Preview mode - would generate file: {file_path}")
+            logger.debug(f"Generated code preview:\n{generated_code}")
             return str(file_path)
 
-        except Exception as e:
-            logger.error(f"Failed to generate entity file for table {table.name}: {e}")
-            raise
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(generated_code)
+
+        logger.info(f"Generated DAO base file: {file_path}")
+        return str(file_path)
+
+    def _generate_dao_package_file(self):
+        """生成DAO基类包的__init__.py（已存在时保留）"""
+        dao_dir = Path(self.config.config.generation.dao_output_dir)
+        dao_dir.mkdir(parents=True, exist_ok=True)
+        file_path = dao_dir / "__init__.py"
+        if file_path.exists():
+            return
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('"""\n自动生成的DAO基类包\n警告: 此目录由工具自动生成，请勿手动修改！\n"""\n')
+        logger.info(f"Generated DAO package file: {file_path}")
 
     def _backup_user_methods(self, file_path: Path) -> Optional[str]:
         """
-        备份用户自定义方法
+        读取已有文件中的用户自定义方法区域
 
         Args:
             file_path: 文件路径
 
         Returns:
-            用户自定义方法的内容，如果没有则返回None
+            用户自定义方法区域（包含标记），如果没有则返回None
         """
+        start_marker = IncrementalUpdater.USER_CUSTOM_METHODS_START
+        end_marker = IncrementalUpdater.USER_CUSTOM_METHODS_END
+
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            # 查找用户自定义方法区域
-            start_marker = "# === USER_CUSTOM_METHODS_START ==="
-            end_marker = "# === USER_CUSTOM_METHODS_END ==="
-
             start_index = content.find(start_marker)
             end_index = content.find(end_marker)
 
             if start_index != -1 and end_index != -1:
-                # 提取用户自定义方法
-                user_methods = content[start_index:end_index + len(end_marker)]
-                # 临时保存到类属性中
-                if not hasattr(self, '_user_methods_backup'):
-                    self._user_methods_backup = {}
-                self._user_methods_backup[str(file_path)] = user_methods
-                return user_methods
+                return content[start_index:end_index + len(end_marker)]
 
         except Exception as e:
             logger.warning(f"Failed to backup user methods from {file_path}: {e}")
 
         return None
 
-    def _restore_user_methods(self, generated_code: str) -> str:
+    def _restore_user_methods(self, generated_code: str, user_methods: str) -> str:
         """
-        恢复用户自定义方法
+        将用户自定义方法区域替换进生成的代码
 
         Args:
             generated_code: 生成的代码
+            user_methods: 用户自定义方法区域（包含标记）
 
         Returns:
             恢复用户自定义方法后的代码
         """
-        if not hasattr(self, '_user_methods_backup'):
-            return generated_code
-
-        # 查找生成的用户自定义方法区域
-        start_marker = "# === USER_CUSTOM_METHODS_START ==="
-        end_marker = "# === USER_CUSTOM_METHODS_END ==="
+        start_marker = IncrementalUpdater.USER_CUSTOM_METHODS_START
+        end_marker = IncrementalUpdater.USER_CUSTOM_METHODS_END
 
         start_index = generated_code.find(start_marker)
         end_index = generated_code.find(end_marker)
 
-        if start_index != -1 and end_index != -1:
-            # 这里简化处理，直接返回原始生成的代码
-            # 实际项目中可以根据文件路径获取对应的用户方法
-            pass
+        if start_index == -1 or end_index == -1:
+            return generated_code
 
-        return generated_code
+        return generated_code[:start_index] + user_methods + generated_code[end_index + len(end_marker):]
 
     def _generate_base_model_file(self, output_dir: Path):
         """
@@ -385,49 +593,38 @@ class EntityGenerator:
             # 检测变化
             changes = self.incremental_updater.detect_changes(current_tables, backup_custom_methods)
 
-            if not changes:
-                logger.info("没有检测到任何变化，无需更新")
-                return []
-
             # 创建输出目录
             output_dir = Path(self.config.config.generation.output_dir)
             if not preview_mode:
                 output_dir.mkdir(parents=True, exist_ok=True)
 
-            # 处理变更
+            # 处理删除的表
             updated_files = []
-            class_names = []
-
             for change in changes:
-                if change.change_type.value in ['table_removed']:
-                    # 表删除：删除对应的文件
+                if change.change_type.value == 'table_removed':
                     file_path = self._get_model_file_path(change.table_name)
                     if file_path.exists() and not preview_mode:
                         file_path.unlink()
                         logger.info(f"删除已删除表的文件: {file_path}")
                     updated_files.append(str(file_path))
 
-                elif change.change_type.value in ['table_added', 'table_modified']:
-                    # 新增或修改的表：重新生成
-                    if change.new_metadata:
-                        file_path = self._get_model_file_path(change.table_name)
-
-                        if preview_mode:
-                            logger.info(f"预览模式 - 将更新文件: {file_path}")
-                        else:
-                            success = self.incremental_updater.apply_incremental_update(
-                                change.new_metadata, file_path, backup_custom_methods
-                            )
-                            if success:
-                                updated_files.append(str(file_path))
-                                class_name = safe_class_name(change.table_name) + self.config.config.generation.suffix
-                                class_names.append(class_name)
-                                logger.info(f"增量更新成功: {file_path}")
-                            else:
-                                logger.error(f"增量更新失败: {file_path}")
+                    dao_path = self._get_dao_file_path(change.table_name)
+                    if dao_path.exists():
+                        if not preview_mode:
+                            dao_path.unlink()
+                            logger.info(f"删除已删除表的文件: {dao_path}")
+                        updated_files.append(str(dao_path))
+
+            # 新增或修改的表：按内容哈希重新生成（模板变化时同样会重新生成）
+            updated_files.extend(self._generate_tables(
+                current_tables, output_dir, preview_mode,
+                protect_user_methods=backup_custom_methods or None
+            ))
+            class_names = [safe_class_name(table.name) + self.config.config.generation.suffix
+                           for table in current_tables]
 
             # 生成__init__.py文件
-            if class_names and not preview_mode:
+            if updated_files and not preview_mode:
                 self._generate_init_file(output_dir, class_names)
 
             logger.info(f"增量更新完成，更新了 {len(updated_files)} 个文件")
@@ -437,11 +634,15 @@ class EntityGenerator:
             logger.error(f"增量更新失败: {e}")
             raise
 
-    def _get_model_file_path(self, table_name: str) -> Path:
+    def _get_model_file_path(self, table_name: str, output_dir: Optional[Path] = None) -> Path:
         """获取模型文件路径"""
         class_name = safe_class_name(table_name) + self.config.config.generation.suffix
         file_name = f"{class_name.lower()}.py"
-        return Path(self.config.config.generation.output_dir) / file_name
+        return Path(output_dir or self.config.config.generation.output_dir) / file_name
+
+    def _get_dao_file_path(self, table_name: str) -> Path:
+        """获取DAO基类文件路径"""
+        return Path(self.config.config.generation.dao_output_dir) / f"{table_name.lower()}_base_dao.py"
 
     def close(self):
         """关闭资源"""
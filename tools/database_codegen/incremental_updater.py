@@ -5,9 +5,12 @@
 
 import re
 import os
+import json
 import difflib
+import hashlib
 import pickle
 import logging
+from dataclasses import asdict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Set
 from enum import Enum
@@ -45,6 +48,7 @@ class IncrementalUpdater:
 
     USER_CUSTOM_METHODS_START = "# === USER_CUSTOM_METHODS_START ==="
     USER_CUSTOM_METHODS_END = "# === USER_CUSTOM_METHODS_END ==="
+    CONTENT_HASH_FILE = "content_hashes.json"
 
     def __init__(self, config_manager):
         self.config = config_manager
@@ -254,6 +258,57 @@ class IncrementalUpdater:
 
         return changes
 
+    # ==================== 内容哈希 ====================
+
+    @staticmethod
+    def compute_content_hash(table: TableMetadata, template_fingerprint: str) -> str:
+        """
+        计算表的内容哈希：表结构与模板指纹都不变时，生成的文件内容也不变
+
+        只包含影响生成结果的结构信息；row_count 等随数据写入变化的统计值不参与哈希，
+        否则线上库中结构未变的表也会被重新生成
+
+        Args:
+            table: 表元数据
+            template_fingerprint: 模板指纹（见 TemplateEngine.template_fingerprint）
+
+        Returns:
+            十六进制哈希字符串
+        """
+        structure = {
+            'name': table.name,
+            'comment': table.comment,
+            'columns': [asdict(column) for column in table.columns],
+            'primary_keys': table.primary_keys,
+            'indexes': [asdict(index) for index in table.indexes],
+            'foreign_keys': [asdict(fk) for fk in table.foreign_keys],
+        }
+        payload = json.dumps(structure, sort_keys=True, default=str, ensure_ascii=False)
+        digest = hashlib.sha256(template_fingerprint.encode('utf-8'))
+        digest.update(payload.encode('utf-8'))
+        return digest.hexdigest()
+
+    def load_content_hashes(self) -> Dict[str, str]:
+        """加载缓存的内容哈希（表名 -> 哈希）"""
+        hash_file = self.metadata_cache_dir / self.CONTENT_HASH_FILE
+        if not hash_file.exists():
+            return {}
+        try:
+            with open(hash_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载内容哈希缓存失败 {hash_file}: {e}")
+            return {}
+
+    def save_content_hashes(self, hashes: Dict[str, str]):
+        """保存内容哈希缓存"""
+        hash_file = self.metadata_cache_dir / self.CONTENT_HASH_FILE
+        try:
+            with open(hash_file, 'w', encoding='utf-8') as f:
+                json.dump(hashes, f, indent=2, sort_keys=True)
+        except Exception as e:
+            logger.warning(f"保存内容哈希缓存失败 {hash_file}: {e}")
+
     def backup_user_methods(self, file_path: Path) -> Optional[str]:
         """
         备份用户自定义方法
@@ -332,7 +387,8 @@ class IncrementalUpdater:
 
     def apply_incremental_update(self, table_metadata: TableMetadata,
                                 file_path: Path,
-                                backup_custom_methods: bool = True) -> bool:
+                                backup_custom_methods: bool = True,
+                                template_engine=None) -> bool:
         """
         应用增量更新到指定文件
 
@@ -340,6 +396,7 @@ class IncrementalUpdater:
             table_metadata: 表元数据
             file_path: 文件路径
             backup_custom_methods: 是否备份用户自定义方法
+            template_engine: 复用的模板引擎（默认新建，无法复用已编译的模板）
 
         Returns:
             更新是否成功
@@ -351,10 +408,9 @@ class IncrementalUpdater:
                 user_methods = self.backup_user_methods(file_path)
 
             # 重新生成文件
-            from .entity_generator import EntityGenerator
-            from .template_engine import TemplateEngine
-
-            template_engine = TemplateEngine(self.config)
+            if template_engine is None:
+                from .template_engine import TemplateEngine
+                template_engine = TemplateEngine(self.config)
             generated_content = template_engine.render_entity_template(table_metadata)
 
             # 恢复用户自定义方法
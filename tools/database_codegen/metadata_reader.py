@@ -4,6 +4,7 @@
 """
 
 from dataclasses import dataclass
+from collections import defaultdict
 from typing import List, Dict, Any, Optional, Set
 import logging
 from contextlib import contextmanager
@@ -222,10 +223,14 @@ class DatabaseMetadataReader:
         """获取数据库连接的上下文管理器"""
         return self.connection_pool.get_connection()
 
-    def read_all_tables(self) -> List[TableMetadata]:
+    def read_all_tables(self, bulk: bool = True) -> List[TableMetadata]:
         """
         读取所有表的元数据
 
+        Args:
+            bulk: 批量模式，整个库的列、索引、主键与外键各用一条查询读取后在内存中按表拆分，
+                  查询次数不随表数量增长；批量读取失败时回退为逐表读取
+
         Returns:
             表元数据列表
         """
@@ -244,6 +249,13 @@ class DatabaseMetadataReader:
 
                 logger.info(f"Found {len(table_names)} tables")
 
+                bulk_tables = None
+                if bulk:
+                    try:
+                        bulk_tables = self._read_schema_bulk(conn)
+                    except MySQLError as e:
+                        logger.warning(f"Bulk metadata read failed, falling back to per-table reads: {e}")
+
                 # 读取每个表的详细信息
                 for i, table_name in enumerate(table_names, 1):
                     if self.config.should_exclude_table(table_name):
@@ -251,7 +263,10 @@ class DatabaseMetadataReader:
                         continue
 
                     try:
-                        table_metadata = self.read_table_metadata(table_name)
+                        if bulk_tables is not None:
+                            table_metadata = bulk_tables.get(table_name)
+                        else:
+                            table_metadata = self.read_table_metadata(table_name)
                         if table_metadata:
                             # 验证表元数据的完整性
                             validation_errors = self._validate_table_metadata(table_metadata)
@@ -468,30 +483,7 @@ class DatabaseMetadataReader:
                 cursor.execute(query, (table_name,))
                 rows = cursor.fetchall()
 
-                columns = []
-                for row in rows:
-                    # 确定是否可为空
-                    is_nullable = row['IS_NULLABLE'] == 'YES'
-
-                    # 映射到Python类型
-                    python_type = map_mysql_to_python_type(
-                        row['COLUMN_TYPE'],
-                        is_nullable,
-                        row['COLUMN_DEFAULT']
-                    )
-
-                    column = ColumnMetadata(
-                        name=row['COLUMN_NAME'],
-                        data_type=row['COLUMN_TYPE'],
-                        python_type=python_type,
-                        max_length=row['CHARACTER_MAXIMUM_LENGTH'],
-                        is_nullable=is_nullable,
-                        default_value=row['COLUMN_DEFAULT'],
-                        comment=format_comment(row['COLUMN_COMMENT']),
-                        ordinal_position=row['ORDINAL_POSITION']
-                    )
-
-                    columns.append(column)
+                columns = [self._build_column(row) for row in rows]
 
                 # 获取主键和自增信息
                 self._enrich_columns_with_constraints(conn, table_name, columns)
@@ -502,6 +494,30 @@ class DatabaseMetadataReader:
             logger.error(f"Failed to read columns for table {table_name}: {e}")
             raise
 
+    @staticmethod
+    def _build_column(row: Dict[str, Any]) -> ColumnMetadata:
+        """由 INFORMATION_SCHEMA.COLUMNS 行构建列元数据"""
+        # 确定是否可为空
+        is_nullable = row['IS_NULLABLE'] == 'YES'
+
+        # 映射到Python类型
+        python_type = map_mysql_to_python_type(
+            row['COLUMN_TYPE'],
+            is_nullable,
+            row['COLUMN_DEFAULT']
+        )
+
+        return ColumnMetadata(
+            name=row['COLUMN_NAME'],
+            data_type=row['COLUMN_TYPE'],
+            python_type=python_type,
+            max_length=row['CHARACTER_MAXIMUM_LENGTH'],
+            is_nullable=is_nullable,
+            default_value=row['COLUMN_DEFAULT'],
+            comment=format_comment(row['COLUMN_COMMENT']),
+            ordinal_position=row['ORDINAL_POSITION']
+        )
+
     def _enrich_columns_with_constraints(self, conn, table_name: str, columns: List[ColumnMetadata]):
         """丰富列的约束信息（主键、自增、唯一索引等）"""
         # 获取主键信息
@@ -553,39 +569,187 @@ class DatabaseMetadataReader:
         try:
             with conn.cursor() as cursor:
                 cursor.execute(query, (table_name,))
-                rows = cursor.fetchall()
-
-                # 按索引名分组
-                index_data = {}
-                for row in rows:
-                    index_name = row['INDEX_NAME']
-                    if index_name not in index_data:
-                        index_data[index_name] = {
-                            'columns': [],
-                            'is_unique': row['NON_UNIQUE'] == 0,
-                            'is_primary': index_name == 'PRIMARY',
-                            'index_type': row['INDEX_TYPE']
-                        }
-                    index_data[index_name]['columns'].append(row['COLUMN_NAME'])
-
-                # 创建索引元数据对象
-                indexes = []
-                for index_name, data in index_data.items():
-                    index = IndexMetadata(
-                        name=index_name,
-                        columns=data['columns'],
-                        is_unique=data['is_unique'],
-                        is_primary=data['is_primary'],
-                        index_type=data['index_type']
-                    )
-                    indexes.append(index)
-
-                return indexes
+                return self._build_indexes(cursor.fetchall())
 
         except MySQLError as e:
             logger.error(f"Failed to read indexes for table {table_name}: {e}")
             return []
 
+    @staticmethod
+    def _build_indexes(rows: List[Dict[str, Any]]) -> List[IndexMetadata]:
+        """由 INFORMATION_SCHEMA.STATISTICS 行（按索引名、列序排序）构建索引元数据"""
+        # 按索引名分组
+        index_data = {}
+        for row in rows:
+            index_name = row['INDEX_NAME']
+            if index_name not in index_data:
+                index_data[index_name] = {
+                    'columns': [],
+                    'is_unique': row['NON_UNIQUE'] == 0,
+                    'is_primary': index_name == 'PRIMARY',
+                    'index_type': row['INDEX_TYPE']
+                }
+            index_data[index_name]['columns'].append(row['COLUMN_NAME'])
+
+        # 创建索引元数据对象
+        return [
+            IndexMetadata(
+                name=index_name,
+                columns=data['columns'],
+                is_unique=data['is_unique'],
+                is_primary=data['is_primary'],
+                index_type=data['index_type']
+            )
+            for index_name, data in index_data.items()
+        ]
+
+    def _read_schema_bulk(self, conn) -> Dict[str, TableMetadata]:
+        """
+        批量读取整个库的表元数据
+
+        分别查询 TABLES、COLUMNS、STATISTICS、KEY_COLUMN_USAGE 与 REFERENTIAL_CONSTRAINTS，
+        在内存中按表名拆分后组装，结果与逐表读取一致
+
+        Args:
+            conn: 数据库连接
+
+        Returns:
+            表名到表元数据的映射
+        """
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT
+                TABLE_NAME,
+                TABLE_COMMENT as comment,
+                ENGINE as engine,
+                TABLE_COLLATION as collation,
+                TABLE_ROWS as row_count
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+            """)
+            table_rows = cursor.fetchall()
+
+            cursor.execute("""
+            SELECT
+                TABLE_NAME,
+                COLUMN_NAME,
+                COLUMN_TYPE,
+                DATA_TYPE,
+                IS_NULLABLE,
+                COLUMN_DEFAULT,
+                COLUMN_COMMENT,
+                ORDINAL_POSITION,
+                CHARACTER_MAXIMUM_LENGTH,
+                NUMERIC_PRECISION,
+                NUMERIC_SCALE,
+                EXTRA
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """)
+            column_rows = cursor.fetchall()
+
+            cursor.execute("""
+            SELECT
+                TABLE_NAME,
+                INDEX_NAME,
+                COLUMN_NAME,
+                NON_UNIQUE,
+                INDEX_TYPE
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+            """)
+            index_rows = cursor.fetchall()
+
+            cursor.execute("""
+            SELECT
+                TABLE_NAME,
+                CONSTRAINT_NAME,
+                COLUMN_NAME,
+                REFERENCED_COLUMN_NAME
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE()
+                AND (CONSTRAINT_NAME = 'PRIMARY' OR REFERENCED_TABLE_NAME IS NOT NULL)
+            ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+            """)
+            key_rows = cursor.fetchall()
+
+            cursor.execute("""
+            SELECT
+                TABLE_NAME,
+                CONSTRAINT_NAME,
+                REFERENCED_TABLE_NAME,
+                DELETE_RULE,
+                UPDATE_RULE
+            FROM INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS
+            WHERE CONSTRAINT_SCHEMA = DATABASE()
+            """)
+            referential_rows = cursor.fetchall()
+
+        # 按表名拆分
+        columns_by_table: Dict[str, List[ColumnMetadata]] = defaultdict(list)
+        auto_increment: Dict[str, Set[str]] = defaultdict(set)
+        for row in column_rows:
+            columns_by_table[row['TABLE_NAME']].append(self._build_column(row))
+            if row['EXTRA'] == 'auto_increment':
+                auto_increment[row['TABLE_NAME']].add(row['COLUMN_NAME'])
+
+        index_rows_by_table: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in index_rows:
+            index_rows_by_table[row['TABLE_NAME']].append(row)
+
+        referential = {(row['TABLE_NAME'], row['CONSTRAINT_NAME']): row for row in referential_rows}
+        primary_keys_by_table: Dict[str, Set[str]] = defaultdict(set)
+        foreign_keys_by_table: Dict[str, List[ForeignKeyMetadata]] = defaultdict(list)
+        for row in key_rows:
+            table_name = row['TABLE_NAME']
+            if row['CONSTRAINT_NAME'] == 'PRIMARY':
+                primary_keys_by_table[table_name].add(row['COLUMN_NAME'])
+                continue
+            constraint = referential.get((table_name, row['CONSTRAINT_NAME']))
+            if constraint is None or constraint['REFERENCED_TABLE_NAME'] is None:
+                continue
+            foreign_keys_by_table[table_name].append(ForeignKeyMetadata(
+                name=row['CONSTRAINT_NAME'],
+                column=row['COLUMN_NAME'],
+                referenced_table=constraint['REFERENCED_TABLE_NAME'],
+                referenced_column=row['REFERENCED_COLUMN_NAME'],
+                on_delete=constraint['DELETE_RULE'],
+                on_update=constraint['UPDATE_RULE']
+            ))
+
+        # 组装表元数据
+        tables = {}
+        for table_info in table_rows:
+            table_name = table_info['TABLE_NAME']
+            columns = columns_by_table.get(table_name)
+            if not validate_table_name(table_name) or not columns:
+                logger.warning(f"Skipping table without valid metadata: {table_name}")
+                continue
+
+            primary_keys = primary_keys_by_table.get(table_name, set())
+            auto_increment_columns = auto_increment.get(table_name, set())
+            for column in columns:
+                column.is_primary_key = column.name in primary_keys
+                column.is_auto_increment = column.name in auto_increment_columns
+
+            tables[table_name] = TableMetadata(
+                name=table_name,
+                comment=table_info.get('comment', ''),
+                engine=table_info.get('engine', 'InnoDB'),
+                charset=table_info.get('charset', 'utf8mb4'),
+                collation=table_info.get('collation', 'utf8mb4_unicode_ci'),
+                columns=columns,
+                primary_keys=[column.name for column in columns if column.is_primary_key],
+                indexes=self._build_indexes(index_rows_by_table.get(table_name, [])),
+                foreign_keys=foreign_keys_by_table.get(table_name, []),
+                row_count=table_info.get('row_count', 0)
+            )
+
+        logger.debug(f"Bulk-read metadata for {len(tables)} tables")
+        return tables
+
     def _read_foreign_keys(self, conn, table_name: str) -> List[ForeignKeyMetadata]:
         """读取表的外键信息"""
         query = """
@@ -4,8 +4,10 @@
 """
 
 import os
+import hashlib
+import threading
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound, TemplateError
@@ -15,6 +17,12 @@ from .utils import get_type_imports, safe_class_name, escape_string
 
 logger = logging.getLogger(__name__)
 
+# 影响实体类生成结果的工具版本（修改模板上下文时递增，使内容哈希失效）
+ENTITY_TEMPLATE_VERSION = '2.2.0'
+
+# 由数据库填充、插入时不需要传入的默认值
+DATABASE_FILLED_DEFAULTS = ('CURRENT_TIMESTAMP', 'NOW()')
+
 class TemplateEngine:
     """模板引擎"""
 
@@ -27,6 +35,10 @@ class TemplateEngine:
         """
         self.config = config
         self.env = None
+        # 编译后的模板缓存（模板名 -> Template）
+        self._template_cache: Dict[str, Template] = {}
+        self._template_cache_lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
         self._setup_environment()
 
     def _setup_environment(self):
@@ -41,11 +53,13 @@ class TemplateEngine:
                 template_dir = Path(__file__).parent / "templates"
 
             # 创建Jinja2环境
+            # 模板在生成过程中不会变化，关闭 auto_reload 避免每次取模板都检查文件修改时间
             self.env = Environment(
                 loader=FileSystemLoader(str(template_dir)),
                 trim_blocks=True,
                 lstrip_blocks=True,
-                keep_trailing_newline=True
+                keep_trailing_newline=True,
+                auto_reload=False
             )
 
             # 添加自定义过滤器
@@ -91,6 +105,55 @@ class TemplateEngine:
         self.env.filters['escape_string'] = escape_string_filter
         self.env.filters['format_type'] = format_type_filter
 
+    def get_template(self, name: str) -> Template:
+        """
+        获取编译后的模板（首次加载后缓存，渲染时不再解析与编译）
+
+        Args:
+            name: 模板文件名
+
+        Returns:
+            编译后的模板
+        """
+        template = self._template_cache.get(name)
+        if template is None:
+            with self._template_cache_lock:
+                template = self._template_cache.get(name)
+                if template is None:
+                    template = self._template_cache[name] = self.env.get_template(name)
+        return template
+
+    def template_fingerprint(self) -> str:
+        """
+        实体模板指纹：模板源码（实体与DAO基类）、模板版本与影响生成结果的配置项的哈希，
+        与表元数据一起决定生成文件内容是否需要重新生成
+
+        Returns:
+            十六进制哈希字符串
+        """
+        if self._fingerprint is None:
+            template_config = self.config.config.template
+            generation = self.config.config.generation
+            template_names = [template_config.entity_template]
+            if generation.generate_dao_bases:
+                template_names.append(template_config.dao_template)
+
+            digest = hashlib.sha256()
+            for name in template_names:
+                try:
+                    source, _, _ = self.env.loader.get_source(self.env, name)
+                except TemplateNotFound:
+                    source = 'builtin'
+                digest.update(source.encode('utf-8'))
+            options = (ENTITY_TEMPLATE_VERSION, generation.base_class, generation.suffix,
+                       generation.include_validation, generation.include_foreign_keys,
+                       generation.use_slots, generation.fast_mapping,
+                       generation.generate_dao_bases, generation.output_dir,
+                       generation.use_black, generation.use_isort, generation.line_length)
+            digest.update(repr(options).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
     def render_entity_template(self, table_metadata: 'TableMetadata') -> str:
         """
         渲染实体类模板
@@ -106,7 +169,7 @@ class TemplateEngine:
             context = self._prepare_entity_context(table_metadata)
 
             # 加载模板
-            template = self.env.get_template(self.config.config.template.entity_template)
+            template = self.get_template(self.config.config.template.entity_template)
 
             # 渲染模板
             rendered = template.render(**context)
@@ -184,7 +247,9 @@ class {{ class_name }}({{ base_class }}):
         return cls(**data)
 '''
 
-        template = Template(template_str)
+        template = self._template_cache.get('<builtin-entity>')
+        if template is None:
+            template = self._template_cache['<builtin-entity>'] = Template(template_str)
         return template.render(**context)
 
     def _prepare_entity_context(self, table_metadata: 'TableMetadata') -> Dict[str, Any]:
@@ -212,7 +277,7 @@ class {{ class_name }}({{ base_class }}):
         # 构建导入语句列表
         imports = [
             "from dataclasses import dataclass",
-            "from typing import List, Dict, Any, Optional",
+            "from typing import List, Dict, Any, Optional, Sequence",
         ]
 
         if 'Decimal' in python_types:
@@ -251,6 +316,7 @@ class {{ class_name }}({{ base_class }}):
 
         for col in table_metadata.columns:
             col_info = {
+                'row_default': self._row_default(col),
                 'name': col.name,
                 'data_type': col.data_type,
                 'python_type': col.python_type,
@@ -281,6 +347,8 @@ class {{ class_name }}({{ base_class }}):
             'base_class': self.config.config.generation.base_class,
             'include_validation': self.config.config.generation.include_validation,
             'include_foreign_keys': self.config.config.generation.include_foreign_keys,
+            'use_slots': self.config.config.generation.use_slots,
+            'fast_mapping': self.config.config.generation.fast_mapping,
             'table_comment': table_metadata.comment,
             # 新增的增强信息
             'validation_rules': validation_rules,
@@ -292,6 +360,152 @@ class {{ class_name }}({{ base_class }}):
 
         return context
 
+    @staticmethod
+    def _row_default(column) -> str:
+        """
+        行映射时缺失列使用的默认值表达式（与实体模板中字段默认值的规则一致）
+
+        Args:
+            column: 列元数据
+
+        Returns:
+            Python表达式字符串
+        """
+        if column.default_value and column.default_value not in DATABASE_FILLED_DEFAULTS:
+            if column.python_type == 'str':
+                return f'"{column.default_value}"'
+            return str(column.default_value)
+        if not column.is_nullable and column.python_type in ('int', 'float'):
+            return '0'
+        return 'None'
+
+    def render_dao_base_template(self, table_metadata: 'TableMetadata') -> Optional[str]:
+        """
+        渲染DAO基类模板
+
+        Args:
+            table_metadata: 表元数据
+
+        Returns:
+            生成的DAO基类代码，模板不存在时返回None
+        """
+        try:
+            context = self._prepare_dao_context(table_metadata)
+            template = self.get_template(self.config.config.template.dao_template)
+            rendered = template.render(**context)
+
+            logger.debug(f"Successfully rendered DAO base for table: {table_metadata.name}")
+            return rendered
+
+        except TemplateNotFound as e:
+            logger.warning(f"DAO template not found, skipping DAO base: {e}")
+            return None
+        except TemplateError as e:
+            logger.error(f"Template rendering error: {e}")
+            raise
+
+    def _prepare_dao_context(self, table_metadata: 'TableMetadata') -> Dict[str, Any]:
+        """
+        准备DAO基类模板的上下文数据（SQL文本在此根据表与索引元数据预先拼好）
+
+        Args:
+            table_metadata: 表元数据
+
+        Returns:
+            模板上下文字典
+        """
+        table = table_metadata.name
+        generation = self.config.config.generation
+        column_names = [col.name for col in table_metadata.columns]
+        primary_keys = table_metadata.primary_keys or []
+        # 按ID的批量方法只对单列主键生成；联合主键按主键元组生成单行方法
+        primary_key = primary_keys[0] if len(primary_keys) == 1 else None
+        if not primary_keys:
+            logger.info(f"Table {table} has no primary key, DAO base leaves get_by_id/update/delete "
+                        f"to the subclass")
+
+        # 插入列：跳过自增列与由数据库填充默认值的列
+        insert_columns = []
+        for col in table_metadata.columns:
+            if col.is_auto_increment or col.default_value in DATABASE_FILLED_DEFAULTS:
+                continue
+            if col.is_required:
+                param = f"row['{col.name}']"
+            else:
+                param = f"row.get('{col.name}', {self._row_default(col)})"
+            insert_columns.append({'name': col.name, 'param': param})
+        insert_names = [col['name'] for col in insert_columns]
+
+        # 第一个非主键唯一索引作为 upsert 的冲突键
+        unique_key = next((list(index.columns) for index in table_metadata.indexes
+                           if index.is_unique and not index.is_primary), None)
+
+        has_updated_at = 'updated_at' in column_names
+        updatable_columns = [col.name for col in table_metadata.columns
+                             if col.name not in primary_keys and col.name != 'created_at'
+                             and not col.is_auto_increment]
+
+        select_columns = ', '.join(column_names)
+        insert_sql = (f"INSERT INTO {table} ({', '.join(insert_names)}) "
+                      f"VALUES ({', '.join(['%s'] * len(insert_names))})")
+
+        upsert_sql = None
+        if unique_key:
+            assignments = [f"{name} = VALUES({name})" for name in insert_names
+                           if name not in unique_key and name not in primary_keys]
+            if has_updated_at and 'updated_at' not in insert_names:
+                assignments.append("updated_at = NOW()")
+            if assignments:
+                upsert_sql = f"{insert_sql} ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+
+        sql = {'insert': insert_sql, 'upsert': upsert_sql}
+        if primary_keys:
+            key_condition = ' AND '.join(f"{name} = %s" for name in primary_keys)
+            sql.update({
+                'key_condition': key_condition,
+                'select_by_id': f"SELECT {select_columns} FROM {table} WHERE {key_condition}",
+                'delete_by_id': f"DELETE FROM {table} WHERE {key_condition}",
+            })
+        if primary_key:
+            sql.update({
+                'select_by_ids': f"SELECT {select_columns} FROM {table} WHERE {primary_key} IN ({{placeholders}})",
+                'delete_by_ids': f"DELETE FROM {table} WHERE {primary_key} IN ({{placeholders}})",
+            })
+
+        model_class = safe_class_name(table) + generation.suffix
+        return {
+            'generation_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'tool_version': '2.0.0',
+            'class_name': safe_class_name(table) + 'BaseDAO',
+            'class_comment': table_metadata.comment or f"{table}表",
+            'table_name': table,
+            'model_class': model_class,
+            'model_module': f"{self._package_path(generation.output_dir)}.{model_class.lower()}",
+            'columns': column_names,
+            'primary_key': primary_key,
+            'primary_keys': primary_keys,
+            'insert_columns': insert_columns,
+            'unique_key': unique_key,
+            'updatable_columns': updatable_columns,
+            'has_updated_at': has_updated_at,
+            'sql': sql,
+        }
+
+    @staticmethod
+    def _package_path(directory: str) -> str:
+        """
+        将输出目录转换为可导入的包路径（相对当前工作目录）
+
+        Args:
+            directory: 输出目录
+
+        Returns:
+            点分包路径
+        """
+        relative = Path(os.path.relpath(Path(directory).resolve()))
+        parts = [part for part in relative.parts if part not in ('.', '..')]
+        return '.'.join(parts) or relative.name
+
     def render_init_template(self, class_names: List[str]) -> str:
         """
         渲染__init__.py模板
@@ -309,7 +523,7 @@ class {{ class_name }}({{ base_class }}):
                 'tool_version': '1.0.0',
             }
 
-            template = self.env.get_template(self.config.config.template.init_template)
+            template = self.get_template(self.config.config.template.init_template)
             rendered = template.render(**context)
 
             logger.debug("Successfully rendered __init__.py template")
@@ -354,7 +568,7 @@ __all__ = [
                 'tool_version': '1.0.0',
             }
 
-            template = self.env.get_template(self.config.config.template.base_template)
+            template = self.get_template(self.config.config.template.base_template)
             rendered = template.render(**context)
 
             logger.debug("Successfully rendered base model template")
@@ -0,0 +1,122 @@
+"""楼层池离线生成工具
+
+使用多进程并行调用 generate_normal_floor 批量生成 1..MAX_FLOORS 层的楼层布局，
+按楼层段写入紧凑的二进制文件，供服务器通过 TOWERGAME_FLOOR_POOL_DIR 加载。
+
+用法:
+    python tools/floor_pool_generator.py --output floor_pool --per-level 64 --band-size 10 --seed 42
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.game_config import config_manager
+from map_generator import find_layout_violations, generate_normal_floor
+from floor_pool import encode_floor, write_pool_file, band_file_name
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def generate_level_records(level: int, count: int, seed: int) -> Tuple[int, List[bytes]]:
+    """
+    在工作进程中生成指定楼层的布局记录
+
+    Args:
+        level: 楼层数
+        count: 布局数量
+        seed: 随机种子（同一种子结果可复现）
+
+    Returns:
+        (楼层数, 记录列表)
+
+    Raises:
+        ValueError: 生成的布局违反出生点/楼梯约束
+    """
+    random.seed(seed)
+    records = []
+    for _ in range(count):
+        floor = generate_normal_floor(level)
+        violations = find_layout_violations(floor)
+        if violations:
+            raise ValueError('; '.join(violations))
+        records.append(encode_floor(floor))
+    return level, records
+
+
+def build_floor_pool(output_dir: str, per_level: int, band_size: int, seed: int,
+                     workers: int, max_level: int) -> List[str]:
+    """
+    并行生成楼层池
+
+    Args:
+        output_dir: 输出目录
+        per_level: 每层布局数
+        band_size: 每个文件包含的楼层数
+        seed: 基础种子
+        workers: 进程数
+        max_level: 最高楼层
+
+    Returns:
+        写入的文件路径列表
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    levels = list(range(1, max_level + 1))
+
+    records_by_level = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(generate_level_records, level, per_level, seed * 100003 + level)
+            for level in levels
+        ]
+        for future in futures:
+            level, records = future.result()
+            records_by_level[level] = records
+
+    written = []
+    for band_start in range(1, max_level + 1, band_size):
+        band_end = min(band_start + band_size - 1, max_level)
+        records = []
+        for level in range(band_start, band_end + 1):
+            records.extend(records_by_level[level])
+
+        path = os.path.join(output_dir, band_file_name(band_start, band_end))
+        write_pool_file(path, band_start, band_end, records)
+        written.append(path)
+        logger.info(f"写入 {path}: {len(records)} 个布局, {os.path.getsize(path)} 字节")
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='楼层池离线生成工具')
+    parser.add_argument('--output', '-o', default='floor_pool', help='输出目录')
+    parser.add_argument('--per-level', type=int, default=64, help='每层生成的布局数')
+    parser.add_argument('--band-size', type=int, default=10, help='每个文件包含的楼层数')
+    parser.add_argument('--seed', type=int, default=0, help='基础随机种子')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--max-level', type=int, default=config_manager.get_config().MAX_FLOORS,
+                        help='最高楼层')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    files = build_floor_pool(args.output, args.per_level, args.band_size, args.seed,
+                             args.workers, args.max_level)
+    logger.info(f"楼层池生成完成: {len(files)} 个文件, 耗时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+加权采样与词条描述格式化工具
+
+预先构建累积权重表，单次采样只需一次二分查找；
+词条描述模板在构建时解析一次，生成时直接拼接字符串。
+"""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class WeightedSampler:
+    """累积权重采样器（构建后只读）"""
+
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]):
+        """
+        Args:
+            items: 候选项
+            weights: 对应权重（非负，总和需大于0）
+        """
+        if len(items) != len(weights):
+            raise ValueError("候选项与权重数量不一致")
+        if not items:
+            raise ValueError("候选项不能为空")
+
+        self.items: Tuple[Any, ...] = tuple(items)
+        self.weights: Tuple[float, ...] = tuple(weights)
+        self.cum_weights: List[float] = list(accumulate(self.weights))
+        self.total = self.cum_weights[-1]
+        if self.total <= 0:
+            raise ValueError("权重总和必须大于0")
+
+    @classmethod
+    def from_dict(cls, weighted: Dict[Any, float]) -> 'WeightedSampler':
+        """从 {候选项: 权重} 字典构建"""
+        return cls(list(weighted.keys()), list(weighted.values()))
+
+    def sample(self, rng: random.Random = None) -> Any:
+        """采样一个候选项"""
+        r = (rng or random).random() * self.total
+        return self.items[bisect_right(self.cum_weights, r, hi=len(self.items) - 1)]
+
+    def sample_many(self, count: int, rng: random.Random = None) -> List[Any]:
+        """
+        批量有放回采样
+
+        Args:
+            count: 采样数量
+            rng: 随机数生成器，默认使用全局random
+
+        Returns:
+            采样结果列表
+        """
+        return (rng or random).choices(self.items, cum_weights=self.cum_weights, k=count)
+
+    def sample_distinct(self, count: int, rng: random.Random = None) -> List[Any]:
+        """
+        按权重无放回采样（与逐次加权抽取并移除已选项的分布相同）
+
+        Args:
+            count: 采样数量，超过候选项数量时返回全部候选项
+
+        Returns:
+            互不重复的采样结果列表
+        """
+        positive = sum(1 for w in self.weights if w > 0)
+        count = min(count, positive)
+        selected: List[Any] = []
+        seen = set()
+        while len(selected) < count:
+            item = self.sample(rng)
+            if item not in seen:
+                seen.add(item)
+                selected.append(item)
+        return selected
+
+
+class DescriptionFormatter:
+    """
+    词条描述格式化器
+
+    支持两种模板占位符：
+    - {value*100}: 百分比类词条，按一位小数展示百分比
+    - {value}: 数值类词条，四舍五入为整数展示
+    """
+
+    PERCENT_PLACEHOLDER = '{value*100}'
+    VALUE_PLACEHOLDER = '{value}'
+
+    def __init__(self, template: str):
+        self.template = template
+        self.has_placeholder = True
+        if self.PERCENT_PLACEHOLDER in template:
+            self.is_percent = True
+            self.prefix, _, self.suffix = template.partition(self.PERCENT_PLACEHOLDER)
+        else:
+            self.is_percent = False
+            self.prefix, placeholder, self.suffix = template.partition(self.VALUE_PLACEHOLDER)
+            self.has_placeholder = bool(placeholder)
+
+    def format(self, value: float) -> str:
+        """按模板格式化数值"""
+        if not self.has_placeholder:
+            return self.template
+        if self.is_percent:
+            value_str = f'{value*100:.1f}'
+        else:
+            value_str = str(int(round(value)))
+        return f'{self.prefix}{value_str}{self.suffix}'
+
+
+def build_description_formatters(attribute_types: Dict[str, Dict[str, Any]]) -> Dict[str, DescriptionFormatter]:
+    """
+    为词条配置表预构建描述格式化器
+
+    Args:
+        attribute_types: 词条配置（ATTRIBUTE_TYPES / ARMOR_ATTRIBUTE_TYPES）
+
+    Returns:
+        {词条类型: 格式化器}
+    """
+    return {
+        attr_type: DescriptionFormatter(attr_config['description'])
+        for attr_type, attr_config in attribute_types.items()
+    }